@@ -5,8 +5,9 @@ from datetime import timedelta
 import os
 from dotenv import load_dotenv
 import secrets
-from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from common.db_pool import SQLAlchemy
+from common.response_cache import response_cache
 
 # Load environment variables
 load_dotenv()
@@ -27,17 +28,87 @@ def create_app():
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
     app.config['JWT_BLACKLIST_ENABLED'] = True
     app.config['JWT_BLACKLIST_TOKEN_CHECKS'] = ['access']
+    # Per-worker blocklist cache (see auth/blocklist.py)
+    app.config['BLOCKLIST_BLOOM_CAPACITY'] = int(os.getenv('BLOCKLIST_BLOOM_CAPACITY', 100000))
+    app.config['BLOCKLIST_BLOOM_ERROR_RATE'] = float(os.getenv('BLOCKLIST_BLOOM_ERROR_RATE', 0.001))
+    app.config['BLOCKLIST_CACHE_SIZE'] = int(os.getenv('BLOCKLIST_CACHE_SIZE', 10000))
+    app.config['BLOCKLIST_CACHE_TTL'] = int(os.getenv('BLOCKLIST_CACHE_TTL', 300))
+    app.config['BLOCKLIST_POLL_INTERVAL'] = float(os.getenv('BLOCKLIST_POLL_INTERVAL', 1.0))
+    app.config['BLOCKLIST_CATCH_UP_WINDOW'] = float(os.getenv('BLOCKLIST_CATCH_UP_WINDOW', 60))
+    app.config['BLOCKLIST_PRUNE_INTERVAL'] = int(os.getenv('BLOCKLIST_PRUNE_INTERVAL', 3600))  # 0 disables
+    app.config['BLOCKLIST_PRUNE_BATCH_SIZE'] = int(os.getenv('BLOCKLIST_PRUNE_BATCH_SIZE', 1000))
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-        "pool_size": 20,
-        "max_overflow": 30,
-        "pool_timeout": 30,
-    }
+    # Password hashing (see auth/hashing.py)
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    app.config['BCRYPT_POOL_SIZE'] = int(os.getenv('BCRYPT_POOL_SIZE', 2))  # 0 hashes inline
+    app.config['BCRYPT_QUEUE_DEPTH'] = int(os.getenv('BCRYPT_QUEUE_DEPTH', 8))
+    app.config['BCRYPT_TIMEOUT'] = float(os.getenv('BCRYPT_TIMEOUT', 10))
+    # Response cache for read endpoints (see common/response_cache.py)
+    app.config['RESPONSE_CACHE_BACKEND'] = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')  # memory, shared or none
+    app.config['RESPONSE_CACHE_URL'] = os.getenv('RESPONSE_CACHE_URL')
+    app.config['RESPONSE_CACHE_SIZE'] = int(os.getenv('RESPONSE_CACHE_SIZE', 2048))
+    app.config['RESPONSE_CACHE_TTL'] = int(os.getenv('RESPONSE_CACHE_TTL', 30))
+    app.config['WEB_CONCURRENCY'] = int(os.getenv('WEB_CONCURRENCY', 4))  # web workers, as in gunicorn.conf.py
+    # Fan-out-on-write home timelines (see community/feed.py)
+    app.config['FEED_FANOUT_ENABLED'] = os.getenv('FEED_FANOUT_ENABLED', 'false').lower() == 'true'
+    app.config['FEED_FANOUT_MAX_AUDIENCE'] = int(os.getenv('FEED_FANOUT_MAX_AUDIENCE', 10000))
+    app.config['FEED_TIMELINE_LENGTH'] = int(os.getenv('FEED_TIMELINE_LENGTH', 500))
+    app.config['FEED_TRIM_INTERVAL'] = int(os.getenv('FEED_TRIM_INTERVAL', 3600))  # 0 disables
+    app.config['FEED_TRIM_BATCH_SIZE'] = int(os.getenv('FEED_TRIM_BATCH_SIZE', 1000))
+    # Background jobs run by worker.py (see jobs/queue.py)
+    app.config['JOBS_RUN_INLINE'] = os.getenv('JOBS_RUN_INLINE', 'false').lower() == 'true'
+    app.config['JOBS_POLL_INTERVAL'] = float(os.getenv('JOBS_POLL_INTERVAL', 1.0))
+    app.config['JOBS_MAX_ATTEMPTS'] = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+    app.config['JOBS_BACKOFF_BASE'] = float(os.getenv('JOBS_BACKOFF_BASE', 2))
+    app.config['JOBS_BACKOFF_MAX'] = float(os.getenv('JOBS_BACKOFF_MAX', 600))
+    app.config['JOBS_LOCK_TIMEOUT'] = int(os.getenv('JOBS_LOCK_TIMEOUT', 300))
+    app.config['COUNTER_RECONCILE_INTERVAL'] = int(os.getenv('COUNTER_RECONCILE_INTERVAL', 86400))  # 0 disables
+    # Geocoding cache and Nominatim client (see explore/geocoding.py)
+    app.config['GEOCODER_USER_AGENT'] = os.getenv('GEOCODER_USER_AGENT', 'go_tripping')
+    app.config['GEOCODER_TIMEOUT'] = float(os.getenv('GEOCODER_TIMEOUT', 5))
+    app.config['GEOCODER_MIN_INTERVAL'] = float(os.getenv('GEOCODER_MIN_INTERVAL', 1.0))
+    app.config['GEOCODE_CACHE_SIZE'] = int(os.getenv('GEOCODE_CACHE_SIZE', 10000))
+    app.config['GEOCODE_TTL'] = int(os.getenv('GEOCODE_TTL', 30 * 86400))
+    app.config['GEOCODE_MISS_TTL'] = int(os.getenv('GEOCODE_MISS_TTL', 3600))
+    app.config['GEOCODE_ERROR_TTL'] = int(os.getenv('GEOCODE_ERROR_TTL', 30))
+    # Google Places client and tile cache (see explore/places.py)
+    app.config['GOOGLE_PLACES_API_KEY'] = os.getenv('GOOGLE_PLACES_API_KEY')
+    app.config['PLACES_CONNECT_TIMEOUT'] = float(os.getenv('PLACES_CONNECT_TIMEOUT', 3.05))
+    app.config['PLACES_READ_TIMEOUT'] = float(os.getenv('PLACES_READ_TIMEOUT', 10))
+    app.config['PLACES_POOL_SIZE'] = int(os.getenv('PLACES_POOL_SIZE', 10))
+    app.config['PLACES_CACHE_SIZE'] = int(os.getenv('PLACES_CACHE_SIZE', 2048))
+    app.config['PLACES_CACHE_TTL'] = int(os.getenv('PLACES_CACHE_TTL', 600))
+    app.config['PLACES_MAX_PAGES'] = int(os.getenv('PLACES_MAX_PAGES', 1))  # >1 reads further pages on a miss
+    app.config['PLACES_PAGE_DELAY'] = float(os.getenv('PLACES_PAGE_DELAY', 2.0))
+    # Explore upstream guards: concurrency limit and circuit breaker (see common/upstream.py)
+    app.config['UPSTREAM_MAX_CONCURRENCY'] = int(os.getenv('UPSTREAM_MAX_CONCURRENCY', 8))
+    app.config['UPSTREAM_ACQUIRE_TIMEOUT'] = float(os.getenv('UPSTREAM_ACQUIRE_TIMEOUT', 0.5))
+    app.config['UPSTREAM_FAILURE_THRESHOLD'] = int(os.getenv('UPSTREAM_FAILURE_THRESHOLD', 5))
+    app.config['UPSTREAM_RESET_TIMEOUT'] = float(os.getenv('UPSTREAM_RESET_TIMEOUT', 30))
+    # Nearby-user grid (see auth/nearby.py)
+    app.config['NEARBY_REFRESH_INTERVAL'] = float(os.getenv('NEARBY_REFRESH_INTERVAL', 5.0))
+    # Request profiling, metrics endpoint and slow-request log (see common/profiling.py)
+    app.config['PROFILING_ENABLED'] = os.getenv('PROFILING_ENABLED', 'true').lower() == 'true'
+    app.config['PROFILING_HEADERS'] = os.getenv('PROFILING_HEADERS', 'false').lower() == 'true'  # always on in debug
+    app.config['PROFILING_SLOW_REQUEST_MS'] = float(os.getenv('PROFILING_SLOW_REQUEST_MS', 500))  # 0 disables
+    app.config['PROFILING_SLOW_MAX_STATEMENTS'] = int(os.getenv('PROFILING_SLOW_MAX_STATEMENTS', 50))
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')  # bearer token for /api/metrics, closed if unset
+    # Per-worker connection pool, ignored for SQLite (see common/db_pool.py)
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', os.getenv('GUNICORN_THREADS', 8)))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', 2))
+    app.config['DB_POOL_TIMEOUT'] = float(os.getenv('DB_POOL_TIMEOUT', 10))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    app.config['DB_POOL_PRE_PING'] = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
 
     # Initialize extensions with app
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    response_cache.init_app(app)
+
+    # Profile every request, including the blueprints' own hooks
+    from common.profiling import init_app as init_profiling
+    init_profiling(app)
 
     # Ensure sessions are always removed after each request
     @app.teardown_appcontext
@@ -47,10 +118,8 @@ def create_app():
     # Register JWT callbacks
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload: dict) -> bool:
-        from auth.models import TokenBlocklist
-        jti = jwt_payload["jti"]
-        token = db.session.query(TokenBlocklist.id).filter_by(jti=jti).scalar()
-        return token is not None
+        from auth.blocklist import is_token_revoked
+        return is_token_revoked(jwt_payload["jti"])
 
     # Import blueprints
     from auth.routes import auth_bp, init_app as init_auth
@@ -62,6 +131,12 @@ def create_app():
     init_explore(app)
     init_community(app)
 
+    # Register management commands and inline job running
+    from common.commands import init_app as init_commands
+    from jobs.queue import init_app as init_jobs
+    init_commands(app)
+    init_jobs(app)
+
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,147 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from auth.models import TokenBlocklist, db
+from common.cache import BloomFilter, LRUCache
+
+class BlocklistCache:
+    """Per-worker view of the token blocklist that avoids a query per request.
+
+    A Bloom filter holds every revoked JTI that can still be presented (those
+    younger than the token lifetime). A JTI the filter has never seen is not
+    revoked, which answers the common case without touching the database.
+    Filter hits are confirmed against the table and the answer is kept in a
+    bounded LRU with a TTL.
+
+    Other workers learn about new revocations by polling, at most once every
+    ``poll_interval`` seconds, for rows created since the previous poll. The
+    window reaches back ``catch_up_window`` seconds further, so rows whose
+    insert committed late (ids and timestamps are assigned before commit) or
+    came from a worker with a skewed clock are still picked up. A token
+    revoked on another worker is therefore honoured here within the poll
+    interval.
+
+    The filter is rebuilt from the table once more JTIs have been added than
+    it was sized for, which also drops the rows pruned since the last build.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001, cache_size=10000,
+                 cache_ttl=300, poll_interval=1.0, token_lifetime=None, catch_up_window=60):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.poll_interval = poll_interval
+        self.token_lifetime = token_lifetime
+        self.catch_up_window = timedelta(seconds=catch_up_window)
+        self._cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self._bloom = None
+        self._synced_at = None
+        self._last_poll = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        self._sync()
+        if jti not in self._bloom:
+            return False
+        revoked = self._cache.get(jti)
+        if revoked is None:
+            revoked = db.session.query(TokenBlocklist.id).filter_by(jti=jti).scalar() is not None
+            self._cache.set(jti, revoked)
+        return revoked
+
+    def add(self, jti):
+        """Record a revocation made by this worker so it applies immediately."""
+        self._sync()
+        with self._lock:
+            if jti not in self._bloom:
+                self._bloom.add(jti)
+        self._cache.set(jti, True)
+
+    def _sync(self):
+        now = time.monotonic()
+        # Threads arriving while the first load is running must not skip to a missing filter
+        if self._bloom is not None and self._last_poll is not None \
+                and now - self._last_poll < self.poll_interval:
+            return
+        self._last_poll = now
+        with self._lock:
+            if self._bloom is None or self._bloom.count > self._bloom.capacity:
+                self._reload()
+            else:
+                self._catch_up()
+
+    def _catch_up(self):
+        started = datetime.utcnow()
+        rows = db.session.query(TokenBlocklist.jti) \
+            .filter(TokenBlocklist.created_at >= self._synced_at - self.catch_up_window)
+        for (jti,) in rows:
+            # Rows stay in the window for several polls; count each JTI once
+            if jti not in self._bloom:
+                self._bloom.add(jti)
+            # Overrides a "not revoked" answer cached while this was a false positive
+            self._cache.set(jti, True)
+        self._synced_at = started
+
+    def _reload(self):
+        started = datetime.utcnow()
+        query = db.session.query(TokenBlocklist.jti)
+        if self.token_lifetime:
+            # Older tokens have expired and are rejected before the blocklist is consulted
+            query = query.filter(TokenBlocklist.created_at >= started - self.token_lifetime)
+        jtis = [jti for (jti,) in query]
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._cache.clear()
+        self._synced_at = started
+
+def get_blocklist_cache():
+    """Return the blocklist cache of the current app, creating it on first use."""
+    cache = current_app.extensions.get('blocklist_cache')
+    if cache is None:
+        config = current_app.config
+        token_lifetime = config.get('JWT_ACCESS_TOKEN_EXPIRES')
+        cache = BlocklistCache(
+            capacity=config['BLOCKLIST_BLOOM_CAPACITY'],
+            error_rate=config['BLOCKLIST_BLOOM_ERROR_RATE'],
+            cache_size=config['BLOCKLIST_CACHE_SIZE'],
+            cache_ttl=config['BLOCKLIST_CACHE_TTL'],
+            poll_interval=config['BLOCKLIST_POLL_INTERVAL'],
+            catch_up_window=config['BLOCKLIST_CATCH_UP_WINDOW'],
+            token_lifetime=token_lifetime if isinstance(token_lifetime, timedelta) else None
+        )
+        current_app.extensions['blocklist_cache'] = cache
+    return cache
+
+def is_token_revoked(jti):
+    return get_blocklist_cache().is_revoked(jti)
+
+def prune_blocklist(max_age=None, batch_size=1000):
+    """Delete blocklist rows older than max_age in batches of batch_size.
+
+    max_age defaults to the access token lifetime; a revoked token older than
+    that has expired anyway. Each batch is its own short transaction so the
+    table is never locked for long. Returns the number of rows removed.
+    """
+    if max_age is None:
+        max_age = current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES')
+    if not isinstance(max_age, timedelta):
+        # Tokens never expire, so every revocation must be kept
+        return 0
+
+    cutoff = datetime.utcnow() - max_age
+    removed = 0
+    while True:
+        ids = [id for (id,) in db.session.query(TokenBlocklist.id)
+               .filter(TokenBlocklist.created_at < cutoff)
+               .order_by(TokenBlocklist.created_at)
+               .limit(batch_size)]
+        if not ids:
+            break
+        TokenBlocklist.query.filter(TokenBlocklist.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        removed += len(ids)
+        if len(ids) < batch_size:
+            break
+    return removed
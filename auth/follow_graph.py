@@ -0,0 +1,54 @@
+"""Set-based operations on the follow graph (the ``followers`` table).
+
+Every function here is a single statement, so callers can check or change
+any number of relationships without loading User objects or relationship
+collections.
+"""
+from auth.models import User, followers, db
+from common.counters import adjust_counters
+from common.sql import insert_ignoring_duplicates
+
+def is_following(follower_id, followed_id):
+    return db.session.query(
+        db.exists().where(followers.c.follower_id == follower_id)
+                   .where(followers.c.followed_id == followed_id)
+    ).scalar()
+
+def followed_ids(viewer_id, user_ids):
+    """Return the subset of user_ids that viewer_id follows, in one query."""
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return set()
+    rows = db.session.query(followers.c.followed_id).filter(
+        followers.c.follower_id == viewer_id,
+        followers.c.followed_id.in_(user_ids)
+    )
+    return {followed_id for (followed_id,) in rows}
+
+def follow(follower_id, followed_id):
+    """Make follower_id follow followed_id; returns False if it already did.
+
+    Users never follow themselves; a user's own posts reach their feed
+    explicitly, not through a self-follow row.
+    """
+    if follower_id == followed_id:
+        return False
+    inserted = insert_ignoring_duplicates(followers, {'follower_id': follower_id, 'followed_id': followed_id})
+    if inserted:
+        _adjust_counters(follower_id, followed_id, 1)
+    return bool(inserted)
+
+def unfollow(follower_id, followed_id):
+    """Remove the relationship; returns False if there was none."""
+    deleted = db.session.execute(
+        followers.delete()
+        .where(followers.c.follower_id == follower_id)
+        .where(followers.c.followed_id == followed_id)
+    ).rowcount
+    if deleted:
+        _adjust_counters(follower_id, followed_id, -1)
+    return bool(deleted)
+
+def _adjust_counters(follower_id, followed_id, delta):
+    adjust_counters(User, follower_id, following_count=delta)
+    adjust_counters(User, followed_id, followers_count=delta)
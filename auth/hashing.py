@@ -0,0 +1,94 @@
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from flask import current_app
+
+_COST_PATTERN = re.compile(r'^\$2[abxy]?\$(\d{2})\$')
+
+class HashingPoolFull(Exception):
+    """Raised when too many password hashes are queued or one waited too long."""
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check_password(pw_hash, password):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), pw_hash.encode('utf-8'))
+    except ValueError:
+        # Not a bcrypt hash (or a password bcrypt refuses), so it cannot match
+        return False
+
+def _pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded process pool so hashing never pins a request worker.
+
+    At most ``pool_size`` hashes run at once and ``queue_depth`` more may wait;
+    beyond that HashingPoolFull is raised straight away so the caller can shed
+    load instead of queueing. A hash that has not finished within ``timeout``
+    seconds raises it too. A pool_size of 0 hashes inline.
+
+    Pool processes are started with forkserver (spawn where that is not
+    available): forking a threaded server worker can copy locks held by its
+    other threads into the child, which then deadlocks on them.
+    """
+
+    def __init__(self, rounds=12, pool_size=2, queue_depth=8, timeout=10):
+        self.rounds = rounds
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(pool_size + queue_depth) if pool_size else None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _run(self, fn, *args):
+        if not self.pool_size:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolFull()
+        try:
+            with self._lock:
+                if self._executor is None:
+                    # Created lazily so each forked server worker gets its own pool
+                    self._executor = ProcessPoolExecutor(max_workers=self.pool_size,
+                                                         mp_context=_pool_context())
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A hash still queued is dropped; a running one keeps its slot until it ends
+            future.cancel()
+            raise HashingPoolFull()
+
+    def generate_password_hash(self, password):
+        return self._run(_hash_password, password, self.rounds)
+
+    def check_password_hash(self, pw_hash, password):
+        return self._run(_check_password, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """Whether a hash was made with a cost other than the configured one."""
+        match = _COST_PATTERN.match(pw_hash or '')
+        return match is None or int(match.group(1)) != self.rounds
+
+def get_password_hasher():
+    """Return the password hasher of the current app, creating it on first use."""
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is None:
+        config = current_app.config
+        hasher = PasswordHasher(
+            rounds=config['BCRYPT_LOG_ROUNDS'],
+            pool_size=config['BCRYPT_POOL_SIZE'],
+            queue_depth=config['BCRYPT_QUEUE_DEPTH'],
+            timeout=config['BCRYPT_TIMEOUT']
+        )
+        current_app.extensions['password_hasher'] = hasher
+    return hasher
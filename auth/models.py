@@ -5,7 +5,12 @@ from app import db
 # Association table for user following
 followers = db.Table('followers',
     db.Column('follower_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('followed_id', db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    db.Column('followed_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    # When the follow happened; follower and following listings are newest first by it
+    db.Column('created_at', db.DateTime, nullable=False, default=datetime.utcnow,
+              server_default=db.func.now()),
+    db.Index('ix_followers_followed_id_created_at', 'followed_id', 'created_at', 'follower_id'),
+    db.Index('ix_followers_follower_id_created_at', 'follower_id', 'created_at', 'followed_id')
 )
 
 class User(db.Model):
@@ -21,8 +26,13 @@ class User(db.Model):
     interests = db.Column(db.Text, nullable=True)  # Store as JSON string
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
-    createdAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Derived from latitude/longitude on every write; see auth.nearby
+    geohash = db.Column(db.String(12), nullable=True, index=True)
+    createdAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     updatedAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Denormalized counters, kept in sync by follow/unfollow (see common.counters)
+    followers_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    following_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # Following relationships
     following = db.relationship(
@@ -41,13 +51,6 @@ class User(db.Model):
         except json.JSONDecodeError:
             interests = []
         
-        # Adjust followers/following count to exclude self-follow
-        followers_count = self.followers.count()
-        following_count = self.following.count()
-        if self.is_following(self):
-            followers_count -= 1
-            following_count -= 1
-        
         return {
             'id': self.id,
             'name': self.name,
@@ -64,8 +67,8 @@ class User(db.Model):
             } if self.latitude is not None and self.longitude is not None else None,
             'createdAt': self.createdAt.isoformat() if self.createdAt else None,
             'updatedAt': self.updatedAt.isoformat() if self.updatedAt else None,
-            'followers_count': followers_count,
-            'following_count': following_count
+            'followers_count': self.followers_count,
+            'following_count': self.following_count
         }
 
     def update_from_dict(self, data):
@@ -115,22 +118,31 @@ class User(db.Model):
                 except (ValueError, TypeError):
                     raise ValueError("Invalid location format")
 
+    # The follow graph lives in auth.follow_graph; these wrap it for one user
     def follow(self, user):
-        if not self.is_following(user):
-            self.following.append(user)
-            return True
-        return False
+        from auth import follow_graph
+        return follow_graph.follow(self.id, user.id)
 
     def unfollow(self, user):
-        if self.is_following(user):
-            self.following.remove(user)
-            return True
-        return False
+        from auth import follow_graph
+        return follow_graph.unfollow(self.id, user.id)
 
     def is_following(self, user):
-        return self.following.filter(followers.c.followed_id == user.id).count() > 0
+        from auth import follow_graph
+        return follow_graph.is_following(self.id, user.id)
+
+GEOHASH_PRECISION = 9  # Cells of about 5 m
+
+@db.event.listens_for(User, 'before_insert')
+@db.event.listens_for(User, 'before_update')
+def sync_geohash(mapper, connection, user):
+    from common.geo import geohash_encode
+    if user.latitude is not None and user.longitude is not None:
+        user.geohash = geohash_encode(user.latitude, user.longitude, GEOHASH_PRECISION)
+    else:
+        user.geohash = None
 
 class TokenBlocklist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     jti = db.Column(db.String(36), nullable=False, unique=True)
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) 
\ No newline at end of file
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True) 
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""Nearby-user search over an in-memory geohash grid.
+
+Every located user has a geohash (User.geohash, kept in sync on write and
+indexed). Each process keeps a grid of user positions bucketed by the
+first GRID_PRECISION characters of that geohash and refreshes it
+incrementally from rows whose updatedAt moved since the last refresh.
+
+A radius query only visits the grid cells covering the circle's bounding
+box and refines the candidates with exact haversine distance. A k-nearest
+query searches a growing radius until it has k users inside it, so both
+touch a number of users proportional to the answer rather than the table.
+"""
+import threading
+import time
+from datetime import timedelta
+from flask import current_app
+from auth.models import User, db
+from common.geo import EARTH_RADIUS_M, cell_size_m, covering_cell_count, covering_cells, distances_from
+
+GRID_PRECISION = 5  # Cells of about 4.9 km
+MAX_CELLS = 5000  # Beyond this many cells a linear scan is cheaper
+MAX_RADIUS_M = 3.15 * EARTH_RADIUS_M  # Wider than any great-circle distance
+
+class UserGrid:
+    def __init__(self, precision=GRID_PRECISION, refresh_interval=5.0):
+        self.precision = precision
+        self.refresh_interval = refresh_interval
+        self._cells = {}  # cell -> {user_id: (lat, lng)}
+        self._user_cells = {}  # user_id -> cell
+        self._watermark = None
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._user_cells)
+
+    def refresh(self, force=False):
+        """Apply user rows changed since the last refresh, at most once per interval."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._refreshed_at is not None \
+                    and now - self._refreshed_at < self.refresh_interval:
+                return
+            self._refreshed_at = now
+            query = db.session.query(User.id, User.geohash, User.latitude, User.longitude, User.updatedAt)
+            if self._watermark is not None:
+                # Overlap the window so rows committed late with older timestamps are not missed
+                query = query.filter(User.updatedAt >= self._watermark - timedelta(seconds=self.refresh_interval + 1))
+            for user_id, geohash, lat, lng, updated_at in query:
+                self._place(user_id, geohash[:self.precision] if geohash else None, lat, lng)
+                if self._watermark is None or updated_at > self._watermark:
+                    self._watermark = updated_at
+
+    def _place(self, user_id, cell, lat, lng):
+        old_cell = self._user_cells.pop(user_id, None)
+        if old_cell is not None:
+            self._cells[old_cell].pop(user_id, None)
+            if not self._cells[old_cell]:
+                del self._cells[old_cell]
+        if cell is not None:
+            self._cells.setdefault(cell, {})[user_id] = (lat, lng)
+            self._user_cells[user_id] = cell
+
+    def _candidates(self, lat, lng, radius_m):
+        if covering_cell_count(lat, radius_m, self.precision) > MAX_CELLS:
+            cells = list(self._cells.values())
+        else:
+            cells = [self._cells[cell] for cell in covering_cells(lat, lng, radius_m, self.precision)
+                     if cell in self._cells]
+        return [(user_id, position) for members in cells for user_id, position in members.items()]
+
+    def within(self, lat, lng, radius_m, limit=None, exclude=None):
+        """Return [(user_id, distance_m)] within radius_m, nearest first."""
+        self.refresh()
+        return self._search(lat, lng, radius_m, limit, exclude)
+
+    def _search(self, lat, lng, radius_m, limit, exclude):
+        with self._lock:
+            candidates = [c for c in self._candidates(lat, lng, radius_m) if c[0] != exclude]
+        distances = distances_from(lat, lng, [position for _, position in candidates])
+        found = sorted((distance, user_id) for (user_id, _), distance in zip(candidates, distances)
+                       if distance <= radius_m)
+        return [(user_id, distance) for distance, user_id in found[:limit]]
+
+    def nearest(self, lat, lng, k, exclude=None):
+        """Return the k nearest users as [(user_id, distance_m)], nearest first."""
+        self.refresh()
+        radius = max(cell_size_m(self.precision))
+        while True:
+            found = self._search(lat, lng, radius, k, exclude)
+            if len(found) >= k or radius >= MAX_RADIUS_M:
+                return found
+            radius = min(radius * 4, MAX_RADIUS_M)
+
+def get_user_grid():
+    """Return the user grid of the current app, creating it on first use."""
+    grid = current_app.extensions.get('user_grid')
+    if grid is None:
+        grid = UserGrid(refresh_interval=current_app.config['NEARBY_REFRESH_INTERVAL'])
+        current_app.extensions['user_grid'] = grid
+    return grid
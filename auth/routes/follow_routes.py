@@ -1,45 +1,73 @@
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from auth.models import User, db
+from auth.models import User, db, followers
+from auth import follow_graph
+from common.pagination import get_page_args, keyset_paginate
+from common.response_cache import response_cache
+from community import feed
 from . import auth_bp
 
+def invalidate_follow_pair(follower_id, followed_id):
+    # Both users' counts change, and user posts embed their author
+    response_cache.invalidate(f'user:{follower_id}', f'user:{followed_id}',
+                              f'user_posts:{follower_id}', f'user_posts:{followed_id}')
+
+def follow_page(user_id, listed_column, other_column, cursor, per_page):
+    """One page of the users on listed_column's side of user_id's follows, newest follow first."""
+    query = db.session.query(User, followers.c.created_at, listed_column) \
+        .join(followers, listed_column == User.id).filter(other_column == user_id)
+    rows, next_cursor = keyset_paginate(query, followers.c.created_at, listed_column, cursor, per_page)
+    return [user.to_dict() for user, _, _ in rows], next_cursor
+
 @auth_bp.route('/users/<int:user_id>/follow', methods=['POST'])
 @jwt_required()
 def follow_user(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get_or_404(current_user_id)
+    current_user_id = int(get_jwt_identity())
     user_to_follow = User.query.get_or_404(user_id)
     
     if current_user_id == user_id:
         return jsonify({'error': 'You cannot follow yourself'}), 400
     
-    if current_user.follow(user_to_follow):
+    if follow_graph.follow(current_user_id, user_id):
+        feed.schedule_rebuild(current_user_id)
         db.session.commit()
+        invalidate_follow_pair(current_user_id, user_id)
         return jsonify({'message': f'Successfully followed {user_to_follow.name}'}), 200
     return jsonify({'message': f'Already following {user_to_follow.name}'}), 200
 
 @auth_bp.route('/users/<int:user_id>/unfollow', methods=['POST'])
 @jwt_required()
 def unfollow_user(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get_or_404(current_user_id)
+    current_user_id = int(get_jwt_identity())
     user_to_unfollow = User.query.get_or_404(user_id)
     
-    if current_user.unfollow(user_to_unfollow):
+    if follow_graph.unfollow(current_user_id, user_id):
+        feed.schedule_rebuild(current_user_id)
         db.session.commit()
+        invalidate_follow_pair(current_user_id, user_id)
         return jsonify({'message': f'Successfully unfollowed {user_to_unfollow.name}'}), 200
     return jsonify({'message': f'Not following {user_to_unfollow.name}'}), 200
 
 @auth_bp.route('/users/<int:user_id>/followers', methods=['GET'])
 @jwt_required()
 def get_followers(user_id):
-    user = User.query.get_or_404(user_id)
-    followers = [follower.to_dict() for follower in user.followers]
-    return jsonify({'followers': followers}), 200
+    User.query.get_or_404(user_id)
+    try:
+        cursor, per_page = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    users, next_cursor = follow_page(user_id, followers.c.follower_id, followers.c.followed_id,
+                                     cursor, per_page)
+    return jsonify({'followers': users, 'next_cursor': next_cursor}), 200
 
 @auth_bp.route('/users/<int:user_id>/following', methods=['GET'])
 @jwt_required()
 def get_following(user_id):
-    user = User.query.get_or_404(user_id)
-    following = [followed.to_dict() for followed in user.following]
-    return jsonify({'following': following}), 200 
\ No newline at end of file
+    User.query.get_or_404(user_id)
+    try:
+        cursor, per_page = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    users, next_cursor = follow_page(user_id, followers.c.followed_id, followers.c.follower_id,
+                                     cursor, per_page)
+    return jsonify({'following': users, 'next_cursor': next_cursor}), 200 
\ No newline at end of file
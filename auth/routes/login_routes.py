@@ -1,12 +1,10 @@
 from flask import request, jsonify
 from flask_jwt_extended import create_access_token
-from flask_bcrypt import Bcrypt
 from auth.models import User
+from auth.hashing import HashingPoolFull, get_password_hasher
 from . import auth_bp
 from app import db
 
-bcrypt = Bcrypt()
-
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
@@ -17,10 +15,18 @@ def login():
     email = data['email']
     password = data['password']
 
+    hasher = get_password_hasher()
     try:
         user = User.query.filter_by(email=email).first()
         
-        if user and bcrypt.check_password_hash(user.password, password):
+        if user and hasher.check_password_hash(user.password, password):
+            if hasher.needs_rehash(user.password):
+                # Upgrade the stored hash to the configured cost; best effort under load
+                try:
+                    user.password = hasher.generate_password_hash(password)
+                    db.session.commit()
+                except HashingPoolFull:
+                    pass
             # Convert user.id to string for JWT token
             access_token = create_access_token(identity=str(user.id))
             return jsonify({
@@ -29,5 +35,7 @@ def login():
             }), 200
         
         return jsonify({'error': 'Invalid email or password'}), 401
+    except HashingPoolFull:
+        return jsonify({'error': 'Server is busy, please retry shortly'}), 503, {'Retry-After': '1'}
     finally:
         db.session.close()
\ No newline at end of file
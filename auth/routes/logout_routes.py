@@ -2,6 +2,7 @@ from flask import jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from datetime import datetime, timezone
 from auth.models import db, TokenBlocklist
+from auth.blocklist import get_blocklist_cache
 from . import auth_bp
 
 @auth_bp.route('/logout', methods=['POST'])
@@ -11,4 +12,5 @@ def logout():
     now = datetime.now(timezone.utc)
     db.session.add(TokenBlocklist(jti=jti, created_at=now))
     db.session.commit()
+    get_blocklist_cache().add(jti)
     return jsonify({'message': 'Successfully logged out'}), 200 
\ No newline at end of file
@@ -1,8 +1,16 @@
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from auth.models import db, User
+from auth import follow_graph
+from auth.nearby import get_user_grid
+from common.pagination import get_page_args, keyset_paginate
+from common.response_cache import response_cache
 from . import auth_bp
 
+def user_version(user_id):
+    return db.session.query(User.updatedAt, User.followers_count, User.following_count) \
+        .filter(User.id == user_id).first()
+
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
@@ -35,6 +43,7 @@ def update_profile():
     try:
         user.update_from_dict(data)
         db.session.commit()
+        response_cache.invalidate(f'user:{user.id}', f'user_posts:{user.id}')
         response = jsonify({
             'message': 'Profile updated successfully',
             'user': user.to_dict()
@@ -54,26 +63,25 @@ def update_profile():
 @jwt_required()
 def get_all_users():
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(int(current_user_id))
+        current_user_id = int(get_jwt_identity())
         # Get pagination parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        # Query users with pagination
-        paginated_users = User.query.paginate(page=page, per_page=per_page, error_out=False)
-        # Prepare response
+        try:
+            cursor, per_page = get_page_args(default_per_page=10)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        # Query one page of users after the cursor
+        users, next_cursor = keyset_paginate(User.query, User.createdAt, User.id, cursor, per_page)
+        # Prepare response, checking follow state for the whole page at once
+        following = follow_graph.followed_ids(current_user_id, [user.id for user in users])
         users_data = []
-        for user in paginated_users.items:
+        for user in users:
             user_dict = user.to_dict()
-            user_dict['is_following'] = current_user.is_following(user) if user.id != current_user_id else False
+            user_dict['is_following'] = user.id in following and user.id != current_user_id
             users_data.append(user_dict)
         return jsonify({
             'users': users_data,
-            'total': paginated_users.total,
-            'pages': paginated_users.pages,
-            'current_page': page,
-            'has_next': paginated_users.has_next,
-            'has_prev': paginated_users.has_prev
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -82,7 +90,43 @@ def get_all_users():
 
 @auth_bp.route('/users/<int:user_id>', methods=['GET'])
 @jwt_required()
+@response_cache.cached(lambda user_id: f'user:{user_id}', version=user_version)
 def get_user_by_id(user_id):
-    from auth.models import User
     user = User.query.get_or_404(user_id)
-    return jsonify(user.to_dict()), 200 
\ No newline at end of file
+    return jsonify(user.to_dict()), 200
+
+@auth_bp.route('/users/nearby', methods=['GET'])
+@jwt_required()
+def get_nearby_users():
+    current_user_id = int(get_jwt_identity())
+    try:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+        radius = request.args.get('radius', type=float)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    except (KeyError, ValueError):
+        return jsonify({'error': 'lat and lng are required and must be numbers'}), 400
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or (radius is not None and radius <= 0):
+        return jsonify({'error': 'Invalid latitude/longitude or radius'}), 400
+
+    try:
+        # Without a radius this is a k-nearest query
+        grid = get_user_grid()
+        if radius is None:
+            found = grid.nearest(lat, lng, limit, exclude=current_user_id)
+        else:
+            found = grid.within(lat, lng, radius, limit=limit, exclude=current_user_id)
+        # Public fields only: any signed-in user can call this for any point
+        users = {user.id: user for user in db.session.query(User.id, User.name, User.avatarUrl)
+                 .filter(User.id.in_([user_id for user_id, _ in found]))}
+        users_data = []
+        for user_id, distance in found:
+            if user_id in users:
+                user = users[user_id]
+                users_data.append({'id': user.id, 'name': user.name, 'avatarUrl': user.avatarUrl,
+                                   'distance_m': round(distance, 1)})
+        return jsonify({'users': users_data}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        db.session.close()
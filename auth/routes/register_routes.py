@@ -1,11 +1,9 @@
 from flask import request, jsonify
-from flask_bcrypt import Bcrypt
 from auth.models import User
+from auth.hashing import HashingPoolFull, get_password_hasher
 from . import auth_bp
 from app import db
 
-bcrypt = Bcrypt()
-
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -22,7 +20,7 @@ def register():
             return jsonify({'error': 'Email already exists'}), 400
         
         # Create new user
-        hashed_password = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+        hashed_password = get_password_hasher().generate_password_hash(data['password'])
         new_user = User(
             name=data['name'],
             email=data['email'],
@@ -31,10 +29,9 @@ def register():
         
         db.session.add(new_user)
         db.session.commit()
-        # Make the user follow themselves
-        new_user.follow(new_user)
-        db.session.commit()
         
         return jsonify({'message': 'User created successfully'}), 201
+    except HashingPoolFull:
+        return jsonify({'error': 'Server is busy, please retry shortly'}), 503, {'Retry-After': '1'}
     finally:
         db.session.close()
\ No newline at end of file
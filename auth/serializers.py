@@ -0,0 +1,9 @@
+from auth.models import User
+
+def serialize_users_by_id(user_ids):
+    """Load and serialize users in one query, returning {user_id: dict}."""
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return {}
+    users = User.query.filter(User.id.in_(user_ids)).all()
+    return {user.id: user.to_dict() for user in users}
@@ -0,0 +1 @@
+# Load-testing and benchmark suite; see benchmarks/__main__.py for usage
@@ -0,0 +1,120 @@
+"""Benchmark command line.
+
+    python -m benchmarks seed --scale 1 [--seed 0] [--reset]
+    python -m benchmarks run --scale 1 --start-server [--concurrency 16] [--duration 20]
+    python -m benchmarks compare baseline.json current.json
+
+`seed` fills the database named by DATABASE_URL. `run` drives a server at
+--url, or starts one under gunicorn with --start-server against the same
+DATABASE_URL, and writes its results as JSON for `compare`.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from datetime import datetime
+from benchmarks.load import ROOT, SCENARIOS, compare, local_server, run_scenario
+
+def seed_command(args):
+    from app import create_app, db
+    from benchmarks.dataset import seed_database
+
+    app = create_app()
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+        counts = seed_database(scale=args.scale, seed=args.seed, batch_size=args.batch_size)
+    for table, count in counts.items():
+        print(f'{table}: {count} row(s)')
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_command(args):
+    from benchmarks.dataset import dataset_size
+
+    size = dataset_size(args.scale)
+    names = args.scenarios.split(',') if args.scenarios else list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    def run_all(base_url):
+        scenarios = {}
+        for name in names:
+            scenarios[name] = run_scenario(base_url, name, size, concurrency=args.concurrency,
+                                           duration=args.duration, warmup=args.warmup, seed=args.seed)
+            summary = scenarios[name]
+            print(f"{name:12} {summary['rps']:>9} req/s  p50 {summary['p50_ms']} ms  "
+                  f"p95 {summary['p95_ms']} ms  p99 {summary['p99_ms']} ms  errors {summary['errors']}")
+        return scenarios
+
+    if args.start_server:
+        with local_server(args.bind) as base_url:
+            scenarios = run_all(base_url)
+    else:
+        scenarios = run_all(args.url.rstrip('/'))
+
+    started = datetime.utcnow()
+    results = {
+        'created_at': started.isoformat(),
+        'commit': _git_commit(),
+        'scale': args.scale,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'scenarios': scenarios
+    }
+    output = args.output or f"benchmark-{started.strftime('%Y%m%dT%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to {output}')
+
+def compare_command(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    print(f"{'scenario':12} {'metric':7} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, metric, before, after, change in compare(baseline, current):
+        change = f'{change:+.1f}%' if change is not None else '-'
+        print(f'{name:12} {metric:7} {before!s:>10} {after!s:>10} {change:>8}')
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the API')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed = commands.add_parser('seed', help='Seed a synthetic dataset into DATABASE_URL')
+    seed.add_argument('--scale', type=float, default=1.0, help='Dataset scale (1 = 1,000 users)')
+    seed.add_argument('--seed', type=int, default=0, help='Random seed')
+    seed.add_argument('--batch-size', type=int, default=1000, help='Rows per insert batch')
+    seed.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    seed.set_defaults(func=seed_command)
+
+    run = commands.add_parser('run', help='Run the load scenarios')
+    run.add_argument('--scale', type=float, default=1.0, help='Scale the database was seeded at')
+    run.add_argument('--seed', type=int, default=0, help='Random seed for request choices')
+    run.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of a running server')
+    run.add_argument('--start-server', action='store_true', help='Start gunicorn locally for the run')
+    run.add_argument('--bind', default='127.0.0.1:8000', help='Address for --start-server')
+    run.add_argument('--scenarios', help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    run.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+    run.add_argument('--duration', type=float, default=10.0, help='Measured seconds per scenario')
+    run.add_argument('--warmup', type=float, default=2.0, help='Unmeasured seconds per scenario')
+    run.add_argument('--output', help='Results file (default benchmark-<timestamp>.json)')
+    run.set_defaults(func=run_command)
+
+    compare_parser = commands.add_parser('compare', help='Compare two results files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.set_defaults(func=compare_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""Synthetic dataset for benchmark runs, sized by a scale factor.
+
+Scale 1 is 1,000 users, 20 communities and 5,000 posts, plus the follows,
+memberships, comments, reactions, images and bookmarks that
+common/seed.py generates for them. Text comes from the Faker instance the
+tests use, reseeded, so a scale and seed always give the same rows, and a
+load run at the same scale knows which ids exist.
+"""
+from common.seed import PASSWORD, SyntheticData, bulk_load, email_for
+from tests.conftest import fake
+
+USERS_PER_SCALE = 1000
+COMMUNITIES_PER_SCALE = 20
+
+def dataset_size(scale):
+    """Number of users, communities and posts seeded at a scale."""
+    users = max(int(USERS_PER_SCALE * scale), 10)
+    communities = max(int(COMMUNITIES_PER_SCALE * scale), 2)
+    data = SyntheticData(users=users, communities=communities)
+    return {'users': users, 'communities': communities, 'posts': data.posts}
+
+def seed_database(scale=1.0, seed=0, batch_size=1000):
+    """Fill an empty database with the dataset for a scale; returns rows per table.
+
+    Runs inside an app context.
+    """
+    size = dataset_size(scale)
+    fake.seed_instance(seed)
+    data = SyntheticData(users=size['users'], communities=size['communities'], seed=seed, text=fake)
+    return bulk_load(data, batch_size=batch_size)
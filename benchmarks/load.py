@@ -0,0 +1,160 @@
+"""Concurrent load against a running API, with latency and throughput statistics.
+
+Each scenario runs on its own: ``concurrency`` client threads, each logged
+in as a different seeded user, send requests back to back for ``warmup``
+plus ``duration`` seconds. Only requests that start after the warmup are
+measured. Responses of 400 and above count as errors.
+"""
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+import requests
+from benchmarks.dataset import PASSWORD, email_for
+
+ROOT = Path(__file__).resolve().parent.parent
+
+class Client:
+    def __init__(self, base_url, size, rng):
+        self.base_url = base_url
+        self.size = size
+        self.rng = rng
+        self.session = requests.Session()
+        self.headers = {}
+
+    def random_user(self):
+        return self.rng.randint(1, self.size['users'])
+
+    def random_post(self):
+        return self.rng.randint(1, self.size['posts'])
+
+    def login(self, user_id):
+        return self.session.post(f'{self.base_url}/api/login',
+                                 json={'email': email_for(user_id), 'password': PASSWORD})
+
+    def authenticate(self):
+        response = self.login(self.random_user())
+        response.raise_for_status()
+        self.headers = {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+    def get(self, path):
+        return self.session.get(f'{self.base_url}{path}', headers=self.headers)
+
+    def post(self, path):
+        return self.session.post(f'{self.base_url}{path}', headers=self.headers)
+
+SCENARIOS = {
+    'feed': lambda client: client.get('/api/feed'),
+    'users': lambda client: client.get('/api/users'),
+    'post_detail': lambda client: client.get(f'/api/posts/{client.random_post()}'),
+    'login': lambda client: client.login(client.random_user()),
+    'reaction': lambda client: client.post(f'/api/posts/{client.random_post()}/like'),
+}
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(math.ceil(fraction * len(sorted_values)) - 1, 0)]
+
+def summarize(latencies, errors, elapsed):
+    """Latency percentiles in milliseconds and requests per second of one scenario."""
+    latencies = sorted(latencies)
+
+    def ms(seconds):
+        return round(seconds * 1000, 2) if seconds is not None else None
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else None,
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'max_ms': ms(latencies[-1]) if latencies else None
+    }
+
+def run_scenario(base_url, name, size, concurrency=8, duration=10.0, warmup=2.0, seed=0):
+    """Drive one scenario with concurrent clients and return its summary."""
+    scenario = SCENARIOS[name]
+    clients = [Client(base_url, size, random.Random(f'{seed}:{name}:{i}')) for i in range(concurrency)]
+    for client in clients:
+        client.authenticate()
+
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    start = time.perf_counter() + 0.1
+    measure_from, stop_at = start + warmup, start + warmup + duration
+
+    def drive(client):
+        measured, failed = [], 0
+        while time.perf_counter() < start:
+            time.sleep(0.001)
+        while True:
+            began = time.perf_counter()
+            if began >= stop_at:
+                break
+            try:
+                ok = scenario(client).status_code < 400
+            except requests.RequestException:
+                ok = False
+            if began >= measure_from:
+                measured.append(time.perf_counter() - began)
+                failed += not ok
+        with lock:
+            latencies.extend(measured)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=drive, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], duration)
+
+@contextmanager
+def local_server(bind='127.0.0.1:8000', env=None, timeout=30):
+    """Run the app under gunicorn with gunicorn.conf.py and yield its base URL."""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', bind, 'app:create_app()'],
+        cwd=ROOT, env={**os.environ, **(env or {})}
+    )
+    base_url = f'http://{bind}'
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'gunicorn exited with code {process.returncode}')
+            try:
+                requests.get(f'{base_url}/api/metrics', timeout=1)
+                break
+            except requests.RequestException:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f'gunicorn did not answer on {bind} within {timeout}s')
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def compare(baseline, current):
+    """Per-scenario changes between two result files: [(scenario, metric, old, new, change %)]."""
+    rows = []
+    for name, new in current['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        for metric in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            before, after = old.get(metric), new.get(metric)
+            change = round((after - before) / before * 100, 1) if before and after is not None else None
+            rows.append((name, metric, before, after, change))
+    return rows
@@ -0,0 +1 @@
+# Shared helpers package 
@@ -0,0 +1,75 @@
+import click
+from flask.cli import with_appcontext
+
+@click.command('reconcile-counters')
+@with_appcontext
+def reconcile_counters_command():
+    """Repair drift in the denormalized counter columns."""
+    from common.counters import reconcile_counters
+
+    for counter, repaired in reconcile_counters().items():
+        click.echo(f'{counter}: {repaired} row(s) repaired')
+
+@click.command('prune-blocklist')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows deleted per transaction.')
+@click.option('--max-age', type=int, default=None,
+              help='Age in seconds beyond which rows are deleted (defaults to the token lifetime).')
+@with_appcontext
+def prune_blocklist_command(batch_size, max_age):
+    """Delete token blocklist rows for tokens that have already expired."""
+    from datetime import timedelta
+    from auth.blocklist import prune_blocklist
+
+    removed = prune_blocklist(
+        max_age=timedelta(seconds=max_age) if max_age is not None else None,
+        batch_size=batch_size
+    )
+    click.echo(f'Removed {removed} expired token blocklist row(s)')
+
+@click.command('rebuild-feeds')
+@with_appcontext
+def rebuild_feeds_command():
+    """Rebuild every user's fan-out timeline, e.g. after enabling FEED_FANOUT_ENABLED."""
+    from auth.models import User, db
+    from community.feed import rebuild_timeline
+
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+    entries = sum(rebuild_timeline(user_id) for user_id in user_ids)
+    click.echo(f'Rebuilt {len(user_ids)} timeline(s) with {entries} entries')
+
+@click.command('seed-data')
+@click.option('--users', default=10000, show_default=True, help='Users to generate.')
+@click.option('--communities', type=int, default=None, help='Communities to generate (defaults to users / 50).')
+@click.option('--follows-per-user', default=20, show_default=True)
+@click.option('--posts-per-user', default=5, show_default=True)
+@click.option('--comments-per-post', default=3, show_default=True, help='Average comments per post.')
+@click.option('--reactions-per-post', default=8, show_default=True, help='Largest typical reactions per post.')
+@click.option('--seed', default=0, show_default=True, help='Random seed; the same seed gives the same rows.')
+@click.option('--batch-size', default=10000, show_default=True, help='Rows per COPY or executemany batch.')
+@click.option('--keep-indexes', is_flag=True, help='Load with the secondary indexes in place.')
+@with_appcontext
+def seed_data_command(users, communities, follows_per_user, posts_per_user, comments_per_post,
+                      reactions_per_post, seed, batch_size, keep_indexes):
+    """Bulk-load a deterministic synthetic dataset into an empty database."""
+    import time
+    from common.seed import PASSWORD, SyntheticData, bulk_load
+
+    data = SyntheticData(
+        users=users,
+        communities=communities if communities is not None else max(users // 50, 1),
+        follows_per_user=follows_per_user,
+        posts_per_user=posts_per_user,
+        comments_per_post=comments_per_post,
+        reactions_per_post=reactions_per_post,
+        seed=seed
+    )
+    started = time.monotonic()
+    for table, count in bulk_load(data, batch_size=batch_size, drop_indexes=not keep_indexes).items():
+        click.echo(f'{table}: {count} row(s)')
+    click.echo(f'Loaded in {time.monotonic() - started:.1f}s; every user\'s password is {PASSWORD!r}')
+
+def init_app(app):
+    app.cli.add_command(reconcile_counters_command)
+    app.cli.add_command(prune_blocklist_command)
+    app.cli.add_command(rebuild_feeds_command)
+    app.cli.add_command(seed_data_command)
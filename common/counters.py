@@ -0,0 +1,59 @@
+from app import db
+
+def adjust_counters(model, id, **deltas):
+    """Add deltas to counter columns of one row as part of the current transaction.
+
+    The increment happens in SQL (``col = col + delta``) so concurrent
+    requests cannot lose updates the way a read-modify-write would.
+    """
+    values = {getattr(model, name): getattr(model, name) + delta for name, delta in deltas.items()}
+    model.query.filter(model.id == id).update({**values, **_unchanged_timestamps(model)},
+                                              synchronize_session=False)
+
+def _unchanged_timestamps(model):
+    """SET entries that keep onupdate columns (updated_at, updatedAt) as they are.
+
+    A counter moving is not an edit of the row; without these the UPDATE
+    would fire the columns' onupdate defaults.
+    """
+    return {column: column for column in model.__table__.columns if column.onupdate is not None}
+
+def _counter_queries():
+    """Yield (model, column, actual_count) for every denormalized counter."""
+    from auth.models import User, followers
+    from community.models import Community, Post, Comment, Reaction, community_members
+
+    def count(*criteria, table=None):
+        query = db.select(db.func.count())
+        if table is not None:
+            query = query.select_from(table)
+        return query.where(*criteria).scalar_subquery()
+
+    yield User, User.followers_count, count(followers.c.followed_id == User.id, table=followers)
+    yield User, User.following_count, count(followers.c.follower_id == User.id, table=followers)
+    yield Community, Community.members_count, count(
+        community_members.c.community_id == Community.id, table=community_members
+    )
+    yield Community, Community.posts_count, count(Post.community_id == Community.id, table=Post.__table__)
+    yield Post, Post.likes_count, count(
+        Reaction.post_id == Post.id, Reaction.reaction_type == 'like', table=Reaction.__table__
+    )
+    yield Post, Post.dislikes_count, count(
+        Reaction.post_id == Post.id, Reaction.reaction_type == 'dislike', table=Reaction.__table__
+    )
+    yield Post, Post.comments_count, count(Comment.post_id == Post.id, table=Comment.__table__)
+
+def reconcile_counters():
+    """Recompute every counter from its source rows and repair the ones that drifted.
+
+    Returns {'<table>.<column>': rows_repaired}.
+    """
+    repaired = {}
+    for model, column, actual in _counter_queries():
+        result = db.session.execute(
+            db.update(model.__table__).where(column != actual)
+            .values({column: actual, **_unchanged_timestamps(model)})
+        )
+        repaired[f'{model.__tablename__}.{column.key}'] = result.rowcount
+    db.session.commit()
+    return repaired
@@ -0,0 +1,110 @@
+"""Database connection pool sizing, fork safety and pool metrics.
+
+Each gunicorn worker process has its own engine and pool. A gthread worker
+runs at most GUNICORN_THREADS requests at once, so DB_POOL_SIZE defaults
+to that thread count and DB_MAX_OVERFLOW to a small margin on top. One
+host therefore opens at most
+WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections; keep that
+below the database's max_connections divided by the number of hosts.
+
+Connections are checked with a ping before use (DB_POOL_PRE_PING) and
+replaced after DB_POOL_RECYCLE seconds, so restarts and idle timeouts on
+the database side do not surface as request errors. None of this applies
+to SQLite, which keeps SQLAlchemy's own pool choice.
+
+The pool records how long each checkout waited, how many checkouts timed
+out and how close it came to running out of connections; /api/metrics
+reports these under "pool". A pool that often waits or sits near
+saturation 1.0 is too small for the worker's threads; one that never goes
+past a fraction of its size can shrink.
+"""
+import threading
+import time
+import flask_sqlalchemy
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from common.profiling import Histogram
+
+POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping', 'poolclass')
+WAIT_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.timeouts = 0
+        self.peak_checked_out = 0
+
+    def observe(self, wait, checked_out=None):
+        with self._lock:
+            self.wait_ms.observe(wait * 1000)
+            if checked_out is None:
+                self.timeouts += 1
+            else:
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time, timeouts and peak usage.
+
+    engine.dispose() replaces the pool with a fresh one, which starts new statistics.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.observe(time.perf_counter() - started)
+            raise
+        self.stats.observe(time.perf_counter() - started, self.checkedout())
+        return connection
+
+    def snapshot(self):
+        capacity = self.size() + max(self._max_overflow, 0)
+        checked_out = self.checkedout()
+        return {
+            'size': self.size(),
+            'max_overflow': self._max_overflow,
+            'checked_out': checked_out,
+            'overflow': max(self.overflow(), 0),
+            'saturation': round(checked_out / capacity, 3) if capacity else None,
+            'peak_checked_out': self.stats.peak_checked_out,
+            'peak_saturation': round(self.stats.peak_checked_out / capacity, 3) if capacity else None,
+            'timeouts': self.stats.timeouts,
+            'wait_ms': self.stats.wait_ms.to_dict()
+        }
+
+class SQLAlchemy(flask_sqlalchemy.SQLAlchemy):
+    """Flask-SQLAlchemy with the pool configured from DB_POOL_* settings for server databases."""
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        sa_url, options = super().apply_driver_hacks(app, sa_url, options)
+        if sa_url.drivername.startswith('sqlite'):
+            for option in POOL_OPTIONS:
+                options.pop(option, None)
+        else:
+            config = app.config
+            options.update(
+                poolclass=InstrumentedQueuePool,
+                pool_size=config['DB_POOL_SIZE'],
+                max_overflow=config['DB_MAX_OVERFLOW'],
+                pool_timeout=config['DB_POOL_TIMEOUT'],
+                pool_recycle=config['DB_POOL_RECYCLE'],
+                pool_pre_ping=config['DB_POOL_PRE_PING']
+            )
+        return sa_url, options
+
+def pool_metrics(engine):
+    """Pool statistics of an engine, None unless it uses InstrumentedQueuePool."""
+    pool = engine.pool
+    return pool.snapshot() if isinstance(pool, InstrumentedQueuePool) else None
+
+def dispose_engines(app):
+    """Drop connections inherited from a parent process; call in each forked worker."""
+    from app import db
+    with app.app_context():
+        db.engine.dispose()
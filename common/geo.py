@@ -0,0 +1,116 @@
+"""Geohash and great-circle distance helpers."""
+import math
+
+EARTH_RADIUS_M = 6371008.8
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+
+def geohash_encode(latitude, longitude, precision=7):
+    """Encode a point as a geohash of precision characters."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        span, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (span[0] + span[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            span[0] = middle
+        else:
+            span[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+def geohash_bounds(geohash):
+    """Return (min_lat, min_lng, max_lat, max_lng) of a geohash cell."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            span = lng_range if even else lat_range
+            middle = (span[0] + span[1]) / 2
+            if (value >> shift) & 1:
+                span[0] = middle
+            else:
+                span[1] = middle
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+def geohash_center(geohash):
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+def cell_size_m(precision):
+    """Height and width in metres of a geohash cell at the equator."""
+    lat_bits = 5 * precision // 2
+    lng_bits = 5 * precision - lat_bits
+    metres_per_degree = math.pi * EARTH_RADIUS_M / 180
+    return 180 / 2 ** lat_bits * metres_per_degree, 360 / 2 ** lng_bits * metres_per_degree
+
+def precision_for(max_cell_m, max_precision=12):
+    """The coarsest geohash precision whose cells fit within max_cell_m on both sides."""
+    for precision in range(1, max_precision + 1):
+        if max(cell_size_m(precision)) <= max_cell_m:
+            return precision
+    return max_precision
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def distances_from(latitude, longitude, points):
+    """Distances in metres from one point to each of a list of (lat, lng) points."""
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    phi1 = radians(latitude)
+    cos_phi1 = cos(phi1)
+    lambda1 = radians(longitude)
+    diameter = 2 * EARTH_RADIUS_M
+    distances = []
+    for lat, lng in points:
+        phi2 = radians(lat)
+        a = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin((radians(lng) - lambda1) / 2) ** 2
+        distances.append(diameter * asin(min(1.0, sqrt(a))))
+    return distances
+
+def covering_cells(latitude, longitude, radius_m, precision):
+    """Geohash cells of the given precision that intersect a circle's bounding box."""
+    height, width = cell_size_m(precision)
+    metres_per_degree = math.pi * EARTH_RADIUS_M / 180
+    cell_lat, cell_lng = height / metres_per_degree, width / metres_per_degree
+    d_lat = radius_m / metres_per_degree
+    d_lng = d_lat / max(math.cos(math.radians(latitude)), 1e-6)
+    min_lat, max_lat = max(latitude - d_lat, -90.0), min(latitude + d_lat, 90.0)
+    if d_lng >= 180:
+        min_lng, max_lng = -180.0, 180.0
+    else:
+        min_lng, max_lng = longitude - d_lng, longitude + d_lng
+
+    cells = set()
+    lat = min_lat
+    while True:
+        lng = min_lng
+        while True:
+            wrapped = (lng + 180.0) % 360.0 - 180.0
+            cells.add(geohash_encode(min(lat, 90.0 - 1e-9), wrapped, precision))
+            if lng >= max_lng:
+                break
+            lng = min(lng + cell_lng, max_lng)
+        if lat >= max_lat:
+            break
+        lat = min(lat + cell_lat, max_lat)
+    return cells
+
+def covering_cell_count(latitude, radius_m, precision):
+    """Roughly how many cells covering_cells would return, without building them."""
+    height, width = cell_size_m(precision)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    return (2 * radius_m / height + 2) * (min(2 * radius_m / cos_lat, 2 * math.pi * EARTH_RADIUS_M) / width + 2)
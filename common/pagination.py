@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+from flask import request
+from app import db
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+def encode_cursor(created_at, id):
+    """Encode a (created_at, id) position as an opaque cursor string."""
+    payload = json.dumps({'t': created_at.isoformat(), 'id': id})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(payload['t']), int(payload['id'])
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid cursor")
+
+def get_page_args(default_per_page=DEFAULT_PER_PAGE, max_per_page=MAX_PER_PAGE):
+    """Read the cursor and per_page query parameters of the current request."""
+    per_page = request.args.get('per_page', default_per_page, type=int)
+    per_page = min(max(per_page, 1), max_per_page)
+    cursor = request.args.get('cursor')
+    return (decode_cursor(cursor) if cursor else None), per_page
+
+def keyset_order(query, created_column, id_column, cursor):
+    """Order a query newest first and skip everything up to and including the cursor."""
+    if cursor is not None:
+        created_at, last_id = cursor
+        query = query.filter(db.or_(
+            created_column < created_at,
+            db.and_(created_column == created_at, id_column < last_id)
+        ))
+    return query.order_by(created_column.desc(), id_column.desc())
+
+def cursor_for(row, created_column, id_column):
+    """Build the cursor pointing just past a row (an entity or a named tuple)."""
+    return encode_cursor(getattr(row, created_column.key), getattr(row, id_column.key))
+
+def keyset_paginate(query, created_column, id_column, cursor, per_page):
+    """Return one page of a query in (created_column, id_column) descending order.
+
+    The cursor is the position of the last row of the previous page, so every
+    page is a bounded index range scan no matter how deep it is. Returns the
+    rows and the cursor of the next page, or None on the last page.
+    """
+    rows = keyset_order(query, created_column, id_column, cursor).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = cursor_for(rows[-1], created_column, id_column)
+    return rows, next_cursor
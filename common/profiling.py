@@ -0,0 +1,187 @@
+"""Per-request profiling: wall time, database time, query count and rows.
+
+SQLAlchemy engine events time every statement issued while a request is
+being handled and add it to that request's profile. When the request ends
+its profile is added to per-blueprint histograms and per-endpoint totals
+served by GET /api/metrics. It is also returned as Server-Timing and X-DB-*
+headers when the app runs in debug mode or PROFILING_HEADERS is set, and it
+is logged with its SQL statements when the request took longer than
+PROFILING_SLOW_REQUEST_MS.
+
+/api/metrics answers only requests that bear METRICS_TOKEN as a bearer
+token, and refuses every request while no token is set.
+
+Rows are what the DBAPI cursor reports: rows returned by SELECTs on
+PostgreSQL (psycopg2 buffers results) and rows affected by writes; SQLite
+reports no count for SELECTs. Metrics are kept per process, so each
+gunicorn worker reports its own share of the traffic.
+"""
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+
+class RequestProfile:
+    def __init__(self, keep_statements=0):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.keep_statements = keep_statements
+        self.statements = []  # [(duration_s, statement)], at most keep_statements
+
+    def record(self, statement, duration, rowcount):
+        self.queries += 1
+        self.db_time += duration
+        if rowcount and rowcount > 0:
+            self.rows += rowcount
+        if len(self.statements) < self.keep_statements:
+            self.statements.append((duration, statement))
+
+    @property
+    def wall_time(self):
+        return time.perf_counter() - self.started
+
+def current_profile():
+    """Return the profile of the request being handled, None outside of one."""
+    return g.get('request_profile') if has_request_context() else None
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_profile() is not None:
+        context._profiling_started = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_profiling_started', None)
+    profile = current_profile()
+    if started is not None and profile is not None:
+        profile.record(statement, time.perf_counter() - started, cursor.rowcount)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        """Cumulative bucket counts keyed by upper bound, as in Prometheus."""
+        buckets, total = {}, 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            buckets[str(bound)] = total
+        return {'buckets': buckets, 'count': self.count, 'sum': round(self.sum, 3)}
+
+class RequestMetrics:
+    """Per-blueprint histograms and per-endpoint totals of request profiles."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blueprints = {}
+        self._endpoints = {}
+
+    def observe(self, blueprint, endpoint, wall_ms, db_ms, queries, rows):
+        with self._lock:
+            histograms = self._blueprints.get(blueprint)
+            if histograms is None:
+                histograms = self._blueprints[blueprint] = {
+                    'wall_ms': Histogram(TIME_BUCKETS_MS),
+                    'db_ms': Histogram(TIME_BUCKETS_MS),
+                    'queries': Histogram(QUERY_BUCKETS),
+                    'rows': Histogram(ROW_BUCKETS)
+                }
+            histograms['wall_ms'].observe(wall_ms)
+            histograms['db_ms'].observe(db_ms)
+            histograms['queries'].observe(queries)
+            histograms['rows'].observe(rows)
+
+            totals = self._endpoints.setdefault(
+                endpoint, {'requests': 0, 'wall_ms': 0.0, 'queries': 0, 'max_queries': 0})
+            totals['requests'] += 1
+            totals['wall_ms'] += wall_ms
+            totals['queries'] += queries
+            totals['max_queries'] = max(totals['max_queries'], queries)
+
+    def snapshot(self):
+        with self._lock:
+            blueprints = {name: {metric: histogram.to_dict() for metric, histogram in histograms.items()}
+                          for name, histograms in self._blueprints.items()}
+            endpoints = {
+                name: {
+                    'requests': totals['requests'],
+                    'mean_wall_ms': round(totals['wall_ms'] / totals['requests'], 3),
+                    'mean_queries': round(totals['queries'] / totals['requests'], 2),
+                    'max_queries': totals['max_queries']
+                }
+                for name, totals in self._endpoints.items()
+            }
+        return {'blueprints': blueprints, 'endpoints': endpoints}
+
+def get_request_metrics():
+    return current_app.extensions['request_metrics']
+
+def _start_profile():
+    config = current_app.config
+    keep = config['PROFILING_SLOW_MAX_STATEMENTS'] if config['PROFILING_SLOW_REQUEST_MS'] > 0 else 0
+    g.request_profile = RequestProfile(keep_statements=keep)
+
+def _finish_profile(response):
+    profile = current_profile()
+    if profile is None or request.endpoint == 'metrics':
+        return response
+    config = current_app.config
+    wall_ms = profile.wall_time * 1000
+    db_ms = profile.db_time * 1000
+
+    get_request_metrics().observe(request.blueprint or 'app', request.endpoint or 'not_found',
+                                  wall_ms, db_ms, profile.queries, profile.rows)
+
+    if current_app.debug or config['PROFILING_HEADERS']:
+        response.headers['Server-Timing'] = f'app;dur={wall_ms:.1f}, db;dur={db_ms:.1f}'
+        response.headers['X-DB-Queries'] = str(profile.queries)
+        response.headers['X-DB-Rows'] = str(profile.rows)
+
+    if 0 < config['PROFILING_SLOW_REQUEST_MS'] <= wall_ms:
+        statements = ''.join(f'\n  {duration * 1000:8.1f} ms  {statement}'
+                             for duration, statement in profile.statements)
+        if profile.queries > len(profile.statements):
+            statements += f'\n  ... {profile.queries - len(profile.statements)} more'
+        logger.warning('Slow request %s %s -> %d: %.1f ms (db %.1f ms, %d queries, %d rows)%s',
+                       request.method, request.full_path.rstrip('?'), response.status_code,
+                       wall_ms, db_ms, profile.queries, profile.rows, statements)
+    return response
+
+def metrics():
+    token = current_app.config['METRICS_TOKEN']
+    if not token:
+        # Timings and pool state describe the deployment; never serve them to anyone
+        return jsonify({'error': 'Metrics are disabled; set METRICS_TOKEN to enable them'}), 403
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+        return jsonify({'error': 'Invalid metrics token'}), 401
+    from app import db
+    from common.db_pool import pool_metrics
+    return jsonify({**get_request_metrics().snapshot(), 'pool': pool_metrics(db.engine)}), 200
+
+def init_app(app):
+    app.extensions['request_metrics'] = RequestMetrics()
+    app.add_url_rule('/api/metrics', 'metrics', metrics, methods=['GET'])
+    if app.config['PROFILING_ENABLED']:
+        app.before_request(_start_profile)
+        app.after_request(_finish_profile)
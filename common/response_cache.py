@@ -0,0 +1,251 @@
+"""Response caching with ETags and conditional GET for read endpoints.
+
+Cached responses are grouped under a tag naming the resource they render
+(``post:5``, ``community:3``, ...). Each tag has a generation number that
+is part of every cache key, so invalidating a tag is a single generation
+bump that makes all of its variants (per viewer, per query string)
+unreachable at once; stale entries then age out of the backend.
+
+A body that embeds other resources (a post's author, a community's
+members) names their tags with ``depends_on`` while it is rendered. The
+entry keeps the generations those tags had, and a hit whose dependencies
+have been invalidated since is treated as a miss.
+
+The default backend is an in-process LRU, which is per worker: a write on
+one worker invalidates that worker only. Routes with a version function
+check every hit against it, so they stay correct anyway; routes without
+one are not cached at all while WEB_CONCURRENCY is above 1. The shared
+backend talks to any store with a redis-style get/set/incr API so every
+worker sees each invalidation, and caches every route.
+"""
+import hashlib
+import itertools
+import json
+import logging
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from common.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+class InProcessBackend:
+    def __init__(self, maxsize=2048, ttl=30):
+        self._entries = LRUCache(maxsize=maxsize, ttl=ttl)
+        # Generations are never reused, so an evicted generation cannot revive old entries
+        self._generations = LRUCache(maxsize=maxsize * 4)
+        self._counter = itertools.count(1)
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, entry):
+        self._entries.set(key, entry)
+
+    def generation(self, tag):
+        generation = self._generations.get(tag)
+        if generation is None:
+            generation = next(self._counter)
+            self._generations.set(tag, generation)
+        return generation
+
+    def generations(self, tags):
+        return [self.generation(tag) for tag in tags]
+
+    def invalidate(self, tag):
+        self._generations.set(tag, next(self._counter))
+
+class LocalStore:
+    """In-memory stand-in for a shared key-value store (redis-style API)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value, expires_at = self._data.get(key, (None, None))
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ex if ex else None)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._data.get(key, (0, None))[0] or 0) + 1
+            self._data[key] = (str(value).encode('utf-8'), None)
+            return value
+
+class SharedStoreBackend:
+    def __init__(self, store, ttl=30, prefix='response-cache:'):
+        self.store = store
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.store.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, entry):
+        self.store.set(self.prefix + key, json.dumps(entry).encode('utf-8'), ex=self.ttl)
+
+    def generation(self, tag):
+        value = self.store.get(f'{self.prefix}gen:{tag}')
+        return int(value) if value is not None else 0
+
+    def generations(self, tags):
+        # One round trip however many tags an entry depends on
+        values = self.store.mget([f'{self.prefix}gen:{tag}' for tag in tags])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def invalidate(self, tag):
+        self.store.incr(f'{self.prefix}gen:{tag}')
+
+def _make_etag(value):
+    return hashlib.sha1(repr(value).encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend_name = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+        ttl = app.config.get('RESPONSE_CACHE_TTL', 30)
+        if backend_name == 'none':
+            backend = None
+        elif backend_name == 'shared':
+            store = app.extensions.get('response_cache_store') or self._connect(app)
+            backend = SharedStoreBackend(store, ttl=ttl)
+        else:
+            backend = InProcessBackend(maxsize=app.config.get('RESPONSE_CACHE_SIZE', 2048), ttl=ttl)
+        app.extensions['response_cache'] = backend
+
+    @staticmethod
+    def _connect(app):
+        url = app.config.get('RESPONSE_CACHE_URL')
+        if url:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError('RESPONSE_CACHE_URL is set but the redis package is not installed')
+            return redis.Redis.from_url(url)
+        return LocalStore()
+
+    @property
+    def backend(self):
+        return current_app.extensions.get('response_cache')
+
+    def cached(self, tag, version=None, vary_on_user=False):
+        """Cache a GET view's 200 responses and answer If-None-Match with 304.
+
+        tag(**view_args) names the resource. version(**view_args), if given,
+        returns the resource's updated_at/counter state and becomes the ETag.
+        It is read on every request: a hit whose ETag no longer matches it is
+        a miss, so a write handled by another worker is seen at once, and a
+        revalidation that misses the cache is answered with 304 before the
+        body is built. Without it the ETag hashes the body, and responses are
+        only stored when every worker sees the same invalidations (see
+        _shared_between_workers). Either way the ETag covers the variant
+        (query string, and viewer with vary_on_user), so one viewer's ETag
+        never validates another's body.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                backend = self.backend
+                if backend is None:
+                    return view(*args, **kwargs)
+
+                resource = tag(**kwargs)
+                variant = request.full_path
+                if vary_on_user:
+                    variant += f'|user={get_jwt_identity()}'
+                etag = _make_etag((resource, variant, version(**kwargs))) if version else None
+                if etag is None and not self._shared_between_workers(backend):
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    response.set_etag(_make_etag((variant, response.get_data(as_text=True))))
+                    return response.make_conditional(request)
+                key = f'{resource}@{backend.generation(resource)}|{variant}'
+
+                entry = backend.get(key)
+                if entry is not None and etag and entry['etag'] != etag:
+                    entry = None
+                if entry is not None and entry.get('depends'):
+                    tags = list(entry['depends'])
+                    if backend.generations(tags) != [entry['depends'][tag] for tag in tags]:
+                        entry = None
+                if entry is None:
+                    if etag and etag in request.if_none_match:
+                        response = make_response('', 304)
+                        response.set_etag(etag)
+                        return response
+                    g.response_cache_depends = {}
+                    response = make_response(view(*args, **kwargs))
+                    depends = g.pop('response_cache_depends')
+                    if response.status_code != 200:
+                        return response
+                    body = response.get_data(as_text=True)
+                    entry = {'etag': etag or _make_etag((variant, body)), 'body': body,
+                             'mimetype': response.mimetype, 'depends': depends}
+                    backend.set(key, entry)
+
+                response = current_app.response_class(entry['body'], mimetype=entry['mimetype'])
+                response.set_etag(entry['etag'])
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _shared_between_workers(backend):
+        """Whether an invalidation through this backend reaches every web worker.
+
+        Per-process backends only qualify when WEB_CONCURRENCY is 1.
+        """
+        if current_app.config.get('WEB_CONCURRENCY', 1) <= 1:
+            return True
+        return isinstance(backend, SharedStoreBackend) and not isinstance(backend.store, LocalStore)
+
+    def depends_on(self, *tags):
+        """Mark the response being cached as embedding the resources named by tags."""
+        depends = g.get('response_cache_depends')
+        backend = self.backend
+        if depends is None or backend is None:
+            return
+        tags = [tag for tag in tags if tag not in depends]
+        if tags:
+            depends.update(zip(tags, backend.generations(tags)))
+
+    def invalidate(self, *tags, retry=True):
+        """Drop every cached variant of the given resources.
+
+        Call after committing. If the shared store cannot be reached the
+        invalidation is handed to the job queue, which retries it with backoff.
+        """
+        backend = self.backend
+        if backend is None or not tags:
+            return
+        try:
+            for tag in tags:
+                backend.invalidate(tag)
+        except Exception:
+            if not retry:
+                raise
+            from app import db
+            from jobs.queue import enqueue
+            logger.exception('Cache invalidation of %s failed; queueing a retry', tags)
+            enqueue('cache.invalidate', tags=list(tags))
+            db.session.commit()
+
+response_cache = ResponseCache()
@@ -0,0 +1,291 @@
+"""Bulk loading of deterministic synthetic data.
+
+SyntheticData streams users, follows, communities, memberships, posts,
+images, comments, reactions and bookmarks as plain row dicts. Rows get
+explicit ids 1..N, so related rows can refer to them without reading
+anything back. Follows, reactions and bookmarks favour low ids, which
+gives a few popular accounts and posts and a long tail. Each table is
+drawn from its own generator seeded with (seed, table), so the same sizes,
+seed and ``now`` always produce the same rows, and nothing is kept in
+memory beyond one batch.
+
+bulk_load writes the rows with COPY on PostgreSQL and with batched
+executemany elsewhere. It drops the secondary indexes of the loaded tables
+first and rebuilds them once the data is in; primary keys and unique
+constraints stay in place. Counter columns are reconciled at the end.
+"""
+import csv
+import io
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
+from app import db
+from auth.hashing import get_password_hasher
+from auth.models import User, followers
+from common.counters import reconcile_counters
+from common.geo import geohash_encode
+from community.models import Bookmark, Comment, Community, Image, Post, Reaction, community_members
+
+PASSWORD = 'password123'  # Password of every seeded user
+HISTORY_DAYS = 90
+
+_FIRST_NAMES = ['Ada', 'Ben', 'Chloe', 'Dev', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas',
+                'Kara', 'Liam', 'Maya', 'Nikhil', 'Olga', 'Pablo', 'Quinn', 'Rosa', 'Sami', 'Tess']
+_LAST_NAMES = ['Adams', 'Baker', 'Costa', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Haddad', 'Ito',
+               'Jensen', 'Kowalski', 'Lopez', 'Moreau', 'Nakamura', 'Okafor', 'Patel', 'Rossi', 'Singh']
+_WORDS = ('trip road beach mountain city night market museum train coffee river sunset hostel '
+          'island forest camera map local food street festival bridge harbour view old new '
+          'early late quiet busy hidden famous long short walk ride climb swim stay visit').split()
+
+class RandomText:
+    """Fast stand-in for the Faker methods SyntheticData uses, driven by one seeded generator."""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(f'{seed}:text')
+
+    def name(self):
+        return f'{self.rng.choice(_FIRST_NAMES)} {self.rng.choice(_LAST_NAMES)}'
+
+    def city(self):
+        return self.rng.choice(_WORDS).capitalize() + self.rng.choice(('ton', 'ville', 'burg', 'port'))
+
+    def sentence(self):
+        words = self.rng.choices(_WORDS, k=self.rng.randint(4, 10))
+        return ' '.join(words).capitalize() + '.'
+
+    def text(self, max_nb_chars=200):
+        sentences, length = [], 0
+        while True:
+            sentence = self.sentence()
+            if sentences and length + len(sentence) + 1 > max_nb_chars:
+                return ' '.join(sentences)
+            sentences.append(sentence)
+            length += len(sentence) + 1
+
+    def image_url(self):
+        return f'https://picsum.photos/seed/{self.rng.randrange(10 ** 6)}/640/480'
+
+def email_for(user_id):
+    return f'user{user_id}@example.com'
+
+def _popular_id(rng, count):
+    """Pick an id in 1..count, skewed towards low ids."""
+    return int(count * rng.random() ** 3) + 1
+
+def _distinct_popular(rng, count, k, exclude=None):
+    k = min(k, count - (exclude is not None))
+    chosen = set()
+    while len(chosen) < k:
+        id = _popular_id(rng, count)
+        if id != exclude:
+            chosen.add(id)
+    return chosen
+
+class SyntheticData:
+    def __init__(self, users=1000, communities=20, follows_per_user=20, memberships_per_user=3,
+                 posts_per_user=5, community_post_ratio=0.3, comments_per_post=3, reactions_per_post=8,
+                 images_per_post=1, bookmarks_per_user=5, seed=0, text=None, password_hash=None, now=None):
+        self.users = users
+        self.communities = communities
+        self.follows_per_user = follows_per_user
+        self.memberships_per_user = memberships_per_user
+        self.posts_per_user = posts_per_user
+        self.community_post_ratio = community_post_ratio
+        self.comments_per_post = comments_per_post
+        self.reactions_per_post = reactions_per_post
+        self.images_per_post = images_per_post
+        self.bookmarks_per_user = bookmarks_per_user
+        self.seed = seed
+        self.text = text or RandomText(seed)
+        self.password_hash = password_hash
+        self.now = now or datetime.utcnow()
+
+    @property
+    def posts(self):
+        return self.users * self.posts_per_user
+
+    def tables(self):
+        """(table, rows) pairs in load order."""
+        return [
+            (User.__table__, self.user_rows()),
+            (followers, self.follow_rows()),
+            (Community.__table__, self.community_rows()),
+            (community_members, self.membership_rows()),
+            (Post.__table__, self.post_rows()),
+            (Image.__table__, self.image_rows()),
+            (Comment.__table__, self.comment_rows()),
+            (Reaction.__table__, self.reaction_rows()),
+            (Bookmark.__table__, self.bookmark_rows()),
+        ]
+
+    def _rng(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    def _moment(self, rng):
+        return self.now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+
+    def user_rows(self):
+        rng, text = self._rng('user'), self.text
+        for id in range(1, self.users + 1):
+            lat, lng = rng.uniform(-60, 70), rng.uniform(-180, 180)
+            created = self._moment(rng)
+            yield {
+                'id': id, 'name': text.name(), 'email': email_for(id), 'password': self.password_hash,
+                'avatarUrl': text.image_url(), 'bio': text.text(max_nb_chars=200),
+                'age': rng.randint(18, 80), 'gender': rng.choice(('male', 'female', 'other')),
+                'sun_sign': None, 'interests': '["travel", "photography"]',
+                'latitude': lat, 'longitude': lng, 'geohash': geohash_encode(lat, lng, 9),
+                'createdAt': created, 'updatedAt': created
+            }
+
+    def follow_rows(self):
+        rng = self._rng('followers')
+        for follower_id in range(1, self.users + 1):
+            for followed_id in sorted(_distinct_popular(rng, self.users, self.follows_per_user,
+                                                        exclude=follower_id)):
+                yield {'follower_id': follower_id, 'followed_id': followed_id, 'created_at': self._moment(rng)}
+
+    def community_rows(self):
+        rng, text = self._rng('community'), self.text
+        for id in range(1, self.communities + 1):
+            yield {'id': id, 'name': f'{text.city()} {id}', 'description': text.text(max_nb_chars=300),
+                   'created_at': self._moment(rng)}
+
+    def membership_rows(self):
+        rng = self._rng('community_members')
+        for user_id in range(1, self.users + 1):
+            for community_id in sorted(_distinct_popular(rng, self.communities, self.memberships_per_user)):
+                yield {'user_id': user_id, 'community_id': community_id}
+
+    def post_rows(self):
+        rng, text = self._rng('post'), self.text
+        id = 0
+        for author_id in range(1, self.users + 1):
+            for _ in range(self.posts_per_user):
+                id += 1
+                created = self._moment(rng)
+                in_community = rng.random() < self.community_post_ratio
+                yield {
+                    'id': id, 'title': text.sentence(), 'content': text.text(max_nb_chars=500),
+                    'author_id': author_id, 'created_at': created, 'updated_at': created,
+                    'post_type': 'community' if in_community else 'profile',
+                    'community_id': rng.randint(1, self.communities) if in_community else None
+                }
+
+    def image_rows(self):
+        rng, text = self._rng('image'), self.text
+        for post_id in range(1, self.posts + 1):
+            for position in range(rng.randint(0, 2 * self.images_per_post)):
+                yield {'url': text.image_url(), 'post_id': post_id, 'position': position}
+
+    def comment_rows(self):
+        rng, text = self._rng('comment'), self.text
+        for post_id in range(1, self.posts + 1):
+            for _ in range(rng.randint(0, 2 * self.comments_per_post)):
+                created = self._moment(rng)
+                yield {'content': text.sentence(), 'author_id': rng.randint(1, self.users),
+                       'post_id': post_id, 'created_at': created, 'updated_at': created}
+
+    def reaction_rows(self):
+        rng = self._rng('reaction')
+        for post_id in range(1, self.posts + 1):
+            count = int(2 * self.reactions_per_post * rng.random() ** 2)
+            for user_id in sorted(_distinct_popular(rng, self.users, count)):
+                yield {'user_id': user_id, 'post_id': post_id, 'created_at': self._moment(rng),
+                       'reaction_type': 'like' if rng.random() < 0.9 else 'dislike'}
+
+    def bookmark_rows(self):
+        rng = self._rng('bookmark')
+        for user_id in range(1, self.users + 1):
+            for post_id in sorted(_distinct_popular(rng, self.posts, self.bookmarks_per_user)):
+                yield {'user_id': user_id, 'post_id': post_id, 'created_at': self._moment(rng)}
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def _insert(table, rows, batch_size):
+    inserted = 0
+    for batch in _batches(rows, batch_size):
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        inserted += len(batch)
+    return inserted
+
+def _copy(table, rows, batch_size):
+    preparer = db.engine.dialect.identifier_preparer
+    raw = db.engine.raw_connection()
+    inserted = 0
+    try:
+        cursor = raw.cursor()
+        for batch in _batches(rows, batch_size):
+            columns = list(batch[0])
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in batch:
+                writer.writerow(['\\N' if row[column] is None else row[column] for column in columns])
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {preparer.format_table(table)} ({', '.join(preparer.quote(c) for c in columns)}) "
+                f"FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+            raw.commit()
+            inserted += len(batch)
+    finally:
+        raw.close()
+    return inserted
+
+@contextmanager
+def indexes_dropped(tables):
+    """Drop the secondary indexes of tables for a load and rebuild them afterwards."""
+    indexes = [index for table in tables for index in sorted(table.indexes, key=lambda i: i.name)]
+    db.session.commit()
+    for index in indexes:
+        index.drop(bind=db.engine, checkfirst=True)
+    try:
+        yield
+    finally:
+        db.session.rollback()
+        for index in indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+def _reset_sequences(tables):
+    # Explicit ids do not advance PostgreSQL sequences; later inserts would collide
+    for table in tables:
+        name = db.engine.dialect.identifier_preparer.format_table(table)
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {name}))"
+        ))
+    db.session.commit()
+
+def bulk_load(data, batch_size=10000, drop_indexes=True):
+    """Load a SyntheticData into an empty database; returns rows loaded per table.
+
+    Runs inside an app context.
+    """
+    if db.session.query(User.id).first() is not None:
+        raise RuntimeError('The database already has users; load into an empty database')
+    if data.password_hash is None:
+        data.password_hash = get_password_hasher().generate_password_hash(PASSWORD)
+    postgresql = db.engine.dialect.name == 'postgresql'
+    load = _copy if postgresql else _insert
+
+    tables = data.tables()
+    counts = {}
+    with indexes_dropped([table for table, _ in tables] if drop_indexes else []):
+        for table, rows in tables:
+            counts[table.name] = load(table, rows, batch_size)
+
+    if postgresql:
+        _reset_sequences([User.__table__, Community.__table__, Post.__table__])
+        for table, _ in tables:
+            db.session.execute(db.text(f'ANALYZE {db.engine.dialect.identifier_preparer.format_table(table)}'))
+        db.session.commit()
+    reconcile_counters()
+    return counts
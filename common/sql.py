@@ -0,0 +1,18 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app import db
+
+def insert_ignoring_duplicates(table, values):
+    """INSERT a row unless it would violate a unique key; returns rows inserted (0 or 1)."""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        statement = postgresql.insert(table).values(**values).on_conflict_do_nothing()
+    elif dialect == 'sqlite':
+        statement = sqlite.insert(table).values(**values).on_conflict_do_nothing()
+    else:
+        try:
+            with db.session.begin_nested():
+                return db.session.execute(table.insert().values(**values)).rowcount
+        except IntegrityError:
+            return 0
+    return db.session.execute(statement).rowcount
@@ -0,0 +1,100 @@
+"""Guards for calls to external services: bounded concurrency and a circuit breaker.
+
+Each upstream (Nominatim, Google Places) gets one UpstreamGuard per
+process. At most ``max_concurrency`` calls run at once and a caller waits
+at most ``acquire_timeout`` seconds for a slot. After ``failure_threshold``
+consecutive failures the circuit opens and calls fail immediately for
+``reset_timeout`` seconds; then one trial call is let through, and its
+outcome closes or re-opens the circuit. Callers turn UpstreamUnavailable
+into a 503 so a degraded upstream cannot tie up every worker thread.
+"""
+import threading
+import time
+from flask import current_app
+
+class UpstreamUnavailable(Exception):
+    """The upstream is failing or saturated; retry after retry_after seconds."""
+
+    def __init__(self, name, reason, retry_after=1):
+        super().__init__(f'{name} upstream {reason}')
+        self.retry_after = retry_after
+
+class UpstreamGuard:
+    def __init__(self, name, max_concurrency=8, acquire_timeout=0.5,
+                 failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.acquire_timeout = acquire_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def _before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0 or self._trial_running:
+                raise UpstreamUnavailable(self.name, 'circuit is open', retry_after=max(1, int(remaining)))
+            self._trial_running = True
+
+    def _record(self, success):
+        with self._lock:
+            self._trial_running = False
+            if success:
+                self._failures = 0
+                self._opened_at = None
+            else:
+                self._failures += 1
+                if self._failures >= self.failure_threshold or self._opened_at is not None:
+                    self._opened_at = time.monotonic()
+
+    def call(self, func, *args, is_failure=None, **kwargs):
+        """Run func under the guard.
+
+        Exceptions count as failures; is_failure(result) may flag bad results
+        (such as 5xx responses) too. Raises UpstreamUnavailable instead of
+        calling when the circuit is open or no slot frees up in time.
+        """
+        self._before_call()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self._trial_running = False
+            raise UpstreamUnavailable(self.name, 'is saturated')
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self._record(success=False)
+            raise
+        finally:
+            self._slots.release()
+        self._record(success=not (is_failure and is_failure(result)))
+        return result
+
+def get_upstream_guard(name):
+    """Return the guard for an upstream of the current app, creating it on first use."""
+    guards = current_app.extensions.setdefault('upstream_guards', {})
+    guard = guards.get(name)
+    if guard is None:
+        config = current_app.config
+        guard = UpstreamGuard(
+            name,
+            max_concurrency=config['UPSTREAM_MAX_CONCURRENCY'],
+            acquire_timeout=config['UPSTREAM_ACQUIRE_TIMEOUT'],
+            failure_threshold=config['UPSTREAM_FAILURE_THRESHOLD'],
+            reset_timeout=config['UPSTREAM_RESET_TIMEOUT']
+        )
+        guards[name] = guard
+    return guard
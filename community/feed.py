@@ -0,0 +1,164 @@
+"""Home feed: pull-on-read query and optional fan-out-on-write timelines.
+
+With FEED_FANOUT_ENABLED a new post is pushed as a FeedEntry row to the
+author, the author's followers and the community's members, so a feed read
+is one range scan of ix_feed_entry_user_id_created_at_post_id. Authors with
+more followers and communities with more members than
+FEED_FANOUT_MAX_AUDIENCE are not pushed; readers pull their posts at read
+time instead. Follow, unfollow, join and leave rebuild the reader's
+timeline from the latest FEED_TIMELINE_LENGTH posts.
+
+Pushes only add entries, so the periodic feed.trim job cuts every timeline
+back to its newest FEED_TIMELINE_LENGTH entries every FEED_TRIM_INTERVAL
+seconds. Trimming per push would rescan each follower's timeline for
+every post.
+
+Pushes and rebuilds are background jobs (see jobs/queue.py), enqueued in
+the same transaction as the write that triggers them.
+"""
+from flask import current_app
+from auth.models import User, followers
+from community.models import Community, FeedEntry, Post, community_members, db
+
+def fanout_enabled():
+    return current_app.config.get('FEED_FANOUT_ENABLED', False)
+
+def feed_query(user_id):
+    """Build the home feed for a user as a single query.
+
+    A post is in the feed when it was posted in a community the user joined,
+    was written by someone the user follows, or was written by the user.
+    """
+    joined_communities = db.session.query(community_members.c.community_id).filter(
+        community_members.c.user_id == user_id
+    )
+    followed_users = db.session.query(followers.c.followed_id).filter(
+        followers.c.follower_id == user_id
+    )
+    return Post.query.filter(db.or_(
+        Post.community_id.in_(joined_communities),
+        Post.author_id.in_(followed_users),
+        Post.author_id == user_id
+    ))
+
+def _sources(user_id, pushed):
+    """Authors and communities the user reads, split by whether they are pushed."""
+    max_audience = current_app.config['FEED_FANOUT_MAX_AUDIENCE']
+    small = (lambda count: count <= max_audience) if pushed else (lambda count: count > max_audience)
+    authors = db.session.query(followers.c.followed_id) \
+        .join(User, User.id == followers.c.followed_id) \
+        .filter(followers.c.follower_id == user_id, small(User.followers_count))
+    communities = db.session.query(community_members.c.community_id) \
+        .join(Community, Community.id == community_members.c.community_id) \
+        .filter(community_members.c.user_id == user_id, small(Community.members_count))
+    return authors, communities
+
+def timeline(user_id):
+    """Return the feed query of a user and the columns to order and page it by."""
+    if not fanout_enabled():
+        return feed_query(user_id), Post.created_at, Post.id
+
+    pulled_authors, pulled_communities = _sources(user_id, pushed=False)
+    pulled_authors, pulled_communities = pulled_authors.all(), pulled_communities.all()
+    if not pulled_authors and not pulled_communities:
+        query = Post.query.join(FeedEntry, FeedEntry.post_id == Post.id) \
+            .filter(FeedEntry.user_id == user_id)
+        return query, FeedEntry.created_at, FeedEntry.post_id
+
+    # Hybrid: pushed entries plus the posts of audiences too large to push
+    pushed = db.session.query(FeedEntry.post_id).filter(FeedEntry.user_id == user_id)
+    return Post.query.filter(db.or_(
+        Post.id.in_(pushed),
+        Post.author_id.in_([author_id for (author_id,) in pulled_authors]),
+        Post.community_id.in_([community_id for (community_id,) in pulled_communities])
+    )), Post.created_at, Post.id
+
+def push_post(post_id):
+    """Write a post into the timelines of its audience; returns entries written.
+
+    Safe to repeat: the post's existing entries are replaced.
+    """
+    post = Post.query.get(post_id)
+    if post is None:
+        return 0
+    max_audience = current_app.config['FEED_FANOUT_MAX_AUDIENCE']
+    audience = [db.select(db.literal(post.author_id).label('user_id'))]
+    if post.author.followers_count <= max_audience:
+        audience.append(db.select(followers.c.follower_id.label('user_id'))
+                        .where(followers.c.followed_id == post.author_id))
+    if post.community_id and post.community.members_count <= max_audience:
+        audience.append(db.select(community_members.c.user_id.label('user_id'))
+                        .where(community_members.c.community_id == post.community_id))
+    audience = db.union(*audience).subquery()
+
+    FeedEntry.query.filter_by(post_id=post_id).delete(synchronize_session=False)
+    written = db.session.execute(FeedEntry.__table__.insert().from_select(
+        ['user_id', 'post_id', 'created_at'],
+        db.select(audience.c.user_id, db.literal(post.id), db.literal(post.created_at))
+    )).rowcount
+    db.session.commit()
+    return written
+
+def rebuild_timeline(user_id):
+    """Refill a user's timeline with the latest posts from pushed audiences."""
+    authors, communities = _sources(user_id, pushed=True)
+    latest = db.session.query(Post.id, Post.created_at).filter(db.or_(
+        Post.community_id.in_(communities),
+        Post.author_id.in_(authors),
+        Post.author_id == user_id
+    )).order_by(Post.created_at.desc(), Post.id.desc()) \
+        .limit(current_app.config['FEED_TIMELINE_LENGTH']).subquery()
+
+    FeedEntry.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+    written = db.session.execute(FeedEntry.__table__.insert().from_select(
+        ['user_id', 'post_id', 'created_at'],
+        db.select(db.literal(user_id), latest.c.id, latest.c.created_at)
+    )).rowcount
+    db.session.commit()
+    return written
+
+def trim_timelines(length=None, batch_size=1000):
+    """Delete the entries past the newest length of every timeline; returns entries removed.
+
+    Works through the timelines batch_size users at a time, one short
+    transaction per batch.
+    """
+    if length is None:
+        length = current_app.config['FEED_TIMELINE_LENGTH']
+    removed, last_user_id = 0, None
+    while True:
+        users = db.session.query(FeedEntry.user_id).distinct().order_by(FeedEntry.user_id)
+        if last_user_id is not None:
+            users = users.filter(FeedEntry.user_id > last_user_id)
+        user_ids = [user_id for (user_id,) in users.limit(batch_size)]
+        if not user_ids:
+            break
+        rank = db.func.row_number().over(
+            partition_by=FeedEntry.user_id,
+            order_by=(FeedEntry.created_at.desc(), FeedEntry.post_id.desc())
+        ).label('rank')
+        ranked = db.session.query(FeedEntry.user_id, FeedEntry.post_id, rank) \
+            .filter(FeedEntry.user_id.in_(user_ids)).subquery()
+        stale = db.select(ranked.c.user_id, ranked.c.post_id).where(ranked.c.rank > length)
+        removed += db.session.execute(FeedEntry.__table__.delete().where(
+            db.tuple_(FeedEntry.user_id, FeedEntry.post_id).in_(stale)
+        )).rowcount
+        db.session.commit()
+        last_user_id = user_ids[-1]
+    return removed
+
+def remove_post(post_id):
+    """Delete a post's timeline entries; call before deleting the post."""
+    FeedEntry.query.filter_by(post_id=post_id).delete(synchronize_session=False)
+
+def schedule_push(post_id):
+    """Queue a push of a post to its audience; commit it with the post."""
+    if fanout_enabled():
+        from jobs.queue import enqueue
+        enqueue('feed.push_post', post_id=post_id)
+
+def schedule_rebuild(user_id):
+    """Queue a rebuild of a user's timeline; commit it with the follow or membership change."""
+    if fanout_enabled():
+        from jobs.queue import enqueue
+        enqueue('feed.rebuild_timeline', user_id=user_id)
@@ -0,0 +1,56 @@
+"""Set-based writes of a post's images.
+
+Both functions issue a fixed number of statements however many images a
+post has: one multi-row INSERT, and for updates one SELECT, one DELETE, one
+batched UPDATE of positions and a bump of the post's updated_at.
+"""
+from datetime import datetime
+from community.models import Image, Post, db
+
+def attach_images(post_id, urls):
+    """Insert images for a post in one statement, in list order."""
+    if not urls:
+        return 0
+    db.session.execute(Image.__table__.insert(), [
+        {'post_id': post_id, 'url': url, 'position': position}
+        for position, url in enumerate(urls)
+    ])
+    return len(urls)
+
+def replace_images(post_id, urls):
+    """Make a post's images match urls, touching only the rows that change.
+
+    Images whose URL is still present keep their row (and id); only their
+    position is updated if they moved. Returns (inserted, deleted) counts.
+    """
+    unused = {}
+    for image_id, url, position in db.session.query(Image.id, Image.url, Image.position) \
+            .filter(Image.post_id == post_id).order_by(Image.position, Image.id):
+        unused.setdefault(url, []).append((image_id, position))
+
+    moved, added = [], []
+    for position, url in enumerate(urls):
+        if unused.get(url):
+            image_id, old_position = unused[url].pop(0)
+            if old_position != position:
+                moved.append({'image_id': image_id, 'new_position': position})
+        else:
+            added.append({'post_id': post_id, 'url': url, 'position': position})
+    removed = [image_id for rows in unused.values() for image_id, _ in rows]
+
+    if removed:
+        Image.query.filter(Image.id.in_(removed)).delete(synchronize_session=False)
+    if moved:
+        table = Image.__table__
+        db.session.execute(
+            table.update().where(table.c.id == db.bindparam('image_id'))
+                 .values(position=db.bindparam('new_position')),
+            moved
+        )
+    if added:
+        db.session.execute(Image.__table__.insert(), added)
+    if removed or moved or added:
+        # The images are part of the post, so its version changes with them
+        Post.query.filter_by(id=post_id).update({'updated_at': datetime.utcnow()},
+                                                synchronize_session=False)
+    return len(added), len(removed)
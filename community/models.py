@@ -3,15 +3,21 @@ from app import db
 
 community_members = db.Table('community_members',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('community_id', db.Integer, db.ForeignKey('community.id'), primary_key=True)
+    db.Column('community_id', db.Integer, db.ForeignKey('community.id'), primary_key=True),
+    # The primary key leads with user_id; member listings look up by community
+    db.Index('ix_community_members_community_id', 'community_id')
 )
 
 class Community(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     description = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    members = db.relationship('User', secondary=community_members, backref=db.backref('communities_joined', lazy='dynamic'))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    members_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    posts_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Dynamic so that touching members never loads the whole member list
+    members = db.relationship('User', secondary=community_members, lazy='dynamic',
+                              backref=db.backref('communities_joined', lazy='dynamic'))
     posts = db.relationship('Post', backref='community', lazy='dynamic')
 
     def to_dict(self, include_members=False):
@@ -20,24 +26,52 @@ class Community(db.Model):
             'name': self.name,
             'description': self.description,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'members_count': len(self.members),
-            'posts_count': self.posts.count()
+            'members_count': self.members_count,
+            'posts_count': self.posts_count
         }
         if include_members:
-            data['members'] = [user.id for user in self.members]
+            data['members'] = [user_id for (user_id,) in db.session.query(community_members.c.user_id)
+                               .filter(community_members.c.community_id == self.id)]
         return data
 
     def is_member(self, user_id):
         # Convert user_id to integer if it's a string
         user_id = int(user_id) if isinstance(user_id, str) else user_id
-        # Check if any member's ID matches the user_id
-        return any(member.id == user_id for member in self.members)
+        # Probe the membership primary key instead of loading the members
+        return db.session.query(
+            db.exists().where(community_members.c.community_id == self.id)
+                       .where(community_members.c.user_id == user_id)
+        ).scalar()
+
+    def add_member(self, user_id):
+        """Add a member; returns False if they already were one."""
+        from common.counters import adjust_counters
+        from common.sql import insert_ignoring_duplicates
+        inserted = insert_ignoring_duplicates(
+            community_members, {'community_id': self.id, 'user_id': user_id}
+        )
+        if inserted:
+            adjust_counters(Community, self.id, members_count=1)
+        return bool(inserted)
+
+    def remove_member(self, user_id):
+        """Remove a member; returns False if they were not one."""
+        from common.counters import adjust_counters
+        deleted = db.session.execute(
+            community_members.delete()
+            .where(community_members.c.community_id == self.id)
+            .where(community_members.c.user_id == user_id)
+        ).rowcount
+        if deleted:
+            adjust_counters(Community, self.id, members_count=-1)
+        return bool(deleted)
 
 class Image(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     url = db.Column(db.String(500), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Order within the post
     
     def to_dict(self):
         return {
@@ -50,12 +84,15 @@ class Post(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     community_id = db.Column(db.Integer, db.ForeignKey('community.id'), nullable=True)  # Made optional
     post_type = db.Column(db.String(20), nullable=False, default='profile')  # 'profile' or 'community'
+    likes_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    dislikes_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comments_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     author = db.relationship('User', backref=db.backref('posts', lazy='dynamic'))
     images = db.relationship('Image', backref='post', lazy='dynamic', cascade='all, delete-orphan')
@@ -63,7 +100,15 @@ class Post(db.Model):
     reactions = db.relationship('Reaction', backref='post', lazy='dynamic', cascade='all, delete-orphan')
     bookmarks = db.relationship('Bookmark', backref='post', lazy='dynamic', cascade='all, delete-orphan')
 
-    def to_dict(self, include_comments=False):
+    __table_args__ = (
+        db.Index('ix_post_author_id_post_type_created_at', 'author_id', 'post_type', 'created_at'),
+        db.Index('ix_post_community_id_created_at', 'community_id', 'created_at'),
+    )
+
+    def to_dict(self, include_comments=False, images=None):
+        """Serialize the post; images may be preloaded by serialize_posts."""
+        if images is None:
+            images = self.images.order_by(Image.position, Image.id)
         data = {
             'id': self.id,
             'title': self.title,
@@ -73,10 +118,10 @@ class Post(db.Model):
             'author_id': self.author_id,
             'community_id': self.community_id,
             'post_type': self.post_type,
-            'images': [image.to_dict() for image in self.images],
-            'likes_count': self.reactions.filter_by(reaction_type='like').count(),
-            'dislikes_count': self.reactions.filter_by(reaction_type='dislike').count(),
-            'comments_count': self.comments.count(),
+            'images': [image.to_dict() for image in images],
+            'likes_count': self.likes_count,
+            'dislikes_count': self.dislikes_count,
+            'comments_count': self.comments_count,
             'is_bookmarked': False  # Will be set by the route if needed
         }
         if include_comments:
@@ -90,10 +135,17 @@ class Post(db.Model):
     def is_bookmarked_by(self, user_id):
         return self.bookmarks.filter_by(user_id=user_id).first() is not None
 
+    def cache_tags(self):
+        """Response-cache tags of the cached reads that render this post."""
+        tags = [f'post:{self.id}']
+        if self.post_type == 'profile':
+            tags.append(f'user_posts:{self.author_id}')
+        return tags
+
 class Comment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -101,6 +153,10 @@ class Comment(db.Model):
     
     author = db.relationship('User', backref=db.backref('comments', lazy='dynamic'))
 
+    __table_args__ = (
+        db.Index('ix_comment_post_id_created_at', 'post_id', 'created_at'),
+    )
+
     def to_dict(self, include_author=False):
         data = {
             'id': self.id,
@@ -126,6 +182,7 @@ class Reaction(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('user_id', 'post_id', name='unique_user_post_reaction'),
+        db.Index('ix_reaction_post_id_reaction_type', 'post_id', 'reaction_type'),
     )
 
     def to_dict(self):
@@ -139,7 +196,7 @@ class Reaction(db.Model):
 
 class Bookmark(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False)
@@ -148,6 +205,7 @@ class Bookmark(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('user_id', 'post_id', name='unique_user_post_bookmark'),
+        db.Index('ix_bookmark_user_id_created_at', 'user_id', 'created_at'),
     )
 
     def to_dict(self):
@@ -156,4 +214,15 @@ class Bookmark(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'user_id': self.user_id,
             'post_id': self.post_id
-        } 
\ No newline at end of file
+        } 
+
+class FeedEntry(db.Model):
+    """A post pushed into a user's home timeline (see community/feed.py)."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False)  # Copy of the post's created_at
+
+    __table_args__ = (
+        db.Index('ix_feed_entry_user_id_created_at_post_id', 'user_id', 'created_at', 'post_id'),
+        db.Index('ix_feed_entry_post_id', 'post_id'),
+    )
@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from auth.models import User
 from community.models import Post, Bookmark
+from community.serializers import serialize_posts
+from common.pagination import get_page_args, keyset_paginate
 
 bookmark_bp = Blueprint('bookmark', __name__)
 
@@ -59,5 +61,15 @@ def get_bookmarked_posts():
     # Convert user_id to integer for comparison
     user_id = int(user_id) if isinstance(user_id, str) else user_id
     
-    bookmarks = Bookmark.query.filter_by(user_id=user_id).all()
-    return jsonify([bookmark.post.to_dict() for bookmark in bookmarks]), 200 
\ No newline at end of file
+    try:
+        cursor, per_page = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    bookmarks, next_cursor = keyset_paginate(
+        Bookmark.query.filter_by(user_id=user_id).options(db.joinedload(Bookmark.post)),
+        Bookmark.created_at, Bookmark.id, cursor, per_page
+    )
+    return jsonify({
+        'posts': serialize_posts([bookmark.post for bookmark in bookmarks]),
+        'next_cursor': next_cursor
+    }), 200 
\ No newline at end of file
@@ -3,6 +3,9 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from auth.models import User
 from community.models import Post, Comment
+from common.counters import adjust_counters
+from common.pagination import get_page_args, keyset_paginate
+from common.response_cache import response_cache
 
 comment_bp = Blueprint('comment', __name__)
 
@@ -24,7 +27,9 @@ def create_comment(post_id):
     )
     
     db.session.add(comment)
+    adjust_counters(Post, post_id, comments_count=1)
     db.session.commit()
+    response_cache.invalidate(*post.cache_tags())
     
     return jsonify(comment.to_dict()), 201
 
@@ -32,8 +37,17 @@ def create_comment(post_id):
 @jwt_required()
 def get_post_comments(post_id):
     post = Post.query.get_or_404(post_id)
-    comments = Comment.query.filter_by(post_id=post_id).order_by(Comment.created_at.desc()).all()
-    return jsonify([comment.to_dict() for comment in comments]), 200
+    try:
+        cursor, per_page = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    comments, next_cursor = keyset_paginate(
+        Comment.query.filter_by(post_id=post_id), Comment.created_at, Comment.id, cursor, per_page
+    )
+    return jsonify({
+        'comments': [comment.to_dict() for comment in comments],
+        'next_cursor': next_cursor
+    }), 200
 
 @comment_bp.route('/comments/<int:comment_id>', methods=['PUT'])
 @jwt_required()
@@ -62,6 +76,7 @@ def update_comment(comment_id):
     
     comment.content = content
     db.session.commit()
+    response_cache.invalidate(*comment.post.cache_tags())
     
     return jsonify(comment.to_dict()), 200
 
@@ -84,7 +99,10 @@ def delete_comment(comment_id):
             }
         }), 403
     
+    post = comment.post
     db.session.delete(comment)
+    adjust_counters(Post, comment.post_id, comments_count=-1)
     db.session.commit()
+    response_cache.invalidate(*post.cache_tags())
     
     return jsonify({'message': 'Comment deleted successfully'}), 200 
\ No newline at end of file
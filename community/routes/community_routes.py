@@ -1,11 +1,27 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from auth.models import User
-from community.models import Community
+from community.models import Community, community_members
+from common.pagination import cursor_for, get_page_args, keyset_order, keyset_paginate
+from common.response_cache import response_cache
+from community import feed
 
 community_routes_bp = Blueprint('community_routes', __name__)
 
+MEMBERS_PREVIEW_SIZE = 20
+MEMBERS_STREAM_CHUNK = 100
+
+def members_query(community_id):
+    """Id, name, email and sort key of a community's members, without loading User objects."""
+    return db.session.query(User.id, User.name, User.email, User.createdAt) \
+        .join(community_members, community_members.c.user_id == User.id) \
+        .filter(community_members.c.community_id == community_id)
+
+def member_details(member):
+    return {'id': member.id, 'name': member.name, 'email': member.email}
+
 @community_routes_bp.route('/communities', methods=['POST'])
 @jwt_required()
 def create_community():
@@ -19,36 +35,73 @@ def create_community():
     community = Community(name=name, description=description)
     db.session.add(community)
     db.session.commit()
+    response_cache.invalidate('communities')
     return jsonify({'message': 'Community created', 'community': community.to_dict()}), 201
 
 @community_routes_bp.route('/communities', methods=['GET'])
 @jwt_required()
+@response_cache.cached(lambda: 'communities')
 def get_communities():
-    communities = Community.query.all()
-    return jsonify([c.to_dict() for c in communities]), 200
+    try:
+        cursor, per_page = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    communities, next_cursor = keyset_paginate(
+        Community.query, Community.created_at, Community.id, cursor, per_page
+    )
+    return jsonify({
+        'communities': [c.to_dict() for c in communities],
+        'next_cursor': next_cursor
+    }), 200
 
 @community_routes_bp.route('/communities/<int:community_id>', methods=['GET'])
 @jwt_required()
+@response_cache.cached(lambda community_id: f'community:{community_id}', vary_on_user=True)
 def get_community(community_id):
     user_id = get_jwt_identity()
     community = Community.query.get_or_404(community_id)
     
-    # Get detailed member information
-    member_details = []
-    for member in community.members:
-        member_details.append({
-            'id': member.id,
-            'name': member.name,
-            'email': member.email
-        })
+    # Only the first page of members; the rest come from /communities/<id>/members
+    members, next_cursor = keyset_paginate(
+        members_query(community_id), User.createdAt, User.id, None, MEMBERS_PREVIEW_SIZE
+    )
     
-    community_data = community.to_dict(include_members=True)
-    community_data['members_details'] = member_details
+    response_cache.depends_on(*(f'user:{member.id}' for member in members))
+    community_data = community.to_dict()
+    community_data['members_details'] = [member_details(member) for member in members]
+    community_data['members_next_cursor'] = next_cursor
     community_data['current_user_id'] = user_id
     community_data['is_member'] = community.is_member(user_id)
     
     return jsonify(community_data), 200
 
+@community_routes_bp.route('/communities/<int:community_id>/members', methods=['GET'])
+@jwt_required()
+def get_community_members(community_id):
+    Community.query.get_or_404(community_id)
+    try:
+        cursor, per_page = get_page_args(default_per_page=100, max_per_page=1000)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query = keyset_order(members_query(community_id), User.createdAt, User.id, cursor) \
+        .limit(per_page + 1).yield_per(MEMBERS_STREAM_CHUNK)
+    
+    def generate():
+        # Stream the page row by row so memory stays flat however large it is
+        yield '{"members": ['
+        last, sent, has_more = None, 0, False
+        for member in query:
+            if sent == per_page:
+                has_more = True
+                break
+            yield (',' if sent else '') + json.dumps(member_details(member))
+            last, sent = member, sent + 1
+        next_cursor = cursor_for(last, User.createdAt, User.id) if has_more else None
+        yield '], "next_cursor": ' + json.dumps(next_cursor) + '}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
 @community_routes_bp.route('/communities/<int:community_id>/join', methods=['POST'])
 @jwt_required()
 def join_community(community_id):
@@ -57,12 +110,12 @@ def join_community(community_id):
     # Convert user_id to integer for comparison
     user_id = int(user_id) if isinstance(user_id, str) else user_id
     
-    user = User.query.get_or_404(user_id)
     community = Community.query.get_or_404(community_id)
-    if user in community.members:
+    if not community.add_member(user_id):
         return jsonify({'message': 'Already a member'}), 200
-    community.members.append(user)
+    feed.schedule_rebuild(user_id)
     db.session.commit()
+    response_cache.invalidate(f'community:{community_id}', 'communities')
     return jsonify({'message': 'Joined community'}), 200
 
 @community_routes_bp.route('/communities/<int:community_id>/leave', methods=['POST'])
@@ -73,12 +126,12 @@ def leave_community(community_id):
     # Convert user_id to integer for comparison
     user_id = int(user_id) if isinstance(user_id, str) else user_id
     
-    user = User.query.get_or_404(user_id)
     community = Community.query.get_or_404(community_id)
-    if user not in community.members:
+    if not community.remove_member(user_id):
         return jsonify({'message': 'Not a member'}), 200
-    community.members.remove(user)
+    feed.schedule_rebuild(user_id)
     db.session.commit()
+    response_cache.invalidate(f'community:{community_id}', 'communities')
     return jsonify({'message': 'Left community'}), 200
 
 @community_routes_bp.route('/communities/joined', methods=['GET'])
@@ -90,4 +143,14 @@ def get_joined_communities():
     user_id = int(user_id) if isinstance(user_id, str) else user_id
     
     user = User.query.get_or_404(user_id)
-    return jsonify([c.to_dict() for c in user.communities_joined]), 200 
\ No newline at end of file
+    try:
+        cursor, per_page = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    communities, next_cursor = keyset_paginate(
+        user.communities_joined, Community.created_at, Community.id, cursor, per_page
+    )
+    return jsonify({
+        'communities': [c.to_dict() for c in communities],
+        'next_cursor': next_cursor
+    }), 200
\ No newline at end of file
@@ -2,10 +2,25 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from auth.models import User
-from community.models import Community, Post, Image
+from community.models import Community, Post, Comment
+from community.images import attach_images, replace_images
+from common.counters import adjust_counters
+from community.serializers import serialize_posts
+from common.pagination import get_page_args, keyset_paginate
+from common.response_cache import response_cache
+from community import feed
 
 post_bp = Blueprint('post', __name__)
 
+def post_version(post_id):
+    """Everything get_post renders that can change, read in one query."""
+    last_comment_edit = db.session.query(db.func.max(Comment.updated_at)) \
+        .filter(Comment.post_id == Post.id).correlate(Post).scalar_subquery()
+    return db.session.query(
+        Post.updated_at, Post.likes_count, Post.dislikes_count, Post.comments_count,
+        User.updatedAt, User.followers_count, User.following_count, last_comment_edit
+    ).outerjoin(User, User.id == Post.author_id).filter(Post.id == post_id).first()
+
 @post_bp.route('/communities/<int:community_id>/posts', methods=['POST'])
 @jwt_required()
 def create_post(community_id):
@@ -14,8 +29,6 @@ def create_post(community_id):
     
     community = Community.query.get_or_404(community_id)
     
-    # Get detailed membership information
-    member_ids = [member.id for member in community.members]
     is_member = community.is_member(user_id)
     
     if not is_member:
@@ -24,7 +37,6 @@ def create_post(community_id):
             'details': {
                 'user_id': user_id,
                 'community_id': community_id, 
-                'member_ids': member_ids,
                 'is_member': is_member
             }
         }), 403
@@ -49,13 +61,13 @@ def create_post(community_id):
             post_type='community'
         )
         
-        # Add images
-        for url in image_urls:
-            image = Image(url=url, post=post)
-            db.session.add(image)
-        
         db.session.add(post)
+        db.session.flush()
+        attach_images(post.id, image_urls)
+        adjust_counters(Community, community_id, posts_count=1)
+        feed.schedule_push(post.id)
         db.session.commit()
+        response_cache.invalidate(f'community:{community_id}', 'communities')
         
         return jsonify(post.to_dict()), 201
     except Exception as e:
@@ -66,13 +78,24 @@ def create_post(community_id):
 @jwt_required()
 def get_community_posts(community_id):
     community = Community.query.get_or_404(community_id)
-    posts = Post.query.filter_by(community_id=community_id).order_by(Post.created_at.desc()).all()
-    return jsonify([post.to_dict() for post in posts]), 200
+    try:
+        cursor, per_page = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    posts, next_cursor = keyset_paginate(
+        Post.query.filter_by(community_id=community_id), Post.created_at, Post.id, cursor, per_page
+    )
+    return jsonify({
+        'posts': serialize_posts(posts),
+        'next_cursor': next_cursor
+    }), 200
 
 @post_bp.route('/posts/<int:post_id>', methods=['GET'])
 @jwt_required()
+@response_cache.cached(lambda post_id: f'post:{post_id}', version=post_version)
 def get_post(post_id):
     post = Post.query.get_or_404(post_id)
+    response_cache.depends_on(f'user:{post.author_id}')
     post_dict = post.to_dict(include_comments=True)
     post_dict['author'] = post.author.to_dict() if post.author else None
     return jsonify(post_dict), 200
@@ -109,17 +132,10 @@ def update_post(post_id):
         if image_urls is not None:
             if not isinstance(image_urls, list):
                 return jsonify({'error': 'image_urls must be a list'}), 400
-            
-            # Remove existing images
-            for image in post.images:
-                db.session.delete(image)
-            
-            # Add new images
-            for url in image_urls:
-                image = Image(url=url, post=post)
-                db.session.add(image)
+            replace_images(post.id, image_urls)
         
         db.session.commit()
+        response_cache.invalidate(*post.cache_tags())
         return jsonify(post.to_dict()), 200
     except Exception as e:
         db.session.rollback()
@@ -144,6 +160,13 @@ def delete_post(post_id):
             }
         }), 403
     
+    tags = post.cache_tags()
+    if post.community_id:
+        tags += [f'community:{post.community_id}', 'communities']
+    feed.remove_post(post.id)
     db.session.delete(post)
+    if post.community_id:
+        adjust_counters(Community, post.community_id, posts_count=-1)
     db.session.commit()
+    response_cache.invalidate(*tags)
     return jsonify({'message': 'Post deleted successfully'}), 200 
\ No newline at end of file
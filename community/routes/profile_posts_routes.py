@@ -1,6 +1,11 @@
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from community.models import Post, Image, db
+from community.models import Post, db
+from community.images import attach_images, replace_images
+from community.serializers import serialize_posts
+from common.pagination import get_page_args, keyset_paginate
+from common.response_cache import response_cache
+from community import feed
 from . import community_bp
 
 @community_bp.route('/profile/posts', methods=['POST'])
@@ -24,13 +29,12 @@ def create_profile_post():
             post_type='profile'
         )
         
-        # Add images
-        for url in image_urls:
-            image = Image(url=url, post=new_post)
-            db.session.add(image)
-        
         db.session.add(new_post)
+        db.session.flush()
+        attach_images(new_post.id, image_urls)
+        feed.schedule_push(new_post.id)
         db.session.commit()
+        response_cache.invalidate(f'user_posts:{current_user_id}')
         
         return jsonify({
             'message': 'Post created successfully',
@@ -44,16 +48,21 @@ def create_profile_post():
 
 @community_bp.route('/profile/<int:user_id>/posts', methods=['GET'])
 @jwt_required()
+@response_cache.cached(lambda user_id: f'user_posts:{user_id}')
 def get_user_posts(user_id):
     try:
-        posts = Post.query.filter_by(author_id=user_id, post_type='profile').order_by(Post.created_at.desc()).all()
-        posts_data = []
-        for post in posts:
-            post_dict = post.to_dict()
-            post_dict['author'] = post.author.to_dict() if post.author else None
-            posts_data.append(post_dict)
+        try:
+            cursor, per_page = get_page_args()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        posts, next_cursor = keyset_paginate(
+            Post.query.filter_by(author_id=user_id, post_type='profile'),
+            Post.created_at, Post.id, cursor, per_page
+        )
+        posts_data = serialize_posts(posts, include_author=True)
         return jsonify({
-            'posts': posts_data
+            'posts': posts_data,
+            'next_cursor': next_cursor
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -87,17 +96,10 @@ def update_profile_post(post_id):
         if 'image_urls' in data:
             if not isinstance(data['image_urls'], list):
                 return jsonify({'error': 'image_urls must be a list'}), 400
-            
-            # Remove existing images
-            for image in post.images:
-                db.session.delete(image)
-            
-            # Add new images
-            for url in data['image_urls']:
-                image = Image(url=url, post=post)
-                db.session.add(image)
+            replace_images(post.id, data['image_urls'])
         
         db.session.commit()
+        response_cache.invalidate(*post.cache_tags())
         return jsonify({
             'message': 'Post updated successfully',
             'post': post.to_dict()
@@ -124,8 +126,11 @@ def delete_profile_post(post_id):
         return jsonify({'error': 'This is not a profile post'}), 400
     
     try:
+        tags = post.cache_tags()
+        feed.remove_post(post.id)
         db.session.delete(post)
         db.session.commit()
+        response_cache.invalidate(*tags)
         return jsonify({'message': 'Post deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from auth.models import User
 from community.models import Post, Reaction
+from common.counters import adjust_counters
+from common.response_cache import response_cache
 
 reaction_bp = Blueprint('reaction', __name__)
 
@@ -24,6 +26,7 @@ def like_post(post_id):
         if existing_reaction.reaction_type == 'like':
             return jsonify({'message': 'Post already liked'}), 200
         existing_reaction.reaction_type = 'like'
+        adjust_counters(Post, post_id, likes_count=1, dislikes_count=-1)
     else:
         reaction = Reaction(
             user_id=user_id,
@@ -31,8 +34,10 @@ def like_post(post_id):
             reaction_type='like'
         )
         db.session.add(reaction)
+        adjust_counters(Post, post_id, likes_count=1)
     
     db.session.commit()
+    response_cache.invalidate(*post.cache_tags())
     return jsonify({'message': 'Post liked successfully'}), 200
 
 @reaction_bp.route('/posts/<int:post_id>/dislike', methods=['POST'])
@@ -53,6 +58,7 @@ def dislike_post(post_id):
         if existing_reaction.reaction_type == 'dislike':
             return jsonify({'message': 'Post already disliked'}), 200
         existing_reaction.reaction_type = 'dislike'
+        adjust_counters(Post, post_id, dislikes_count=1, likes_count=-1)
     else:
         reaction = Reaction(
             user_id=user_id,
@@ -60,8 +66,10 @@ def dislike_post(post_id):
             reaction_type='dislike'
         )
         db.session.add(reaction)
+        adjust_counters(Post, post_id, dislikes_count=1)
     
     db.session.commit()
+    response_cache.invalidate(*post.cache_tags())
     return jsonify({'message': 'Post disliked successfully'}), 200
 
 @reaction_bp.route('/posts/<int:post_id>/reaction', methods=['DELETE'])
@@ -77,6 +85,12 @@ def remove_reaction(post_id):
         post_id=post_id
     ).first_or_404()
     
+    post = reaction.post
     db.session.delete(reaction)
+    if reaction.reaction_type == 'like':
+        adjust_counters(Post, post_id, likes_count=-1)
+    elif reaction.reaction_type == 'dislike':
+        adjust_counters(Post, post_id, dislikes_count=-1)
     db.session.commit()
+    response_cache.invalidate(*post.cache_tags())
     return jsonify({'message': 'Reaction removed successfully'}), 200 
\ No newline at end of file
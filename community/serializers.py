@@ -0,0 +1,37 @@
+from collections import defaultdict
+from auth.serializers import serialize_users_by_id
+from community.models import Community, Image
+
+def serialize_posts(posts, include_author=False, include_community=False):
+    """Serialize a page of posts with a fixed number of queries.
+
+    Images, authors and communities are each fetched once for the whole
+    page instead of once per post; counts come from the counter columns.
+    """
+    post_ids = [post.id for post in posts]
+    if not post_ids:
+        return []
+
+    images = defaultdict(list)
+    for image in Image.query.filter(Image.post_id.in_(post_ids)).order_by(Image.position, Image.id):
+        images[image.post_id].append(image)
+
+    authors = {}
+    if include_author:
+        authors = serialize_users_by_id(post.author_id for post in posts)
+    communities = {}
+    if include_community:
+        community_ids = {post.community_id for post in posts if post.community_id}
+        if community_ids:
+            loaded = Community.query.filter(Community.id.in_(community_ids)).all()
+            communities = {c.id: c.to_dict() for c in loaded}
+
+    posts_data = []
+    for post in posts:
+        post_dict = post.to_dict(images=images[post.id])
+        if include_author:
+            post_dict['author'] = authors.get(post.author_id)
+        if include_community and post.community_id:
+            post_dict['community'] = communities.get(post.community_id)
+        posts_data.append(post_dict)
+    return posts_data
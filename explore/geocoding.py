@@ -0,0 +1,144 @@
+"""Cached, rate-limited geocoding.
+
+Answers are looked up by normalized address in a per-process LRU, then in
+the geocode_result table, and only then asked of Nominatim through one
+shared client per process. Found addresses are kept for GEOCODE_TTL,
+addresses Nominatim does not know for GEOCODE_MISS_TTL. Timeouts and
+outages are remembered in memory for GEOCODE_ERROR_TTL so a struggling
+upstream is not hammered.
+
+Nominatim's usage policy allows at most one request per second per
+application, so upstream calls are spaced GEOCODER_MIN_INTERVAL seconds
+apart within a process; divide the budget across processes when running
+several.
+"""
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta
+from flask import current_app
+from geopy.exc import GeocoderServiceError, GeocoderTimedOut, GeocoderUnavailable
+from geopy.geocoders import Nominatim
+from sqlalchemy.exc import IntegrityError
+from app import db
+from common.cache import LRUCache
+from common.upstream import get_upstream_guard
+from explore.models import GeocodeResult
+
+MAX_KEY_LENGTH = 255
+_PUNCTUATION = re.compile(r'[^\w\s]|_', re.UNICODE)
+_WHITESPACE = re.compile(r'\s+')
+
+class GeocoderError(Exception):
+    """The upstream geocoder timed out or is unavailable."""
+
+def normalize_address(address):
+    """Fold case, punctuation and whitespace so equivalent addresses share a key."""
+    key = unicodedata.normalize('NFKC', address).casefold()
+    key = _WHITESPACE.sub(' ', _PUNCTUATION.sub(' ', key)).strip()
+    if len(key) > MAX_KEY_LENGTH:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        key = f'{key[:MAX_KEY_LENGTH - len(digest) - 1]}#{digest}'
+    return key
+
+class RateLimiter:
+    """Space calls at least min_interval seconds apart across threads."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_call = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_call - now
+            self._next_call = max(now, self._next_call) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+_MISS = object()  # Cached "Nominatim has no answer"
+
+class Geocoder:
+    def __init__(self, client, min_interval=1.0, cache_size=10000, ttl=30 * 86400,
+                 miss_ttl=3600, error_ttl=30, guard=None):
+        self.client = client
+        self.guard = guard
+        self.limiter = RateLimiter(min_interval)
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.error_ttl = error_ttl
+        self._cache = LRUCache(maxsize=cache_size)
+
+    def geocode(self, address):
+        """Return (latitude, longitude) for an address, None if it is unknown.
+
+        Raises GeocoderError while the upstream is failing, and
+        UpstreamUnavailable while its circuit is open or it is saturated.
+        """
+        key = normalize_address(address)
+        cached = self._cache.get(key)
+        if isinstance(cached, GeocoderError):
+            raise cached
+        if cached is not None:
+            return None if cached is _MISS else cached
+
+        row = GeocodeResult.query.filter_by(query_key=key).first()
+        if row is not None and row.expires_at > datetime.utcnow():
+            coordinates = (row.latitude, row.longitude) if row.found else None
+            self._remember(key, coordinates, row.expires_at)
+            return coordinates
+
+        try:
+            location = self.guard.call(self._lookup, address) if self.guard else self._lookup(address)
+        except (GeocoderTimedOut, GeocoderUnavailable, GeocoderServiceError) as e:
+            error = GeocoderError(str(e))
+            self._cache.set(key, error, ttl=self.error_ttl)
+            raise error
+
+        coordinates = (location.latitude, location.longitude) if location else None
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl if coordinates else self.miss_ttl)
+        self._store(key, row, coordinates, expires_at)
+        self._remember(key, coordinates, expires_at)
+        return coordinates
+
+    def _lookup(self, address):
+        self.limiter.wait()
+        return self.client.geocode(address)
+
+    def _remember(self, key, coordinates, expires_at):
+        ttl = (expires_at - datetime.utcnow()).total_seconds()
+        if ttl > 0:
+            self._cache.set(key, coordinates if coordinates else _MISS, ttl=ttl)
+
+    def _store(self, key, row, coordinates, expires_at):
+        if row is None:
+            row = GeocodeResult(query_key=key)
+            db.session.add(row)
+        row.found = coordinates is not None
+        row.latitude, row.longitude = coordinates or (None, None)
+        row.expires_at = expires_at
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker stored the same address first; its answer is as good
+            db.session.rollback()
+
+def get_geocoder():
+    """Return the geocoder of the current app, creating it on first use."""
+    geocoder = current_app.extensions.get('geocoder')
+    if geocoder is None:
+        config = current_app.config
+        geocoder = Geocoder(
+            Nominatim(user_agent=config['GEOCODER_USER_AGENT'], timeout=config['GEOCODER_TIMEOUT']),
+            min_interval=config['GEOCODER_MIN_INTERVAL'],
+            cache_size=config['GEOCODE_CACHE_SIZE'],
+            ttl=config['GEOCODE_TTL'],
+            miss_ttl=config['GEOCODE_MISS_TTL'],
+            error_ttl=config['GEOCODE_ERROR_TTL'],
+            guard=get_upstream_guard('nominatim')
+        )
+        current_app.extensions['geocoder'] = geocoder
+    return geocoder
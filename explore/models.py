@@ -0,0 +1,12 @@
+from datetime import datetime
+from app import db
+
+class GeocodeResult(db.Model):
+    """A cached geocoder answer for a normalized address; found is False for misses."""
+    id = db.Column(db.Integer, primary_key=True)
+    query_key = db.Column(db.String(255), unique=True, nullable=False)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    found = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,167 @@
+"""Tile-cached, coalesced Google Places nearby search.
+
+A request is snapped to a geohash tile no wider than a quarter of its
+radius, and its radius is rounded up to one of RADIUS_BUCKETS. The
+upstream is asked once per (tile, bucket, type) for everything within the
+bucket radius plus the tile's half-diagonal around the tile centre, which
+covers any point in the tile; results are then filtered down to the exact
+radius around the requested point. Tile answers are kept for
+PLACES_CACHE_TTL seconds, and concurrent misses for the same tile share a
+single upstream call.
+
+Google returns at most 20 places per page. The tile query covers a wider
+area than the caller's circle, so a single page spends part of that cap on
+places that are filtered out. Deployments that prefer fuller answers over
+latency and quota can set ``max_pages`` above 1: a tile miss then follows
+next_page_token for up to that many pages before filtering, waiting
+``page_delay`` seconds before each. The next_page_token of the last page
+read, if any, is returned to the caller.
+"""
+import threading
+import time
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from common.cache import LRUCache
+from common.geo import geohash_bounds, geohash_center, geohash_encode, haversine_m, precision_for
+from common.upstream import get_upstream_guard
+
+NEARBY_SEARCH_URL = 'https://maps.googleapis.com/maps/api/place/nearbysearch/json'
+RADIUS_BUCKETS = [100, 250, 500, 1000, 1500, 2000, 3000, 5000, 10000, 20000, 50000]
+CACHEABLE_STATUSES = {'OK', 'ZERO_RESULTS'}
+
+class SingleFlight:
+    """Run a function once per key at a time; concurrent callers share the result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event()}
+        if not leader:
+            call['done'].wait()
+        else:
+            try:
+                call['result'] = func()
+            except Exception as e:
+                call['error'] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call['done'].set()
+        if 'error' in call:
+            raise call['error']
+        return call['result']
+
+def bucket_radius(radius):
+    for bucket in RADIUS_BUCKETS:
+        if radius <= bucket:
+            return bucket
+    return RADIUS_BUCKETS[-1]
+
+def tile_for(lat, lng, radius):
+    """Return the geohash tile, its centre and the radius covering it for a query."""
+    tile = geohash_encode(lat, lng, precision_for(radius / 4))
+    center = geohash_center(tile)
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(tile)
+    half_diagonal = haversine_m(min_lat, min_lng, max_lat, max_lng) / 2
+    return tile, center, radius + half_diagonal
+
+class PlacesClient:
+    def __init__(self, api_key, session=None, timeout=(3.05, 10), cache_size=2048, cache_ttl=600,
+                 guard=None, max_pages=1, page_delay=2.0):
+        self.api_key = api_key
+        self.guard = guard
+        self.max_pages = max_pages
+        self.page_delay = page_delay
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self._cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self._flight = SingleFlight()
+
+    def nearby(self, lat, lng, radius, place_type):
+        """Return the upstream response for places within radius metres of a point."""
+        bucket = bucket_radius(radius)
+        tile, center, search_radius = tile_for(lat, lng, bucket)
+        key = (tile, bucket, place_type)
+
+        data = self._cache.get(key)
+        if data is None:
+            data = self._flight.do(key, lambda: self._fetch_tile(key, center, search_radius, place_type))
+
+        results = [place for place in data.get('results', [])
+                   if self._distance(lat, lng, place) <= radius]
+        return {**data, 'results': results}
+
+    def _fetch_tile(self, key, center, search_radius, place_type):
+        # Another caller may have filled the tile while this one waited for the lock
+        data = self._cache.get(key)
+        if data is not None:
+            return data
+        response = self._get({
+            'location': f'{center[0]},{center[1]}',
+            'radius': int(min(search_radius, RADIUS_BUCKETS[-1])),
+            'type': place_type,
+            'key': self.api_key
+        })
+        data = response.json()
+        if response.status_code != 200 or data.get('status') not in CACHEABLE_STATUSES:
+            return data
+
+        results, token, pages = list(data.get('results', [])), data.get('next_page_token'), 1
+        while token and pages < self.max_pages:
+            # A token only becomes valid a short while after the page that returned it
+            time.sleep(self.page_delay)
+            page = self._get({'pagetoken': token, 'key': self.api_key})
+            page_data = page.json()
+            if page.status_code != 200 or page_data.get('status') != 'OK':
+                break
+            results.extend(page_data.get('results', []))
+            token, pages = page_data.get('next_page_token'), pages + 1
+
+        data = dict(data, results=results)
+        if token:
+            data['next_page_token'] = token
+        else:
+            data.pop('next_page_token', None)
+        self._cache.set(key, data)
+        return data
+
+    def _get(self, params):
+        if self.guard:
+            return self.guard.call(self.session.get, NEARBY_SEARCH_URL, params=params,
+                                   timeout=self.timeout, is_failure=lambda r: r.status_code >= 500)
+        return self.session.get(NEARBY_SEARCH_URL, params=params, timeout=self.timeout)
+
+    @staticmethod
+    def _distance(lat, lng, place):
+        location = place.get('geometry', {}).get('location')
+        if not location:
+            return float('inf')
+        return haversine_m(lat, lng, location['lat'], location['lng'])
+
+def get_places_client():
+    """Return the Places client of the current app, creating it on first use."""
+    client = current_app.extensions.get('places_client')
+    if client is None:
+        config = current_app.config
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config['PLACES_POOL_SIZE'])
+        session.mount('https://', adapter)
+        client = PlacesClient(
+            config['GOOGLE_PLACES_API_KEY'],
+            session=session,
+            timeout=(config['PLACES_CONNECT_TIMEOUT'], config['PLACES_READ_TIMEOUT']),
+            cache_size=config['PLACES_CACHE_SIZE'],
+            cache_ttl=config['PLACES_CACHE_TTL'],
+            guard=get_upstream_guard('places'),
+            max_pages=config['PLACES_MAX_PAGES'],
+            page_delay=config['PLACES_PAGE_DELAY']
+        )
+        current_app.extensions['places_client'] = client
+    return client
@@ -1,7 +1,7 @@
 from flask import jsonify, request
 from flask_jwt_extended import jwt_required
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+from common.upstream import UpstreamUnavailable
+from explore.geocoding import GeocoderError, get_geocoder
 from .. import explore_bp
 import os
 import requests
@@ -21,15 +21,15 @@ def get_coordinates():
         }), 400
     
     try:
-        # Current implementation using Nominatim
-        geolocator = Nominatim(user_agent="go_tripping")
-        location = geolocator.geocode(address)
+        # Current implementation using Nominatim, behind the geocode cache
+        coordinates = get_geocoder().geocode(address)
         
-        if location:
+        if coordinates:
+            latitude, longitude = coordinates
             return jsonify({
                 'address': address,
-                'latitude': location.latitude,
-                'longitude': location.longitude
+                'latitude': latitude,
+                'longitude': longitude
             }), 200
         else:
             return jsonify({
@@ -70,7 +70,11 @@ def get_coordinates():
             }), 404
         """
             
-    except (GeocoderTimedOut, GeocoderUnavailable) as e:
+    except UpstreamUnavailable as e:
+        return jsonify({
+            'error': 'Geocoding service is currently unavailable'
+        }), 503, {'Retry-After': str(e.retry_after)}
+    except GeocoderError as e:
         return jsonify({
             'error': 'Geocoding service is currently unavailable'
         }), 503
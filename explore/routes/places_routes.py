@@ -1,7 +1,8 @@
-from flask import jsonify, request
+from flask import current_app, jsonify, request
 from flask_jwt_extended import jwt_required
+from common.upstream import UpstreamUnavailable
+from explore.places import get_places_client
 from .. import explore_bp
-import os
 import requests
 
 @explore_bp.route('/places', methods=['GET'])
@@ -17,40 +18,41 @@ def get_places():
             return jsonify({
                 'error': 'Latitude and longitude are required'
             }), 400
+        try:
+            lat, lng, radius = float(lat), float(lng), float(radius)
+        except ValueError:
+            return jsonify({
+                'error': 'Latitude, longitude and radius must be numbers'
+            }), 400
 
-        # Get API key from environment variables
-        api_key = os.getenv('GOOGLE_PLACES_API_KEY')
-        print(f"API Key loaded: {'Yes' if api_key else 'No'}")  # Debug print
-        
-        if not api_key:
+        if not current_app.config.get('GOOGLE_PLACES_API_KEY'):
             return jsonify({
                 'error': 'Google Places API key not configured'
             }), 500
 
-        # Construct the Google Places API URL
-        url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-        params = {
-            'location': f"{lat},{lng}",
-            'radius': radius,
-            'type': type,
-            'key': api_key
-        }
-
-        # Make request to Google Places API
-        response = requests.get(url, params=params)
-        data = response.json()
+        # Served from the tile cache; misses make one pooled, time-limited upstream call
+        data = get_places_client().nearby(lat, lng, radius, type)
 
-        if response.status_code == 200 and data.get('status') == 'OK':
+        if data.get('status') == 'OK':
             return jsonify(data), 200
         else:
             return jsonify({
                 'error': 'Could not fetch places',
                 'details': data.get('error_message', 'Unknown error')
             }), 404
-            
+
+    except UpstreamUnavailable as e:
+        return jsonify({
+            'error': 'Places service is currently unavailable'
+        }), 503, {'Retry-After': str(e.retry_after)}
+    except requests.Timeout:
+        current_app.logger.warning('Places upstream timed out')
+        return jsonify({
+            'error': 'Places service is currently unavailable'
+        }), 503
     except Exception as e:
-        print(f"Error: {str(e)}")  # Debug print
+        current_app.logger.exception('Fetching places failed')
         return jsonify({
             'error': 'An error occurred while fetching places',
             'details': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
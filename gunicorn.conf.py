@@ -0,0 +1,25 @@
+"""Gunicorn settings: gunicorn -c gunicorn.conf.py "app:create_app()"
+
+Threaded workers (gthread) let a process keep serving while some of its
+threads wait on the explore upstreams (Nominatim, Google Places); those
+calls are further bounded per process by common/upstream.py so a slow
+upstream cannot occupy every thread.
+
+Each worker sizes its database pool to its thread count (see
+common/db_pool.py), so a host opens at most
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv('WEB_CONCURRENCY', 4))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+def post_fork(server, worker):
+    # With preload_app the engine may already hold connections opened in the
+    # master; a forked worker must not share those sockets with its siblings
+    from common.db_pool import dispose_engines
+    dispose_engines(worker.app.wsgi())
@@ -0,0 +1,42 @@
+from datetime import datetime
+import json
+from app import db
+
+class Job(db.Model):
+    """A unit of background work, claimed and run by worker.py."""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON keyword arguments
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'running' or 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    periodic = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_job_status_run_at', 'status', 'run_at'),
+        # At most one live run of each periodic job, however many workers schedule it
+        db.Index('ix_job_periodic_name', 'name', unique=True,
+                 postgresql_where=db.text("periodic AND status IN ('pending', 'running')"),
+                 sqlite_where=db.text("periodic AND status IN ('pending', 'running')")),
+    )
+
+    @property
+    def kwargs(self):
+        return json.loads(self.payload or '{}')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'payload': self.kwargs,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
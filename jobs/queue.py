@@ -0,0 +1,158 @@
+"""A small durable job queue on top of the ``job`` table.
+
+Routes call ``enqueue`` before committing, so a job row is written in the
+same transaction as the change that needs it: if the write rolls back, so
+does the job. ``worker.py`` claims due jobs one at a time, runs the
+registered function with the stored keyword arguments and deletes the row
+on success. A failing job is retried with exponential backoff
+(JOBS_BACKOFF_BASE * 2**attempt, capped at JOBS_BACKOFF_MAX) until it has
+used max_attempts, then kept with status 'failed' for inspection. Jobs left
+'running' by a worker that died are reclaimed after JOBS_LOCK_TIMEOUT.
+
+With JOBS_RUN_INLINE (tests and single-process development) due jobs run
+at the end of the request that enqueued them instead.
+"""
+import json
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from common.sql import insert_ignoring_duplicates
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+def register(name, func, max_attempts=None):
+    """Make func runnable as the job called name."""
+    _registry[name] = (func, max_attempts)
+
+def _load_tasks():
+    # Registration happens on import; the worker may not have imported them yet
+    import jobs.tasks  # noqa: F401
+
+def _job_values(name, delay, kwargs):
+    _load_tasks()
+    if name not in _registry:
+        raise KeyError(f'Unknown job: {name}')
+    return {'name': name, 'payload': json.dumps(kwargs),
+            'max_attempts': _registry[name][1] or current_app.config['JOBS_MAX_ATTEMPTS'],
+            'run_at': datetime.utcnow() + (delay or timedelta(0))}
+
+def enqueue(name, delay=None, **kwargs):
+    """Add a job to the current session; it is committed with the caller's transaction."""
+    job = Job(**_job_values(name, delay, kwargs))
+    db.session.add(job)
+    return job
+
+def backoff(attempts):
+    """Delay before retrying a job that has failed attempts times, with jitter."""
+    config = current_app.config
+    delay = min(config['JOBS_BACKOFF_BASE'] * 2 ** (attempts - 1), config['JOBS_BACKOFF_MAX'])
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+def claim():
+    """Lock the next due job for this worker and return it, or None."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=current_app.config['JOBS_LOCK_TIMEOUT'])
+    job = Job.query.filter(db.or_(
+        db.and_(Job.status == 'pending', Job.run_at <= now),
+        db.and_(Job.status == 'running', Job.locked_at < stale)
+    )).order_by(Job.run_at).with_for_update(skip_locked=True).first()
+    if job is None:
+        db.session.rollback()
+        return None
+    job.status = 'running'
+    job.locked_at = now
+    job.attempts += 1
+    db.session.commit()
+    return job
+
+def execute(job):
+    """Run a claimed job; returns True if it succeeded."""
+    _load_tasks()
+    try:
+        func = _registry[job.name][0]
+        func(**job.kwargs)
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Job %s (%s) failed on attempt %d', job.id, job.name, job.attempts)
+        if job.attempts < job.max_attempts:
+            job.status = 'pending'
+            job.run_at = datetime.utcnow() + backoff(job.attempts)
+        else:
+            job.status = 'failed'
+        job.locked_at = None
+        job.last_error = f'{type(e).__name__}: {e}'
+        db.session.commit()
+        return False
+    db.session.delete(job)
+    db.session.commit()
+    return True
+
+def run_pending(limit=None):
+    """Run due jobs until none are left (or limit have run); returns how many ran."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim()
+        if job is None:
+            break
+        execute(job)
+        ran += 1
+    return ran
+
+def periodic_jobs():
+    """Jobs the worker keeps scheduled, with their interval in seconds (0 disables)."""
+    config = current_app.config
+    return {
+        'blocklist.prune': config['BLOCKLIST_PRUNE_INTERVAL'],
+        'counters.reconcile': config['COUNTER_RECONCILE_INTERVAL'],
+        'feed.trim': config['FEED_TRIM_INTERVAL'] if config['FEED_FANOUT_ENABLED'] else 0,
+    }
+
+def schedule_periodic():
+    """Enqueue each periodic job that has no pending or running run yet.
+
+    The check is the unique index ix_job_periodic_name, so workers scheduling
+    at the same time cannot both add a run.
+    """
+    scheduled = []
+    for name, interval in periodic_jobs().items():
+        if not interval:
+            continue
+        values = _job_values(name, timedelta(seconds=interval), {})
+        if insert_ignoring_duplicates(Job.__table__, {**values, 'periodic': True}):
+            scheduled.append(name)
+    db.session.commit()
+    return scheduled
+
+def run_worker(stop_event=None):
+    """Claim and run jobs until stop_event is set, sleeping when the queue is empty."""
+    stop_event = stop_event or threading.Event()
+    poll_interval = current_app.config['JOBS_POLL_INTERVAL']
+    logger.info('Job worker started')
+    while not stop_event.is_set():
+        try:
+            schedule_periodic()
+            if not run_pending(limit=100):
+                stop_event.wait(poll_interval)
+        except Exception:
+            db.session.rollback()
+            logger.exception('Job worker loop failed')
+            stop_event.wait(poll_interval)
+        finally:
+            db.session.remove()
+
+def init_app(app):
+    @app.after_request
+    def run_inline_jobs(response):
+        if app.config['JOBS_RUN_INLINE']:
+            try:
+                run_pending()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('Inline jobs failed')
+        return response
@@ -0,0 +1,24 @@
+"""Registry of the functions that can run as background jobs."""
+from flask import current_app
+from auth.blocklist import prune_blocklist
+from common.counters import reconcile_counters
+from common.response_cache import response_cache
+from community.feed import push_post, rebuild_timeline, trim_timelines
+from jobs.queue import register
+
+def prune_expired_blocklist():
+    prune_blocklist(batch_size=current_app.config['BLOCKLIST_PRUNE_BATCH_SIZE'])
+
+def trim_feed_timelines():
+    trim_timelines(batch_size=current_app.config['FEED_TRIM_BATCH_SIZE'])
+
+def invalidate_cache(tags):
+    # Raises if the store is still unreachable, so the job is retried
+    response_cache.invalidate(*tags, retry=False)
+
+register('feed.push_post', push_post)
+register('feed.rebuild_timeline', rebuild_timeline)
+register('feed.trim', trim_feed_timelines)
+register('blocklist.prune', prune_expired_blocklist)
+register('counters.reconcile', reconcile_counters, max_attempts=3)
+register('cache.invalidate', invalidate_cache)
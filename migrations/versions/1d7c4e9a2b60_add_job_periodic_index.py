@@ -0,0 +1,33 @@
+"""add periodic flag and unique live-run index to job
+
+Revision ID: 1d7c4e9a2b60
+Revises: 5f8fba58a775
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1d7c4e9a2b60'
+down_revision = '5f8fba58a775'
+branch_labels = None
+depends_on = None
+
+LIVE_PERIODIC = sa.text("periodic AND status IN ('pending', 'running')")
+
+
+def upgrade():
+    with op.batch_alter_table('job') as batch_op:
+        batch_op.add_column(sa.Column('periodic', sa.Boolean(), nullable=False,
+                                      server_default=sa.false()))
+    # Rows scheduled before this migration are not marked periodic, so they cannot conflict
+    op.create_index('ix_job_periodic_name', 'job', ['name'], unique=True,
+                    postgresql_where=LIVE_PERIODIC, sqlite_where=LIVE_PERIODIC)
+
+
+def downgrade():
+    op.drop_index('ix_job_periodic_name', table_name='job')
+    with op.batch_alter_table('job') as batch_op:
+        batch_op.drop_column('periodic')
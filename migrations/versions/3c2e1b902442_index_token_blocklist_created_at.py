@@ -0,0 +1,33 @@
+"""index token_blocklist created_at for pruning
+
+Revision ID: 3c2e1b902442
+Revises: 795f1fa92a71
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c2e1b902442'
+down_revision = '795f1fa92a71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Older databases got this table from db.create_all() rather than a migration
+    if not sa.inspect(op.get_bind()).has_table('token_blocklist'):
+        op.create_table('token_blocklist',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('jti')
+        )
+    op.create_index(op.f('ix_token_blocklist_created_at'), 'token_blocklist', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_token_blocklist_created_at'), table_name='token_blocklist')
@@ -0,0 +1,37 @@
+"""add created_at to followers
+
+Revision ID: 5f8fba58a775
+Revises: bbcefb5f0607
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f8fba58a775'
+down_revision = 'bbcefb5f0607'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing follows get the migration time; when they happened was never recorded.
+    # Batch mode lets SQLite add a column with a non-constant default.
+    with op.batch_alter_table('followers') as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=False,
+                                      server_default=sa.func.now()))
+    op.drop_index('ix_followers_followed_id', table_name='followers')
+    op.create_index('ix_followers_followed_id_created_at', 'followers',
+                    ['followed_id', 'created_at', 'follower_id'], unique=False)
+    op.create_index('ix_followers_follower_id_created_at', 'followers',
+                    ['follower_id', 'created_at', 'followed_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_followers_follower_id_created_at', table_name='followers')
+    op.drop_index('ix_followers_followed_id_created_at', table_name='followers')
+    op.create_index('ix_followers_followed_id', 'followers', ['followed_id'], unique=False)
+    with op.batch_alter_table('followers') as batch_op:
+        batch_op.drop_column('created_at')
@@ -0,0 +1,59 @@
+"""add denormalized counter columns
+
+Revision ID: 795f1fa92a71
+Revises: ee6e5a58376c
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '795f1fa92a71'
+down_revision = 'ee6e5a58376c'
+branch_labels = None
+depends_on = None
+
+COUNTERS = {
+    'user': ['followers_count', 'following_count'],
+    'community': ['members_count', 'posts_count'],
+    'post': ['likes_count', 'dislikes_count', 'comments_count'],
+}
+
+
+def upgrade():
+    for table, columns in COUNTERS.items():
+        for column in columns:
+            op.add_column(table, sa.Column(column, sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill the counters from the rows they summarize
+    op.execute("""
+        UPDATE "user" SET
+            followers_count = (SELECT COUNT(*) FROM followers
+                               WHERE followers.followed_id = "user".id
+                               AND followers.follower_id != followers.followed_id),
+            following_count = (SELECT COUNT(*) FROM followers
+                               WHERE followers.follower_id = "user".id
+                               AND followers.follower_id != followers.followed_id)
+    """)
+    op.execute("""
+        UPDATE community SET
+            members_count = (SELECT COUNT(*) FROM community_members
+                             WHERE community_members.community_id = community.id),
+            posts_count = (SELECT COUNT(*) FROM post WHERE post.community_id = community.id)
+    """)
+    op.execute("""
+        UPDATE post SET
+            likes_count = (SELECT COUNT(*) FROM reaction
+                           WHERE reaction.post_id = post.id AND reaction.reaction_type = 'like'),
+            dislikes_count = (SELECT COUNT(*) FROM reaction
+                              WHERE reaction.post_id = post.id AND reaction.reaction_type = 'dislike'),
+            comments_count = (SELECT COUNT(*) FROM comment WHERE comment.post_id = post.id)
+    """)
+
+
+def downgrade():
+    for table, columns in COUNTERS.items():
+        for column in reversed(columns):
+            op.drop_column(table, column)
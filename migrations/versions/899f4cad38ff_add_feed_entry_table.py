@@ -0,0 +1,36 @@
+"""add feed_entry table for fan-out-on-write timelines
+
+Revision ID: 899f4cad38ff
+Revises: d28e17669c15
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '899f4cad38ff'
+down_revision = 'd28e17669c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('feed_entry',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.ForeignKeyConstraint(['post_id'], ['post.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'post_id')
+    )
+    op.create_index('ix_feed_entry_user_id_created_at_post_id', 'feed_entry',
+                    ['user_id', 'created_at', 'post_id'], unique=False)
+    op.create_index('ix_feed_entry_post_id', 'feed_entry', ['post_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_feed_entry_post_id', table_name='feed_entry')
+    op.drop_index('ix_feed_entry_user_id_created_at_post_id', table_name='feed_entry')
+    op.drop_table('feed_entry')
@@ -0,0 +1,39 @@
+"""make created_at NOT NULL on paginated tables
+
+Revision ID: 8a3f61c2d95e
+Revises: 1d7c4e9a2b60
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a3f61c2d95e'
+down_revision = '1d7c4e9a2b60'
+branch_labels = None
+depends_on = None
+
+# Listings page on (created_at, id), which cannot place or encode a NULL.
+# Rows that never recorded a creation time get their last edit, or else the
+# migration time.
+BACKFILL = {
+    'community': 'CURRENT_TIMESTAMP',
+    'post': 'COALESCE(updated_at, CURRENT_TIMESTAMP)',
+    'comment': 'COALESCE(updated_at, CURRENT_TIMESTAMP)',
+    'bookmark': 'CURRENT_TIMESTAMP',
+}
+
+
+def upgrade():
+    for table, value in BACKFILL.items():
+        op.execute(f'UPDATE {table} SET created_at = {value} WHERE created_at IS NULL')
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for table in reversed(list(BACKFILL)):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
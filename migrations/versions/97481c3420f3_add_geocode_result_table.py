@@ -0,0 +1,36 @@
+"""add geocode_result cache table
+
+Revision ID: 97481c3420f3
+Revises: ce6b87411619
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '97481c3420f3'
+down_revision = 'ce6b87411619'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('geocode_result',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('query_key', sa.String(length=255), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('found', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('query_key')
+    )
+    op.create_index('ix_geocode_result_expires_at', 'geocode_result', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_geocode_result_expires_at', table_name='geocode_result')
+    op.drop_table('geocode_result')
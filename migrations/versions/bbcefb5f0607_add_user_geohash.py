@@ -0,0 +1,45 @@
+"""add geohash column to user
+
+Revision ID: bbcefb5f0607
+Revises: 97481c3420f3
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from common.geo import geohash_encode
+
+
+# revision identifiers, used by Alembic.
+revision = 'bbcefb5f0607'
+down_revision = '97481c3420f3'
+branch_labels = None
+depends_on = None
+
+GEOHASH_PRECISION = 9
+
+
+def upgrade():
+    op.add_column('user', sa.Column('geohash', sa.String(length=12), nullable=True))
+    op.create_index('ix_user_geohash', 'user', ['geohash'], unique=False)
+
+    # Backfill located users; geohashes are computed in Python, not SQL
+    connection = op.get_bind()
+    user = sa.table('user', sa.column('id'), sa.column('latitude'), sa.column('longitude'),
+                    sa.column('geohash'))
+    rows = connection.execute(
+        sa.select(user.c.id, user.c.latitude, user.c.longitude)
+        .where(user.c.latitude.isnot(None)).where(user.c.longitude.isnot(None))
+    ).fetchall()
+    if rows:
+        connection.execute(
+            user.update().where(user.c.id == sa.bindparam('user_id'))
+                .values(geohash=sa.bindparam('new_geohash')),
+            [{'user_id': id, 'new_geohash': geohash_encode(lat, lng, GEOHASH_PRECISION)}
+             for id, lat, lng in rows]
+        )
+
+
+def downgrade():
+    op.drop_index('ix_user_geohash', table_name='user')
+    op.drop_column('user', 'geohash')
@@ -0,0 +1,25 @@
+"""add position column to image
+
+Revision ID: ce6b87411619
+Revises: ba46109e9836
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ce6b87411619'
+down_revision = 'ba46109e9836'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing images keep their id order: position 0 ties are broken by id
+    op.add_column('image', sa.Column('position', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('image', 'position')
@@ -0,0 +1,38 @@
+"""add indexes for the hot query shapes
+
+Revision ID: d28e17669c15
+Revises: ea39bc093de9
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd28e17669c15'
+down_revision = 'ea39bc093de9'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_post_author_id_post_type_created_at', 'post', ['author_id', 'post_type', 'created_at']),
+    ('ix_post_community_id_created_at', 'post', ['community_id', 'created_at']),
+    ('ix_comment_post_id_created_at', 'comment', ['post_id', 'created_at']),
+    ('ix_reaction_post_id_reaction_type', 'reaction', ['post_id', 'reaction_type']),
+    ('ix_bookmark_user_id_created_at', 'bookmark', ['user_id', 'created_at']),
+    ('ix_image_post_id', 'image', ['post_id']),
+    ('ix_followers_followed_id', 'followers', ['followed_id']),
+    ('ix_community_members_community_id', 'community_members', ['community_id']),
+    ('ix_user_createdAt', 'user', ['createdAt']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
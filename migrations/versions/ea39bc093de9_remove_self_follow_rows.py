@@ -0,0 +1,32 @@
+"""remove self-follow rows
+
+Revision ID: ea39bc093de9
+Revises: 3c2e1b902442
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ea39bc093de9'
+down_revision = '3c2e1b902442'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Registration used to make every user follow themselves; the feed and the
+    # follower counters now treat "self" explicitly, so these rows are dead weight.
+    # The counters already exclude them, so no counter needs adjusting.
+    op.execute("DELETE FROM followers WHERE follower_id = followed_id")
+
+
+def downgrade():
+    op.execute("""
+        INSERT INTO followers (follower_id, followed_id)
+        SELECT id, id FROM "user"
+        WHERE NOT EXISTS (SELECT 1 FROM followers
+                          WHERE follower_id = "user".id AND followed_id = "user".id)
+    """)
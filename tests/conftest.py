@@ -1,6 +1,7 @@
 import pytest
 import os
 import tempfile
+from sqlalchemy import event
 from app import create_app, db
 from auth.models import User, TokenBlocklist
 from community.models import Post, Comment, Reaction, Bookmark, Community, Image
@@ -16,6 +17,10 @@ class Config:
     SECRET_KEY = 'test-secret-key'
     JWT_SECRET_KEY = 'test-jwt-secret-key'
     JWT_ACCESS_TOKEN_EXPIRES = False  # Disable token expiration for testing
+    BLOCKLIST_PRUNE_INTERVAL = 0  # No background pruning thread during tests
+    BCRYPT_POOL_SIZE = 0  # Hash inline rather than in a process pool
+    JOBS_RUN_INLINE = True  # Run queued jobs at the end of each request
+    WEB_CONCURRENCY = 1  # A single process serves the tests
 
 @pytest.fixture
 def app():
@@ -118,6 +123,52 @@ def create_test_image(db_session, post_id, **kwargs):
     db_session.commit()
     return image
 
+def auth_headers_for(user):
+    """Build authorization headers carrying a fresh access token for a user."""
+    from flask_jwt_extended import create_access_token
+
+    token = create_access_token(identity=str(user.id))
+    return {'Authorization': f'Bearer {token}'}
+
+class QueryCounter:
+    """Context manager recording the SQL statements issued on an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+@pytest.fixture
+def query_counter(app):
+    """Count the SQL statements issued inside `with query_counter:` blocks.
+
+    Responses are not cached and per-worker state (blocklist, nearby grid) is
+    refreshed on every request, so repeating a request repeats its queries.
+    """
+    app.extensions['response_cache'] = None
+    app.config['BLOCKLIST_POLL_INTERVAL'] = 0
+    app.config['NEARBY_REFRESH_INTERVAL'] = 0
+    return QueryCounter(db.engine)
+
+def insert_rows(db_session, table, rows):
+    """Insert many rows into a table with a single executemany."""
+    db_session.execute(table.insert(), rows)
+    db_session.commit()
+
 # Fixtures for test data
 @pytest.fixture
 def sample_user(db_session):
@@ -0,0 +1,51 @@
+import pytest
+from community.routes import community_routes
+from tests.conftest import create_test_user, create_test_community, auth_headers_for
+
+class TestCommunityMembers:
+    """Integration tests for community member listing."""
+
+    def _community_with_members(self, db_session, count):
+        community = create_test_community(db_session)
+        members = [create_test_user(db_session) for _ in range(count)]
+        for member in members:
+            community.add_member(member.id)
+        db_session.commit()
+        expected = [m.id for m in sorted(members, key=lambda m: (m.createdAt, m.id), reverse=True)]
+        return community.id, expected, auth_headers_for(members[0])
+
+    def test_community_returns_first_page_of_members(self, client, db_session, monkeypatch):
+        """Test community details embed only the first page of members."""
+        monkeypatch.setattr(community_routes, 'MEMBERS_PREVIEW_SIZE', 2)
+        community_id, expected, headers = self._community_with_members(db_session, 3)
+
+        data = client.get(f'/api/communities/{community_id}', headers=headers).get_json()
+
+        assert [m['id'] for m in data['members_details']] == expected[:2]
+        assert data['members_next_cursor'] is not None
+        assert data['members_count'] == 3
+        assert data['is_member'] is True
+        assert 'members' not in data
+
+    def test_members_endpoint_streams_pages(self, client, db_session):
+        """Test the members endpoint walks every member with a cursor."""
+        community_id, expected, headers = self._community_with_members(db_session, 5)
+
+        ids, cursor = [], None
+        while True:
+            url = f'/api/communities/{community_id}/members?per_page=2'
+            response = client.get(url + (f'&cursor={cursor}' if cursor else ''), headers=headers)
+            assert response.status_code == 200
+            data = response.get_json()
+            ids += [m['id'] for m in data['members']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+
+        assert ids == expected
+
+    def test_members_endpoint_unknown_community(self, client, db_session):
+        """Test listing members of a missing community returns 404."""
+        headers = auth_headers_for(create_test_user(db_session))
+
+        assert client.get('/api/communities/999/members', headers=headers).status_code == 404
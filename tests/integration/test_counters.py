@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime
+from app import db
+from auth.models import User
+from community.models import Post, Community
+from common.counters import reconcile_counters
+from tests.conftest import (
+    create_test_user, create_test_post, create_test_community, auth_headers_for
+)
+
+class TestCounters:
+    """Integration tests for the denormalized counter columns."""
+
+    def test_reaction_counters(self, client, db_session):
+        """Test like, dislike and remove keep the post counters in sync."""
+        user = create_test_user(db_session)
+        post_id = create_test_post(db_session, user.id).id
+        headers = auth_headers_for(user)
+
+        client.post(f'/api/posts/{post_id}/like', headers=headers)
+        post = Post.query.get(post_id)
+        assert (post.likes_count, post.dislikes_count) == (1, 0)
+
+        client.post(f'/api/posts/{post_id}/dislike', headers=headers)
+        post = Post.query.get(post_id)
+        assert (post.likes_count, post.dislikes_count) == (0, 1)
+
+        client.delete(f'/api/posts/{post_id}/reaction', headers=headers)
+        post = Post.query.get(post_id)
+        assert (post.likes_count, post.dislikes_count) == (0, 0)
+
+    def test_comment_counter(self, client, db_session):
+        """Test creating and deleting comments keeps comments_count in sync."""
+        user = create_test_user(db_session)
+        post_id = create_test_post(db_session, user.id).id
+        headers = auth_headers_for(user)
+
+        comment_id = client.post(f'/api/posts/{post_id}/comments', json={'content': 'Hi'},
+                                 headers=headers).get_json()['id']
+        client.post(f'/api/posts/{post_id}/comments', json={'content': 'Again'}, headers=headers)
+        assert Post.query.get(post_id).comments_count == 2
+
+        client.delete(f'/api/comments/{comment_id}', headers=headers)
+        assert Post.query.get(post_id).comments_count == 1
+
+    def test_follow_and_membership_counters(self, client, db_session):
+        """Test follow/unfollow and join/leave keep user and community counters in sync."""
+        user = create_test_user(db_session)
+        other = create_test_user(db_session)
+        community = create_test_community(db_session)
+        user_id, other_id, community_id = user.id, other.id, community.id
+        headers = auth_headers_for(user)
+
+        client.post(f'/api/users/{other_id}/follow', headers=headers)
+        client.post(f'/api/communities/{community_id}/join', headers=headers)
+        assert User.query.get(user_id).following_count == 1
+        assert User.query.get(other_id).followers_count == 1
+        assert Community.query.get(community_id).members_count == 1
+
+        client.post(f'/api/users/{other_id}/unfollow', headers=headers)
+        client.post(f'/api/communities/{community_id}/leave', headers=headers)
+        assert User.query.get(user_id).following_count == 0
+        assert User.query.get(other_id).followers_count == 0
+        assert Community.query.get(community_id).members_count == 0
+
+    def test_counters_leave_updated_at_unchanged(self, client, db_session):
+        """Test likes, follows and reconciliation do not touch updated_at/updatedAt."""
+        stamp = datetime(2020, 1, 1, 12, 0, 0)
+        user = create_test_user(db_session)
+        other = create_test_user(db_session)
+        post = create_test_post(db_session, other.id)
+        post.updated_at = stamp
+        user.updatedAt = other.updatedAt = stamp
+        db_session.commit()
+        user_id, other_id, post_id = user.id, other.id, post.id
+        headers = auth_headers_for(user)
+
+        client.post(f'/api/posts/{post_id}/like', headers=headers)
+        client.post(f'/api/users/{other_id}/follow', headers=headers)
+        db.session.query(Post).filter(Post.id == post_id).update(
+            {Post.likes_count: 7, Post.updated_at: stamp}, synchronize_session=False)
+        db_session.commit()
+        reconcile_counters()
+        db_session.expire_all()
+
+        post = Post.query.get(post_id)
+        assert post.likes_count == 1
+        assert post.updated_at == stamp
+        assert User.query.get(user_id).updatedAt == stamp
+        assert User.query.get(other_id).updatedAt == stamp
+
+    def test_reconcile_repairs_drift(self, db_session):
+        """Test the reconciliation pass repairs counters that drifted."""
+        user = create_test_user(db_session)
+        community = create_test_community(db_session)
+        post = create_test_post(db_session, user.id, community_id=community.id, post_type='community')
+        post.likes_count = 7
+        community.posts_count = 0
+        db_session.commit()
+
+        repaired = reconcile_counters()
+
+        assert repaired['post.likes_count'] == 1
+        assert repaired['community.posts_count'] == 1
+        assert repaired['user.followers_count'] == 0
+        assert Post.query.get(post.id).likes_count == 0
+        assert Community.query.get(community.id).posts_count == 1
+
+    def test_reconcile_command(self, runner, db_session):
+        """Test the reconcile-counters command reports repaired rows."""
+        result = runner.invoke(args=['reconcile-counters'])
+
+        assert result.exit_code == 0
+        assert 'post.likes_count: 0 row(s) repaired' in result.output
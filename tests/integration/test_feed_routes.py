@@ -0,0 +1,166 @@
+import pytest
+from datetime import datetime, timedelta
+from community.feed import trim_timelines
+from community.models import FeedEntry
+from jobs.queue import periodic_jobs
+from tests.conftest import (
+    create_test_user, create_test_post, create_test_community, auth_headers_for, insert_rows
+)
+
+class TestFeedRoutes:
+    """Integration tests for the home feed."""
+
+    def _build_graph(self, db_session):
+        viewer = create_test_user(db_session)
+        followed = create_test_user(db_session)
+        stranger = create_test_user(db_session)
+        community = create_test_community(db_session)
+        other_community = create_test_community(db_session)
+
+        viewer.following.append(followed)
+        community.members.append(viewer)
+        db_session.commit()
+
+        base = datetime(2024, 1, 1)
+        posts = {
+            'own': create_test_post(db_session, viewer.id),
+            'followed': create_test_post(db_session, followed.id),
+            'community': create_test_post(db_session, stranger.id, community_id=community.id,
+                                          post_type='community'),
+            'stranger': create_test_post(db_session, stranger.id),
+            'other_community': create_test_post(db_session, stranger.id,
+                                                community_id=other_community.id,
+                                                post_type='community'),
+        }
+        for offset, post in enumerate(posts.values()):
+            post.created_at = base + timedelta(minutes=offset)
+        db_session.commit()
+        # Routes close the session, so hand back plain ids
+        return auth_headers_for(viewer), {name: post.id for name, post in posts.items()}
+
+    def test_feed_contains_reachable_posts_newest_first(self, client, db_session):
+        """Test the feed returns joined, followed and own posts in order."""
+        headers, posts = self._build_graph(db_session)
+
+        response = client.get('/api/feed', headers=headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [p['id'] for p in data['posts']] == [
+            posts['community'], posts['followed'], posts['own']
+        ]
+        assert data['total'] == 3
+        assert data['pages'] == 1
+        assert data['has_next'] is False
+
+    def test_feed_pagination(self, client, db_session):
+        """Test the feed is paginated in the database."""
+        headers, posts = self._build_graph(db_session)
+
+        first = client.get('/api/feed?per_page=2', headers=headers).get_json()
+        second = client.get('/api/feed?per_page=2&page=2', headers=headers).get_json()
+
+        assert [p['id'] for p in first['posts']] == [posts['community'], posts['followed']]
+        assert first['has_next'] is True
+        assert first['has_prev'] is False
+        assert [p['id'] for p in second['posts']] == [posts['own']]
+        assert second['has_next'] is False
+        assert second['has_prev'] is True
+
+    def test_feed_total_is_optional(self, client, db_session):
+        """Test the total count can be skipped."""
+        headers, _ = self._build_graph(db_session)
+
+        response = client.get('/api/feed?include_total=false', headers=headers)
+
+        data = response.get_json()
+        assert 'total' not in data
+        assert 'pages' not in data
+        assert len(data['posts']) == 3
+
+class TestFeedFanout:
+    """Integration tests for fan-out-on-write timelines."""
+
+    @pytest.fixture(autouse=True)
+    def enable_fanout(self, app):
+        app.config['FEED_FANOUT_ENABLED'] = True
+
+    def _feed_ids(self, client, headers):
+        return [post['id'] for post in client.get('/api/feed', headers=headers).get_json()['posts']]
+
+    def test_new_posts_are_pushed_to_followers_and_members(self, client, db_session):
+        """Test profile and community posts land in the audience's timelines."""
+        author, follower, member = (create_test_user(db_session) for _ in range(3))
+        follower.following.append(author)
+        community = create_test_community(db_session)
+        community.members.append(author)
+        community.members.append(member)
+        db_session.commit()
+        community_id = community.id
+        author_headers = auth_headers_for(author)
+        follower_headers, member_headers = auth_headers_for(follower), auth_headers_for(member)
+
+        profile_id = client.post('/api/profile/posts', json={'title': 'Hi', 'content': 'Profile'},
+                                 headers=author_headers).get_json()['post']['id']
+        community_post_id = client.post(f'/api/communities/{community_id}/posts',
+                                        json={'title': 'Hi', 'content': 'Community'},
+                                        headers=author_headers).get_json()['id']
+
+        assert FeedEntry.query.filter_by(post_id=profile_id).count() == 2
+        assert self._feed_ids(client, follower_headers) == [community_post_id, profile_id]
+        assert self._feed_ids(client, member_headers) == [community_post_id]
+
+    def test_large_audiences_are_pulled_on_read(self, app, client, db_session):
+        """Test posts of authors over the audience limit are read without entries."""
+        app.config['FEED_FANOUT_MAX_AUDIENCE'] = 0
+        author, follower = create_test_user(db_session), create_test_user(db_session)
+        follower.following.append(author)
+        author.followers_count = 1
+        db_session.commit()
+        author_headers, follower_headers = auth_headers_for(author), auth_headers_for(follower)
+
+        post_id = client.post('/api/profile/posts', json={'title': 'Hi', 'content': 'Big'},
+                              headers=author_headers).get_json()['post']['id']
+
+        assert FeedEntry.query.filter_by(post_id=post_id).count() == 1  # The author's own entry
+        assert self._feed_ids(client, follower_headers) == [post_id]
+
+    def test_follow_rebuilds_and_delete_removes(self, client, db_session):
+        """Test following backfills older posts and deleting a post drops its entries."""
+        author, reader = create_test_user(db_session), create_test_user(db_session)
+        post_id = create_test_post(db_session, author.id).id
+        author_id = author.id
+        author_headers, reader_headers = auth_headers_for(author), auth_headers_for(reader)
+
+        client.post(f'/api/users/{author_id}/follow', headers=reader_headers)
+        assert self._feed_ids(client, reader_headers) == [post_id]
+
+        client.delete(f'/api/profile/posts/{post_id}', headers=author_headers)
+        assert FeedEntry.query.filter_by(post_id=post_id).count() == 0
+        assert self._feed_ids(client, reader_headers) == []
+
+    def test_trim_keeps_newest_entries_of_each_timeline(self, app, db_session):
+        """Test trimming cuts every timeline back to its newest entries, batch by batch."""
+        author = create_test_user(db_session)
+        readers = [create_test_user(db_session) for _ in range(3)]
+        posts = [create_test_post(db_session, author.id) for _ in range(5)]
+        start = datetime(2024, 1, 1)
+        insert_rows(db_session, FeedEntry.__table__, [
+            {'user_id': reader.id, 'post_id': post.id, 'created_at': start + timedelta(minutes=i)}
+            for reader in readers[:2] for i, post in enumerate(posts)
+        ] + [{'user_id': readers[2].id, 'post_id': posts[0].id, 'created_at': start}])
+
+        assert trim_timelines(length=3, batch_size=2) == 4
+
+        for reader in readers[:2]:
+            kept = FeedEntry.query.filter_by(user_id=reader.id).order_by(FeedEntry.created_at).all()
+            assert [entry.post_id for entry in kept] == [post.id for post in posts[2:]]
+        assert FeedEntry.query.filter_by(user_id=readers[2].id).count() == 1
+
+    def test_trim_is_scheduled_with_fanout(self, app):
+        """Test the trim job is periodic only while fan-out is enabled."""
+        app.config['FEED_TRIM_INTERVAL'] = 60
+
+        assert periodic_jobs()['feed.trim'] == 60
+        app.config['FEED_FANOUT_ENABLED'] = False
+        assert periodic_jobs()['feed.trim'] == 0
@@ -0,0 +1,100 @@
+import pytest
+from datetime import datetime, timedelta
+from auth.models import followers
+from common.pagination import encode_cursor, decode_cursor
+from tests.conftest import (
+    create_test_user, create_test_post, create_test_community, auth_headers_for, insert_rows
+)
+
+class TestCursor:
+    """Test cases for cursor encoding."""
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes to the position it was built from."""
+        created_at = datetime(2024, 5, 17, 10, 30, 0, 123456)
+        assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+    def test_malformed_cursor(self):
+        """Test a malformed cursor is rejected."""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor('not-a-cursor')
+
+class TestKeysetPagination:
+    """Integration tests for cursor pagination on list endpoints."""
+
+    def _walk(self, client, url, key, headers):
+        ids, cursor, pages = [], None, 0
+        while True:
+            page_url = f'{url}?per_page=2' + (f'&cursor={cursor}' if cursor else '')
+            response = client.get(page_url, headers=headers)
+            assert response.status_code == 200
+            data = response.get_json()
+            ids += [item['id'] for item in data[key]]
+            pages += 1
+            cursor = data['next_cursor']
+            if cursor is None:
+                return ids, pages
+
+    def test_community_posts_pages(self, client, db_session):
+        """Test walking community posts page by page with a cursor."""
+        user = create_test_user(db_session)
+        community = create_test_community(db_session)
+        base = datetime(2024, 1, 1)
+        posts = [create_test_post(db_session, user.id, community_id=community.id,
+                                  post_type='community') for _ in range(5)]
+        # Two posts share a timestamp so the id tie-breaker is exercised
+        for offset, post in zip([0, 1, 1, 2, 3], posts):
+            post.created_at = base + timedelta(minutes=offset)
+        db_session.commit()
+        expected = [p.id for p in sorted(posts, key=lambda p: (p.created_at, p.id), reverse=True)]
+        community_id = community.id
+        headers = auth_headers_for(user)
+
+        ids, pages = self._walk(client, f'/api/communities/{community_id}/posts', 'posts', headers)
+
+        assert ids == expected
+        assert pages == 3
+
+    def test_users_pages(self, client, db_session):
+        """Test walking the user listing page by page with a cursor."""
+        users = [create_test_user(db_session) for _ in range(3)]
+        expected = [u.id for u in sorted(users, key=lambda u: (u.createdAt, u.id), reverse=True)]
+        headers = auth_headers_for(users[0])
+
+        ids, pages = self._walk(client, '/api/users', 'users', headers)
+
+        assert ids == expected
+        assert pages == 2
+
+    @pytest.mark.parametrize('listing, listed_column, other_column', [
+        ('followers', 'follower_id', 'followed_id'),
+        ('following', 'followed_id', 'follower_id'),
+    ])
+    def test_follow_listings_page_by_follow_time(self, client, db_session, listing, listed_column, other_column):
+        """Test follow listings run newest follow first, not by account age."""
+        user = create_test_user(db_session)
+        others = [create_test_user(db_session) for _ in range(3)]
+        base = datetime(2024, 1, 1)
+        # The newest account was followed first
+        insert_rows(db_session, followers, [
+            {listed_column: other.id, other_column: user.id, 'created_at': base + timedelta(minutes=minutes)}
+            for other, minutes in zip(others, [2, 1, 0])
+        ])
+        expected = [other.id for other in others]
+        url = f'/api/users/{user.id}/{listing}'
+        headers = auth_headers_for(user)
+
+        ids, pages = self._walk(client, url, listing, headers)
+
+        assert ids == expected
+        assert pages == 2
+
+    def test_invalid_cursor(self, client, db_session):
+        """Test an invalid cursor returns a 400."""
+        user = create_test_user(db_session)
+        headers = auth_headers_for(user)
+
+        response = client.get('/api/communities?cursor=garbage', headers=headers)
+
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid cursor'
@@ -0,0 +1,76 @@
+import logging
+import pytest
+from common.profiling import Histogram
+from tests.conftest import create_test_user, auth_headers_for
+
+class TestRequestProfiling:
+    """Integration tests for request profiling, the metrics endpoint and the slow log."""
+
+    def test_debug_headers(self, app, client, db_session):
+        """Test profiled requests report their timings and query count in headers."""
+        app.config['PROFILING_HEADERS'] = True
+        headers = auth_headers_for(create_test_user(db_session))
+
+        response = client.get('/api/users', headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers['Server-Timing'].startswith('app;dur=')
+        assert int(response.headers['X-DB-Queries']) > 0
+
+    def test_headers_off_by_default(self, client, db_session):
+        """Test profiling headers are not sent outside debug mode unless enabled."""
+        headers = auth_headers_for(create_test_user(db_session))
+
+        response = client.get('/api/users', headers=headers)
+
+        assert 'X-DB-Queries' not in response.headers
+
+    def test_metrics_per_blueprint_and_endpoint(self, app, client, db_session):
+        """Test the metrics endpoint aggregates requests by blueprint and endpoint."""
+        app.config['METRICS_TOKEN'] = 'secret'
+        headers = auth_headers_for(create_test_user(db_session))
+        client.get('/api/users', headers=headers)
+        client.get('/api/users', headers=headers)
+
+        metrics = client.get('/api/metrics', headers={'Authorization': 'Bearer secret'}).get_json()
+
+        auth = metrics['blueprints']['auth']
+        assert auth['wall_ms']['count'] == 2
+        assert auth['queries']['buckets']['+Inf'] == 2
+        endpoint = metrics['endpoints']['auth.get_all_users']
+        assert endpoint['requests'] == 2
+        assert endpoint['max_queries'] > 0
+        assert 'metrics' not in metrics['endpoints']
+
+    def test_metrics_token(self, app, client):
+        """Test the metrics endpoint requires the configured bearer token."""
+        app.config['METRICS_TOKEN'] = 'secret'
+
+        assert client.get('/api/metrics').status_code == 401
+        assert client.get('/api/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+    def test_metrics_disabled_without_token(self, app, client):
+        """Test the metrics endpoint is closed when no token is configured."""
+        app.config['METRICS_TOKEN'] = None
+
+        assert client.get('/api/metrics').status_code == 403
+        assert client.get('/api/metrics', headers={'Authorization': 'Bearer '}).status_code == 403
+
+    def test_slow_request_log_includes_sql(self, app, client, db_session, caplog):
+        """Test requests over the threshold are logged with their statements."""
+        app.config['PROFILING_SLOW_REQUEST_MS'] = 0.001
+        headers = auth_headers_for(create_test_user(db_session))
+
+        with caplog.at_level(logging.WARNING, logger='common.profiling'):
+            client.get('/api/users', headers=headers)
+
+        assert 'Slow request GET /api/users' in caplog.text
+        assert 'SELECT' in caplog.text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets count observations at or below each bound."""
+        histogram = Histogram((1, 10))
+        for value in (0.5, 1, 5, 50):
+            histogram.observe(value)
+
+        assert histogram.to_dict() == {'buckets': {'1': 2, '10': 3, '+Inf': 4}, 'count': 4, 'sum': 56.5}
@@ -0,0 +1,185 @@
+import pytest
+from app import db
+from auth.models import User, followers
+from community.models import Bookmark, Comment, Community, Image, Post, Reaction, community_members
+from tests.conftest import fake, create_test_user, create_test_community, auth_headers_for, insert_rows
+
+def add_users(db_session, count, **fields):
+    """Insert count users at once and return their ids."""
+    start = (db_session.query(db.func.max(User.id)).scalar() or 0) + 1
+    ids = list(range(start, start + count))
+    insert_rows(db_session, User.__table__, [
+        {'id': id, 'name': fake.name(), 'email': f'user{id}@example.com', 'password': 'x', **fields}
+        for id in ids
+    ])
+    return ids
+
+def add_posts(db_session, author_ids, **fields):
+    """Insert one post with two images for each author id and return the post ids."""
+    start = (db_session.query(db.func.max(Post.id)).scalar() or 0) + 1
+    ids = list(range(start, start + len(author_ids)))
+    insert_rows(db_session, Post.__table__, [
+        {'id': id, 'title': fake.sentence(), 'content': fake.text(max_nb_chars=100), 'author_id': author_id,
+         'post_type': 'profile', **fields}
+        for id, author_id in zip(ids, author_ids)
+    ])
+    insert_rows(db_session, Image.__table__, [
+        {'url': fake.image_url(), 'post_id': id, 'position': position} for id in ids for position in range(2)
+    ])
+    return ids
+
+class TestQueryCounts:
+    """List endpoints must issue the same number of queries however many rows they list."""
+
+    def fetch(self, client, url, headers):
+        response = client.get(url, headers=headers)
+        response.get_data()  # Streamed bodies query while they are read
+        assert response.status_code == 200
+        return response
+
+    def assert_constant(self, client, query_counter, url, headers, grow):
+        grow(10)
+        self.fetch(client, url, headers)  # Warm per-worker caches
+        with query_counter:
+            self.fetch(client, url, headers)
+        queries_at_10 = query_counter.count
+
+        grow(990)
+        with query_counter:
+            self.fetch(client, url, headers)
+
+        assert query_counter.count == queries_at_10, '\n'.join(query_counter.statements)
+
+    def test_all_users(self, client, db_session, query_counter):
+        """Test the user listing."""
+        headers = auth_headers_for(create_test_user(db_session))
+        self.assert_constant(client, query_counter, '/api/users', headers,
+                             lambda n: add_users(db_session, n))
+
+    @pytest.mark.parametrize('listing, follower_column, followed_column', [
+        ('followers', 'follower_id', 'followed_id'),
+        ('following', 'followed_id', 'follower_id'),
+    ])
+    def test_follow_listings(self, client, db_session, query_counter, listing, follower_column, followed_column):
+        """Test the followers and following listings."""
+        user = create_test_user(db_session)
+        user_id = user.id
+        headers = auth_headers_for(user)
+
+        def grow(n):
+            insert_rows(db_session, followers, [
+                {follower_column: other_id, followed_column: user_id} for other_id in add_users(db_session, n)
+            ])
+        self.assert_constant(client, query_counter, f'/api/users/{user_id}/{listing}', headers, grow)
+
+    def test_feed(self, client, db_session, query_counter):
+        """Test the home feed of a user following many authors."""
+        user = create_test_user(db_session)
+        user_id = user.id
+        headers = auth_headers_for(user)
+
+        def grow(n):
+            author_ids = add_users(db_session, n)
+            insert_rows(db_session, followers, [
+                {'follower_id': user_id, 'followed_id': author_id} for author_id in author_ids
+            ])
+            add_posts(db_session, author_ids)
+        self.assert_constant(client, query_counter, '/api/feed', headers, grow)
+
+    def test_user_posts(self, client, db_session, query_counter):
+        """Test a user's profile posts."""
+        user = create_test_user(db_session)
+        user_id = user.id
+        headers = auth_headers_for(user)
+        self.assert_constant(client, query_counter, f'/api/profile/{user_id}/posts', headers,
+                             lambda n: add_posts(db_session, [user_id] * n))
+
+    def test_post_comments(self, client, db_session, query_counter):
+        """Test the comments of a post, each by a different author."""
+        user = create_test_user(db_session)
+        headers = auth_headers_for(user)
+        post_id = add_posts(db_session, [user.id])[0]
+
+        def grow(n):
+            insert_rows(db_session, Comment.__table__, [
+                {'content': fake.sentence(), 'author_id': author_id, 'post_id': post_id}
+                for author_id in add_users(db_session, n)
+            ])
+        self.assert_constant(client, query_counter, f'/api/posts/{post_id}/comments', headers, grow)
+
+    def test_bookmarks(self, client, db_session, query_counter):
+        """Test the bookmarked posts of a user who also reacted to them."""
+        user = create_test_user(db_session)
+        user_id = user.id
+        headers = auth_headers_for(user)
+
+        def grow(n):
+            post_ids = add_posts(db_session, add_users(db_session, n))
+            insert_rows(db_session, Bookmark.__table__, [{'user_id': user_id, 'post_id': id} for id in post_ids])
+            insert_rows(db_session, Reaction.__table__, [
+                {'user_id': user_id, 'post_id': id, 'reaction_type': 'like'} for id in post_ids
+            ])
+        self.assert_constant(client, query_counter, '/api/bookmarks', headers, grow)
+
+    def test_communities(self, client, db_session, query_counter):
+        """Test the community listing."""
+        headers = auth_headers_for(create_test_user(db_session))
+
+        def grow(n):
+            start = (db_session.query(db.func.max(Community.id)).scalar() or 0) + 1
+            insert_rows(db_session, Community.__table__, [
+                {'id': id, 'name': f'Community {id}', 'description': fake.sentence()}
+                for id in range(start, start + n)
+            ])
+        self.assert_constant(client, query_counter, '/api/communities', headers, grow)
+
+    def test_community_members(self, client, db_session, query_counter):
+        """Test the member listing of a community."""
+        headers = auth_headers_for(create_test_user(db_session))
+        community_id = create_test_community(db_session).id
+
+        def grow(n):
+            insert_rows(db_session, community_members, [
+                {'user_id': user_id, 'community_id': community_id} for user_id in add_users(db_session, n)
+            ])
+        self.assert_constant(client, query_counter, f'/api/communities/{community_id}/members', headers, grow)
+
+    def test_joined_communities(self, client, db_session, query_counter):
+        """Test the communities a user has joined."""
+        user = create_test_user(db_session)
+        user_id = user.id
+        headers = auth_headers_for(user)
+
+        def grow(n):
+            start = (db_session.query(db.func.max(Community.id)).scalar() or 0) + 1
+            ids = list(range(start, start + n))
+            insert_rows(db_session, Community.__table__, [{'id': id, 'name': f'Community {id}'} for id in ids])
+            insert_rows(db_session, community_members, [{'user_id': user_id, 'community_id': id} for id in ids])
+        self.assert_constant(client, query_counter, '/api/communities/joined', headers, grow)
+
+        page = self.fetch(client, '/api/communities/joined', headers).get_json()
+        rest = self.fetch(client, f"/api/communities/joined?per_page=100&cursor={page['next_cursor']}",
+                          headers).get_json()
+        assert len(page['communities']) == 20
+        assert rest['communities'][0]['id'] == page['communities'][-1]['id'] - 1
+
+    def test_community_posts(self, client, db_session, query_counter):
+        """Test the posts of a community, each by a different author."""
+        headers = auth_headers_for(create_test_user(db_session))
+        community_id = create_test_community(db_session).id
+        self.assert_constant(
+            client, query_counter, f'/api/communities/{community_id}/posts', headers,
+            lambda n: add_posts(db_session, add_users(db_session, n),
+                                community_id=community_id, post_type='community'))
+
+    @pytest.mark.parametrize('query', ['radius=50000', 'limit=20'])
+    def test_nearby_users(self, client, db_session, query_counter, query):
+        """Test radius and k-nearest searches around a crowded point."""
+        headers = auth_headers_for(create_test_user(db_session, latitude=0.0, longitude=0.0))
+
+        def grow(n):
+            user_ids = add_users(db_session, n)
+            for user in User.query.filter(User.id.in_(user_ids)):
+                user.latitude, user.longitude = fake.pyfloat(min_value=-0.2, max_value=0.2), 0.1
+            db_session.commit()
+        self.assert_constant(client, query_counter, f'/api/users/nearby?lat=0&lng=0&{query}', headers, grow)
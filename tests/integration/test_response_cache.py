@@ -0,0 +1,181 @@
+import pytest
+from app import db
+from community.models import Post
+from common.response_cache import InProcessBackend, LocalStore, SharedStoreBackend
+from tests.conftest import (
+    create_test_user, create_test_post, create_test_community, auth_headers_for
+)
+
+class TestResponseCache:
+    """Integration tests for cached reads and conditional GET."""
+
+    def test_post_etag_and_304(self, client, db_session):
+        """Test a post read is revalidated with 304 until a reaction changes it."""
+        user = create_test_user(db_session)
+        post_id = create_test_post(db_session, user.id).id
+        headers = auth_headers_for(user)
+
+        first = client.get(f'/api/posts/{post_id}', headers=headers)
+        etag = first.headers['ETag']
+        revalidated = client.get(f'/api/posts/{post_id}', headers={**headers, 'If-None-Match': etag})
+        assert first.status_code == 200
+        assert revalidated.status_code == 304
+
+        client.post(f'/api/posts/{post_id}/like', headers=headers)
+        changed = client.get(f'/api/posts/{post_id}', headers={**headers, 'If-None-Match': etag})
+
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+        assert changed.get_json()['likes_count'] == 1
+
+    def test_hits_are_served_from_cache(self, client, db_session):
+        """Test a cached read does not see writes that leave the version alone."""
+        user = create_test_user(db_session)
+        post_id = create_test_post(db_session, user.id, title='Before').id
+        headers = auth_headers_for(user)
+        client.get(f'/api/posts/{post_id}', headers=headers)
+
+        Post.query.filter_by(id=post_id).update({'title': 'After', 'updated_at': Post.updated_at})
+        db_session.commit()
+
+        assert client.get(f'/api/posts/{post_id}', headers=headers).get_json()['title'] == 'Before'
+
+    def test_hits_are_checked_against_version(self, app, client, db_session):
+        """Test a write handled by another worker is seen on the next read of this one."""
+        user = create_test_user(db_session)
+        post_id = create_test_post(db_session, user.id).id
+        headers = auth_headers_for(user)
+        client.get(f'/api/posts/{post_id}', headers=headers)
+        backend = app.extensions['response_cache']
+
+        app.extensions['response_cache'] = InProcessBackend()
+        client.post(f'/api/posts/{post_id}/like', headers=headers)
+        app.extensions['response_cache'] = backend
+
+        assert client.get(f'/api/posts/{post_id}', headers=headers).get_json()['likes_count'] == 1
+
+    def test_unversioned_routes_need_a_shared_backend(self, app, client, db_session):
+        """Test routes without a version are not cached per worker when several workers run."""
+        app.config['WEB_CONCURRENCY'] = 4
+        user = create_test_user(db_session)
+        community = create_test_community(db_session)
+        community_id = community.id
+        headers = auth_headers_for(user)
+        first = client.get(f'/api/communities/{community_id}', headers=headers)
+
+        community.name = 'Renamed'
+        db_session.commit()
+        second = client.get(f'/api/communities/{community_id}', headers=headers)
+        revalidated = client.get(f'/api/communities/{community_id}',
+                                 headers={**headers, 'If-None-Match': second.headers['ETag']})
+
+        assert second.get_json()['name'] == 'Renamed'
+        assert second.headers['ETag'] != first.headers['ETag']
+        assert revalidated.status_code == 304
+
+    def test_version_answers_304_without_cache_entry(self, app, client, db_session):
+        """Test a revalidation is answered from updated_at/counters after the entry is gone."""
+        user = create_test_user(db_session)
+        user_id = user.id
+        headers = auth_headers_for(user)
+        etag = client.get(f'/api/users/{user_id}', headers=headers).headers['ETag']
+        app.extensions['response_cache'] = InProcessBackend()
+
+        response = client.get(f'/api/users/{user_id}', headers={**headers, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+
+    def test_join_invalidates_community_for_every_viewer(self, client, db_session):
+        """Test joining refreshes the community for all viewers, each with their own flags."""
+        member, viewer = create_test_user(db_session), create_test_user(db_session)
+        community_id = create_test_community(db_session).id
+        member_headers, viewer_headers = auth_headers_for(member), auth_headers_for(viewer)
+        client.get(f'/api/communities/{community_id}', headers=viewer_headers)
+        client.get('/api/communities', headers=viewer_headers)
+
+        client.post(f'/api/communities/{community_id}/join', headers=member_headers)
+
+        as_member = client.get(f'/api/communities/{community_id}', headers=member_headers).get_json()
+        as_viewer = client.get(f'/api/communities/{community_id}', headers=viewer_headers).get_json()
+        listing = client.get('/api/communities', headers=viewer_headers).get_json()
+        assert (as_member['is_member'], as_viewer['is_member']) == (True, False)
+        assert as_viewer['members_count'] == 1
+        assert listing['communities'][0]['members_count'] == 1
+
+    def test_comment_invalidates_profile_posts(self, client, db_session):
+        """Test commenting on a profile post refreshes the author's post list."""
+        user = create_test_user(db_session)
+        user_id = user.id
+        post_id = create_test_post(db_session, user.id).id
+        headers = auth_headers_for(user)
+        client.get(f'/api/profile/{user_id}/posts', headers=headers)
+
+        client.post(f'/api/posts/{post_id}/comments', json={'content': 'Hi'}, headers=headers)
+
+        posts = client.get(f'/api/profile/{user_id}/posts', headers=headers).get_json()['posts']
+        assert posts[0]['comments_count'] == 1
+
+    def test_shared_store_invalidation_reaches_other_workers(self, app, client, db_session):
+        """Test an invalidation through one worker's backend is seen by another's."""
+        store = LocalStore()
+        app.extensions['response_cache'] = SharedStoreBackend(store)
+        user = create_test_user(db_session)
+        post_id = create_test_post(db_session, user.id, title='Before').id
+        headers = auth_headers_for(user)
+        client.get(f'/api/posts/{post_id}', headers=headers)
+
+        Post.query.filter_by(id=post_id).update({'title': 'After', 'updated_at': Post.updated_at})
+        db_session.commit()
+        SharedStoreBackend(store).invalidate(f'post:{post_id}')
+
+        assert client.get(f'/api/posts/{post_id}', headers=headers).get_json()['title'] == 'After'
+
+    def test_profile_update_refreshes_embedded_author(self, client, db_session):
+        """Test a cached post shows its author's new name after a profile update."""
+        author, reader = create_test_user(db_session), create_test_user(db_session)
+        post_id = create_test_post(db_session, author.id).id
+        author_headers, reader_headers = auth_headers_for(author), auth_headers_for(reader)
+        client.get(f'/api/posts/{post_id}', headers=reader_headers)
+
+        client.put('/api/profile', json={'name': 'NEWNAME'}, headers=author_headers)
+
+        post = client.get(f'/api/posts/{post_id}', headers=reader_headers).get_json()
+        assert post['author']['name'] == 'NEWNAME'
+
+    def test_profile_update_refreshes_community_members(self, client, db_session):
+        """Test a cached community shows a member's new name after a profile update."""
+        member = create_test_user(db_session)
+        community_id = create_test_community(db_session).id
+        headers = auth_headers_for(member)
+        client.post(f'/api/communities/{community_id}/join', headers=headers)
+        client.get(f'/api/communities/{community_id}', headers=headers)
+
+        client.put('/api/profile', json={'name': 'NEWNAME'}, headers=headers)
+
+        community = client.get(f'/api/communities/{community_id}', headers=headers).get_json()
+        assert community['members_details'][0]['name'] == 'NEWNAME'
+
+    def test_etag_does_not_validate_another_viewers_body(self, client, db_session):
+        """Test one viewer's ETag earns another viewer a full response, not a 304."""
+        first, second = create_test_user(db_session), create_test_user(db_session)
+        post_id = create_test_post(db_session, first.id).id
+        community_id = create_test_community(db_session).id
+        first_headers, second_headers = auth_headers_for(first), auth_headers_for(second)
+
+        for path in (f'/api/communities/{community_id}', f'/api/posts/{post_id}?view=full'):
+            etag = client.get(path, headers=first_headers).headers['ETag']
+            other = client.get(path.replace('full', 'short'), headers={**second_headers, 'If-None-Match': etag})
+            assert other.status_code == 200
+            assert other.headers['ETag'] != etag
+
+    def test_shared_store_checks_dependencies(self, app, client, db_session):
+        """Test the shared backend drops entries whose embedded author changed."""
+        app.extensions['response_cache'] = SharedStoreBackend(LocalStore())
+        user = create_test_user(db_session)
+        post_id = create_test_post(db_session, user.id).id
+        headers = auth_headers_for(user)
+        client.get(f'/api/posts/{post_id}', headers=headers)
+
+        client.put('/api/profile', json={'name': 'NEWNAME'}, headers=headers)
+
+        assert client.get(f'/api/posts/{post_id}', headers=headers).get_json()['author']['name'] == 'NEWNAME'
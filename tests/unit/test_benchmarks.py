@@ -0,0 +1,48 @@
+import pytest
+from app import db
+from auth.models import User
+from community.models import Post, Reaction
+from common.counters import reconcile_counters
+from benchmarks.dataset import dataset_size, seed_database
+from benchmarks.load import compare, percentile, summarize
+
+class TestBenchmarks:
+    """Test cases for benchmark seeding and statistics."""
+
+    def test_seed_database(self, app, db_session):
+        """Test a small dataset is seeded with ids 1..N and consistent counters."""
+        app.config['BCRYPT_LOG_ROUNDS'] = 4
+        size = dataset_size(0.01)
+
+        counts = seed_database(scale=0.01, seed=1, batch_size=7)
+
+        assert counts['user'] == User.query.count() == size['users']
+        assert counts['post'] == db_session.query(db.func.max(Post.id)).scalar() == size['posts']
+        assert counts['reaction'] == Reaction.query.count()
+        assert set(reconcile_counters().values()) == {0}
+
+    def test_seed_refuses_populated_database(self, db_session, sample_user):
+        """Test seeding does not mix with existing data."""
+        with pytest.raises(RuntimeError):
+            seed_database(scale=0.01)
+
+    def test_summarize(self):
+        """Test nearest-rank percentiles and throughput."""
+        summary = summarize([i / 1000 for i in range(100, 0, -1)], errors=2, elapsed=2)
+
+        assert percentile([1, 2, 3, 4], 0.5) == 2
+        assert summary['requests'] == 100
+        assert summary['rps'] == 50.0
+        assert (summary['p50_ms'], summary['p95_ms'], summary['p99_ms']) == (50.0, 95.0, 99.0)
+
+    def test_compare(self):
+        """Test runs are compared per scenario and metric."""
+        baseline = {'scenarios': {'feed': {'rps': 100, 'p50_ms': 10, 'p95_ms': 20, 'p99_ms': 40}}}
+        current = {'scenarios': {'feed': {'rps': 150, 'p50_ms': 5, 'p95_ms': 20, 'p99_ms': 40},
+                                 'login': {'rps': 10}}}
+
+        rows = compare(baseline, current)
+
+        assert ('feed', 'rps', 100, 150, 50.0) in rows
+        assert ('feed', 'p50_ms', 10, 5, -50.0) in rows
+        assert all(name == 'feed' for name, *_ in rows)
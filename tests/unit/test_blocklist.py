@@ -0,0 +1,153 @@
+import pytest
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import db
+from auth.models import TokenBlocklist
+from auth.blocklist import BlocklistCache, prune_blocklist
+from common.cache import BloomFilter, LRUCache
+from tests.conftest import create_test_user, auth_headers_for
+
+class TestLRUCache:
+    """Test cases for the LRU + TTL cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted first."""
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+
+    def test_entries_expire(self):
+        """Test entries are dropped once their TTL has passed."""
+        cache = LRUCache(maxsize=2, ttl=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+
+        assert cache.get('a', 'missing') == 'missing'
+
+class TestBloomFilter:
+    """Test cases for the Bloom filter."""
+
+    def test_no_false_negatives(self):
+        """Test every added item is reported as present."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        """Test the false-positive rate stays near the configured bound."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        assert false_positives < 300
+
+class TestBlocklistCache:
+    """Test cases for the per-worker blocklist cache."""
+
+    def _count_queries(self):
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        return statements
+
+    def test_unknown_token_skips_blocklist_lookup(self, db_session):
+        """Test a token absent from the filter is answered without a lookup."""
+        db_session.add(TokenBlocklist(jti='revoked-jti'))
+        db_session.commit()
+        cache = BlocklistCache(poll_interval=60)
+        assert cache.is_revoked('revoked-jti') is True
+
+        statements = self._count_queries()
+        assert cache.is_revoked('fresh-jti') is False
+        assert statements == []
+
+    def test_sees_revocations_from_other_workers(self, db_session):
+        """Test rows inserted elsewhere are picked up on the next poll."""
+        cache = BlocklistCache(poll_interval=0)
+        assert cache.is_revoked('other-worker-jti') is False
+
+        db_session.add(TokenBlocklist(jti='other-worker-jti'))
+        db_session.commit()
+
+        assert cache.is_revoked('other-worker-jti') is True
+
+    def test_sees_revocations_committed_out_of_order(self, db_session):
+        """Test a row with a lower id committed after a higher one is still picked up."""
+        db_session.add(TokenBlocklist(id=100, jti='committed-first'))
+        db_session.commit()
+        cache = BlocklistCache(poll_interval=0)
+        assert cache.is_revoked('committed-first') is True
+
+        created = datetime.utcnow() - timedelta(seconds=5)
+        db_session.add(TokenBlocklist(id=50, jti='committed-late', created_at=created))
+        db_session.commit()
+
+        assert cache.is_revoked('committed-late') is True
+
+    def test_rebuilds_filter_past_capacity(self, db_session):
+        """Test the filter is rebuilt from the table once it holds more JTIs than it was sized for."""
+        cache = BlocklistCache(capacity=2, poll_interval=0)
+        for i in range(3):
+            db_session.add(TokenBlocklist(jti=f'jti-{i}'))
+            db_session.commit()
+            cache.add(f'jti-{i}')
+        assert cache._bloom.count == 3
+
+        TokenBlocklist.query.filter(TokenBlocklist.jti != 'jti-2').delete()
+        db_session.commit()
+        assert cache.is_revoked('jti-2') is True
+
+        assert cache._bloom.count == 1
+        assert cache.is_revoked('jti-0') is False
+
+    def test_logout_revokes_token(self, client, db_session):
+        """Test a token is rejected right after logging out with it."""
+        headers = auth_headers_for(create_test_user(db_session))
+        assert client.get('/api/protected', headers=headers).status_code == 200
+
+        client.post('/api/logout', headers=headers)
+
+        assert client.get('/api/protected', headers=headers).status_code == 401
+
+class TestPruneBlocklist:
+    """Test cases for blocklist pruning."""
+
+    def test_prunes_only_expired_rows_in_batches(self, db_session):
+        """Test rows older than the token lifetime are deleted batch by batch."""
+        old = datetime.utcnow() - timedelta(hours=2)
+        db_session.add_all([TokenBlocklist(jti=f'old-{i}', created_at=old) for i in range(5)])
+        db_session.add(TokenBlocklist(jti='recent'))
+        db_session.commit()
+
+        removed = prune_blocklist(max_age=timedelta(hours=1), batch_size=2)
+
+        assert removed == 5
+        assert [row.jti for row in TokenBlocklist.query.all()] == ['recent']
+
+    def test_keeps_rows_when_tokens_never_expire(self, app, db_session):
+        """Test nothing is pruned when access tokens have no lifetime."""
+        db_session.add(TokenBlocklist(jti='old', created_at=datetime(2020, 1, 1)))
+        db_session.commit()
+
+        assert prune_blocklist() == 0
+
+    def test_prune_command(self, runner, db_session):
+        """Test the prune-blocklist command reports removed rows."""
+        db_session.add(TokenBlocklist(jti='old', created_at=datetime(2020, 1, 1)))
+        db_session.commit()
+
+        result = runner.invoke(args=['prune-blocklist', '--max-age', '3600'])
+
+        assert result.exit_code == 0
+        assert 'Removed 1 expired token blocklist row(s)' in result.output
@@ -0,0 +1,83 @@
+import importlib.util
+import sqlite3
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app import db
+from common.db_pool import InstrumentedQueuePool
+
+ROOT = Path(__file__).resolve().parents[2]
+
+class TestConnectionPool:
+    """Test cases for pool configuration and pool metrics."""
+
+    def test_server_databases_get_configured_pool(self, app):
+        """Test PostgreSQL engines are pooled from the DB_POOL_* settings."""
+        app.config.update(DB_POOL_SIZE=3, DB_MAX_OVERFLOW=1)
+
+        _, options = db.apply_driver_hacks(app, make_url('postgresql://user@localhost/app'), {})
+
+        assert options['poolclass'] is InstrumentedQueuePool
+        assert (options['pool_size'], options['max_overflow']) == (3, 1)
+        assert options['pool_pre_ping'] is True
+        assert options['pool_recycle'] == app.config['DB_POOL_RECYCLE']
+
+    def test_sqlite_keeps_default_pool(self, app):
+        """Test pool options are not passed to SQLite engines."""
+        _, options = db.apply_driver_hacks(app, make_url('sqlite:///app.db'), {'pool_size': 5})
+
+        assert 'pool_size' not in options
+        assert 'poolclass' not in options
+
+    def test_checkout_wait_and_saturation(self):
+        """Test the pool reports usage, peak saturation and timeouts."""
+        pool = InstrumentedQueuePool(lambda: sqlite3.connect(':memory:', check_same_thread=False),
+                                     pool_size=1, max_overflow=0, timeout=0.05)
+        connection = pool.connect()
+        busy = pool.snapshot()
+        with pytest.raises(PoolTimeoutError):
+            pool.connect()
+        connection.close()
+        idle = pool.snapshot()
+
+        assert (busy['checked_out'], busy['saturation']) == (1, 1.0)
+        assert (idle['checked_out'], idle['peak_saturation'], idle['timeouts']) == (0, 1.0, 1)
+        assert idle['wait_ms']['count'] == 2
+        assert idle['wait_ms']['sum'] >= 50
+
+    def test_metrics_endpoint_reports_pool(self, app, client):
+        """Test /api/metrics has a pool section, empty for SQLite's own pool."""
+        app.config['METRICS_TOKEN'] = 'secret'
+        metrics = client.get('/api/metrics', headers={'Authorization': 'Bearer secret'}).get_json()
+
+        assert 'pool' in metrics
+        assert metrics['pool'] is None
+
+class TestGunicornConfig:
+    """Test cases for the gunicorn settings the deploys run with."""
+
+    def _load_config(self):
+        spec = importlib.util.spec_from_file_location('gunicorn_conf', ROOT / 'gunicorn.conf.py')
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_post_fork_replaces_inherited_pool(self, app):
+        """Test a forked worker drops the pool it inherited from the master."""
+        config = self._load_config()
+        inherited = db.engine.pool
+
+        config.post_fork(server=None, worker=SimpleNamespace(app=SimpleNamespace(wsgi=lambda: app)))
+
+        assert config.worker_class == 'gthread'
+        assert db.engine.pool is not inherited
+
+    @pytest.mark.parametrize('path', ['startup.txt', '.github/workflows/azure-webapps-python.yml'])
+    def test_deploys_use_gunicorn_config(self, path):
+        """Test every deploy command starts gunicorn with gunicorn.conf.py."""
+        commands = [line for line in (ROOT / path).read_text().splitlines() if 'gunicorn ' in line]
+
+        assert commands
+        assert all('gunicorn -c gunicorn.conf.py' in line for line in commands)
@@ -0,0 +1,69 @@
+import pytest
+from auth import follow_graph
+from auth.models import User
+from tests.conftest import create_test_user, auth_headers_for
+
+class TestFollowGraph:
+    """Test cases for the set-based follow graph."""
+
+    def test_follow_is_idempotent(self, db_session):
+        """Test repeated follows insert one edge and count it once."""
+        follower, followed = create_test_user(db_session), create_test_user(db_session)
+
+        assert follow_graph.follow(follower.id, followed.id) is True
+        assert follow_graph.follow(follower.id, followed.id) is False
+        db_session.commit()
+
+        assert follow_graph.is_following(follower.id, followed.id) is True
+        assert User.query.get(followed.id).followers_count == 1
+        assert User.query.get(follower.id).following_count == 1
+
+    def test_unfollow_is_idempotent(self, db_session):
+        """Test repeated unfollows delete the edge and uncount it once."""
+        follower, followed = create_test_user(db_session), create_test_user(db_session)
+        follow_graph.follow(follower.id, followed.id)
+
+        assert follow_graph.unfollow(follower.id, followed.id) is True
+        assert follow_graph.unfollow(follower.id, followed.id) is False
+        db_session.commit()
+
+        assert follow_graph.is_following(follower.id, followed.id) is False
+        assert User.query.get(followed.id).followers_count == 0
+
+    def test_followed_ids_batch(self, db_session):
+        """Test one call reports which of many users are followed."""
+        viewer = create_test_user(db_session)
+        others = [create_test_user(db_session) for _ in range(4)]
+        follow_graph.follow(viewer.id, others[0].id)
+        follow_graph.follow(viewer.id, others[2].id)
+        db_session.commit()
+
+        result = follow_graph.followed_ids(viewer.id, [u.id for u in others])
+
+        assert result == {others[0].id, others[2].id}
+        assert follow_graph.followed_ids(viewer.id, []) == set()
+
+    def test_user_listing_marks_followed_users(self, client, db_session):
+        """Test the user listing flags exactly the users the viewer follows."""
+        viewer = create_test_user(db_session)
+        followed, other = create_test_user(db_session), create_test_user(db_session)
+        follow_graph.follow(viewer.id, followed.id)
+        db_session.commit()
+        ids = {'viewer': viewer.id, 'followed': followed.id, 'other': other.id}
+        headers = auth_headers_for(viewer)
+
+        users = client.get('/api/users', headers=headers).get_json()['users']
+
+        flags = {user['id']: user['is_following'] for user in users}
+        assert flags == {ids['viewer']: False, ids['followed']: True, ids['other']: False}
+
+    def test_registration_does_not_self_follow(self, client, db_session):
+        """Test a new user starts with no follow edges and zero counts."""
+        client.post('/api/register', json={
+            'name': 'New User', 'email': 'new@example.com', 'password': 'password123'
+        })
+        user = User.query.filter_by(email='new@example.com').first()
+
+        assert follow_graph.is_following(user.id, user.id) is False
+        assert follow_graph.follow(user.id, user.id) is False
+        assert (user.followers_count, user.following_count) == (0, 0)
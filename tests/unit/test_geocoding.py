@@ -0,0 +1,98 @@
+import pytest
+import time
+from collections import namedtuple
+from geopy.exc import GeocoderTimedOut
+from explore.geocoding import Geocoder, GeocoderError, RateLimiter, normalize_address
+from explore.models import GeocodeResult
+from tests.conftest import create_test_user, auth_headers_for
+
+Location = namedtuple('Location', 'latitude longitude')
+
+class FakeNominatim:
+    """Stands in for the upstream service and counts calls."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def geocode(self, address):
+        self.calls.append(address)
+        answer = self.answers.get(address)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+def make_geocoder(answers, **kwargs):
+    client = FakeNominatim(answers)
+    return Geocoder(client, min_interval=0, **kwargs), client
+
+class TestGeocoder:
+    """Test cases for the cached, rate-limited geocoder."""
+
+    def test_normalize_address(self):
+        """Test case, punctuation and whitespace differences share a key."""
+        assert normalize_address('  10 Downing St., LONDON ') == normalize_address('10 downing st london')
+        assert len(normalize_address('x' * 1000)) == 255
+
+    def test_repeat_lookups_are_cached(self, db_session):
+        """Test equivalent addresses reach the upstream once."""
+        geocoder, client = make_geocoder({'Paris, France': Location(48.85, 2.35)})
+
+        assert geocoder.geocode('Paris, France') == (48.85, 2.35)
+        assert geocoder.geocode('paris  france') == (48.85, 2.35)
+        assert len(client.calls) == 1
+
+    def test_results_persist_across_processes(self, db_session):
+        """Test a new geocoder (another worker) is answered from the table."""
+        make_geocoder({'Rome': Location(41.9, 12.5)})[0].geocode('Rome')
+        geocoder, client = make_geocoder({})
+
+        assert geocoder.geocode('ROME') == (41.9, 12.5)
+        assert client.calls == []
+
+    def test_misses_are_cached_until_they_expire(self, db_session):
+        """Test an unknown address is not asked again until its short TTL passes."""
+        geocoder, client = make_geocoder({}, miss_ttl=60)
+        assert geocoder.geocode('Nowhere') is None
+        assert geocoder.geocode('Nowhere') is None
+        assert len(client.calls) == 1
+
+        row = GeocodeResult.query.one()
+        assert row.found is False
+        row.expires_at = row.created_at
+        db_session.commit()
+        assert make_geocoder({})[0].geocode('Nowhere') is None
+
+    def test_timeouts_are_cached_briefly(self, db_session):
+        """Test an upstream timeout fails fast for later requests and is not stored."""
+        geocoder, client = make_geocoder({'Oslo': GeocoderTimedOut('slow')})
+
+        for _ in range(2):
+            with pytest.raises(GeocoderError):
+                geocoder.geocode('Oslo')
+
+        assert len(client.calls) == 1
+        assert GeocodeResult.query.count() == 0
+
+    def test_rate_limiter_spaces_calls(self):
+        """Test calls are spaced by the minimum interval."""
+        limiter = RateLimiter(0.05)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.wait()
+
+        assert time.monotonic() - start >= 0.1
+
+    def test_geocode_route(self, app, client, db_session):
+        """Test the route answers from the geocoder and maps outages to 503."""
+        app.extensions['geocoder'] = make_geocoder({
+            'Lisbon': Location(38.7, -9.1), 'Down': GeocoderTimedOut('slow')
+        })[0]
+        headers = auth_headers_for(create_test_user(db_session))
+
+        found = client.get('/api/explore/geocode?address=Lisbon', headers=headers)
+        missing = client.get('/api/explore/geocode?address=Atlantis', headers=headers)
+        down = client.get('/api/explore/geocode?address=Down', headers=headers)
+
+        assert found.get_json() == {'address': 'Lisbon', 'latitude': 38.7, 'longitude': -9.1}
+        assert (missing.status_code, down.status_code) == (404, 503)
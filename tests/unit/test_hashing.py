@@ -0,0 +1,98 @@
+import pytest
+import bcrypt
+from auth.models import User
+from auth.hashing import PasswordHasher, HashingPoolFull
+
+def make_user(db_session, password='password123', rounds=4):
+    user = User(
+        name='Test User',
+        email='test@example.com',
+        password=bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+class TestPasswordHasher:
+    """Test cases for the pooled password hasher."""
+
+    def test_hash_and_check_in_pool(self):
+        """Test hashes made in the worker pool verify."""
+        hasher = PasswordHasher(rounds=4, pool_size=1, queue_depth=1)
+
+        pw_hash = hasher.generate_password_hash('secret')
+
+        assert pw_hash.startswith('$2b$04$')
+        assert hasher.check_password_hash(pw_hash, 'secret') is True
+        assert hasher.check_password_hash(pw_hash, 'wrong') is False
+
+    def test_rejects_when_queue_is_full(self):
+        """Test a full queue raises instead of waiting."""
+        hasher = PasswordHasher(rounds=4, pool_size=1, queue_depth=0)
+        hasher._slots.acquire()
+
+        with pytest.raises(HashingPoolFull):
+            hasher.generate_password_hash('secret')
+
+    def test_raises_pool_full_on_timeout(self):
+        """Test a hash that outlives the timeout raises instead of a bare TimeoutError."""
+        hasher = PasswordHasher(rounds=14, pool_size=1, queue_depth=1, timeout=0.01)
+
+        with pytest.raises(HashingPoolFull):
+            hasher.generate_password_hash('secret')
+
+    def test_pool_does_not_fork(self):
+        """Test pool processes are not forked from the threaded server worker."""
+        hasher = PasswordHasher(rounds=4, pool_size=1, queue_depth=1)
+        hasher.generate_password_hash('secret')
+
+        assert hasher._executor._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+    def test_needs_rehash(self):
+        """Test hashes with a different cost are flagged for rehashing."""
+        hasher = PasswordHasher(rounds=5, pool_size=0)
+
+        assert hasher.needs_rehash(PasswordHasher(rounds=4, pool_size=0).generate_password_hash('x'))
+        assert not hasher.needs_rehash(hasher.generate_password_hash('x'))
+        assert hasher.needs_rehash('not-a-bcrypt-hash')
+
+    def test_non_bcrypt_hash_does_not_match(self):
+        """Test a foreign hash format fails verification instead of erroring."""
+        hasher = PasswordHasher(pool_size=0)
+
+        assert hasher.check_password_hash('pbkdf2:sha256:260000$abc$def', 'secret') is False
+
+class TestLoginHashing:
+    """Integration tests for hashing on the login path."""
+
+    def test_login_rehashes_on_cost_change(self, app, client, db_session):
+        """Test a successful login upgrades a hash made with an old cost."""
+        app.config['BCRYPT_LOG_ROUNDS'] = 5
+        user_id = make_user(db_session, rounds=4).id
+
+        response = client.post('/api/login', json={'email': 'test@example.com', 'password': 'password123'})
+
+        assert response.status_code == 200
+        assert User.query.get(user_id).password.startswith('$2b$05$')
+
+    def test_login_returns_503_when_pool_is_full(self, app, client, db_session):
+        """Test login sheds load when the hashing queue is full."""
+        make_user(db_session)
+        hasher = PasswordHasher(rounds=4, pool_size=1, queue_depth=0)
+        hasher._slots.acquire()
+        app.extensions['password_hasher'] = hasher
+
+        response = client.post('/api/login', json={'email': 'test@example.com', 'password': 'password123'})
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+    def test_register_returns_503_when_hashing_times_out(self, app, client, db_session):
+        """Test a hash that does not finish in time sheds the request with a 503."""
+        app.extensions['password_hasher'] = PasswordHasher(rounds=14, pool_size=1, queue_depth=1, timeout=0.01)
+
+        response = client.post('/api/register', json={
+            'name': 'Slow Hash', 'email': 'slow@example.com', 'password': 'password123'
+        })
+
+        assert response.status_code == 503
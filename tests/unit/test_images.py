@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from community.images import attach_images, replace_images
+from community.models import Image
+from tests.conftest import create_test_user, create_test_post, auth_headers_for
+
+def image_rows(post_id):
+    return [(image.id, image.url) for image in
+            Image.query.filter_by(post_id=post_id).order_by(Image.position, Image.id)]
+
+class TestPostImages:
+    """Test cases for bulk and diff-based image writes."""
+
+    def _count_statements(self):
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        return statements
+
+    def test_attach_is_one_statement(self, db_session):
+        """Test any number of images is inserted with a single statement."""
+        post_id = create_test_post(db_session, create_test_user(db_session).id).id
+        urls = [f'https://img.example.com/{i}.jpg' for i in range(50)]
+
+        statements = self._count_statements()
+        attach_images(post_id, urls)
+
+        assert len(statements) == 1
+        assert [url for _, url in image_rows(post_id)] == urls
+
+    def test_replace_only_touches_changes(self, db_session):
+        """Test unchanged images keep their rows and order follows the new list."""
+        post_id = create_test_post(db_session, create_test_user(db_session).id).id
+        attach_images(post_id, ['a', 'b', 'c'])
+        db_session.commit()
+        ids = {url: image_id for image_id, url in image_rows(post_id)}
+
+        assert replace_images(post_id, ['c', 'a', 'd']) == (1, 1)
+        db_session.commit()
+
+        rows = image_rows(post_id)
+        assert [url for _, url in rows] == ['c', 'a', 'd']
+        assert rows[0][0] == ids['c'] and rows[1][0] == ids['a']
+
+    def test_unchanged_list_writes_nothing(self, db_session):
+        """Test replacing with the same list only reads."""
+        post_id = create_test_post(db_session, create_test_user(db_session).id).id
+        attach_images(post_id, ['a', 'b'])
+        db_session.commit()
+
+        statements = self._count_statements()
+        assert replace_images(post_id, ['a', 'b']) == (0, 0)
+        assert len(statements) == 1
+
+    def test_update_route_keeps_order(self, client, db_session):
+        """Test creating and updating a profile post through the API keeps image order."""
+        headers = auth_headers_for(create_test_user(db_session))
+        post = client.post('/api/profile/posts', headers=headers, json={
+            'title': 'Trip', 'content': 'Photos', 'image_urls': ['x', 'y', 'z']
+        }).get_json()['post']
+        assert [image['url'] for image in post['images']] == ['x', 'y', 'z']
+
+        updated = client.put(f"/api/profile/posts/{post['id']}", headers=headers,
+                             json={'image_urls': ['z', 'x']}).get_json()['post']
+
+        assert [image['url'] for image in updated['images']] == ['z', 'x']
@@ -0,0 +1,113 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from jobs.models import Job
+from jobs.queue import claim, enqueue, execute, register, run_pending, schedule_periodic
+from auth.models import TokenBlocklist
+
+calls = []
+
+def record(**kwargs):
+    calls.append(kwargs)
+
+def always_fail(**kwargs):
+    raise RuntimeError('boom')
+
+register('test.record', record)
+register('test.fail', always_fail, max_attempts=2)
+
+class TestJobQueue:
+    """Test cases for the durable job queue."""
+
+    @pytest.fixture(autouse=True)
+    def reset_calls(self):
+        calls.clear()
+
+    def test_jobs_commit_with_the_caller(self, db_session):
+        """Test an enqueued job is lost if the caller rolls back and runs once committed."""
+        enqueue('test.record', value=1)
+        db_session.rollback()
+        enqueue('test.record', value=2)
+        db_session.commit()
+
+        assert run_pending() == 1
+        assert calls == [{'value': 2}]
+        assert Job.query.count() == 0
+
+    def test_delayed_jobs_wait(self, db_session):
+        """Test a job is not claimed before its run_at."""
+        enqueue('test.record', delay=timedelta(minutes=5))
+        db_session.commit()
+
+        assert claim() is None
+
+    def test_failures_back_off_then_fail(self, app, db_session):
+        """Test a failing job is rescheduled with backoff, then marked failed."""
+        app.config['JOBS_BACKOFF_BASE'] = 60
+        job = enqueue('test.fail')
+        db_session.commit()
+        job_id = job.id
+
+        assert execute(claim()) is False
+        job = Job.query.get(job_id)
+        assert job.status == 'pending'
+        assert job.run_at > datetime.utcnow() + timedelta(seconds=25)
+        assert job.last_error == 'RuntimeError: boom'
+
+        job.run_at = datetime.utcnow()
+        db_session.commit()
+        execute(claim())
+
+        job = Job.query.get(job_id)
+        assert (job.status, job.attempts) == ('failed', 2)
+        assert claim() is None
+
+    def test_stale_running_jobs_are_reclaimed(self, db_session):
+        """Test a job left running by a dead worker is picked up again."""
+        enqueue('test.record')
+        db_session.commit()
+        job = claim()
+        job.locked_at = datetime.utcnow() - timedelta(hours=1)
+        db_session.commit()
+
+        assert claim().id == job.id
+
+    def test_unknown_job_is_rejected(self, db_session):
+        """Test enqueueing an unregistered job fails immediately."""
+        with pytest.raises(KeyError):
+            enqueue('test.missing')
+
+    def test_periodic_jobs_are_scheduled_once(self, app, db_session):
+        """Test periodic jobs are enqueued once and run the registered task."""
+        app.config['BLOCKLIST_PRUNE_INTERVAL'] = 60
+        app.config['COUNTER_RECONCILE_INTERVAL'] = 0
+        db_session.add(TokenBlocklist(jti='old', created_at=datetime(2020, 1, 1)))
+        db_session.commit()
+
+        assert schedule_periodic() == ['blocklist.prune']
+        assert schedule_periodic() == []
+
+        job = Job.query.filter_by(name='blocklist.prune').one()
+        job.run_at = datetime.utcnow()
+        app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+        db_session.commit()
+
+        assert run_pending() == 1
+        assert TokenBlocklist.query.count() == 0
+
+    def test_periodic_job_has_one_live_run(self, app, db_session):
+        """Test a run scheduled by another worker, pending or running, is not duplicated."""
+        app.config['BLOCKLIST_PRUNE_INTERVAL'] = 60
+        app.config['COUNTER_RECONCILE_INTERVAL'] = 0
+        db_session.add(Job(name='blocklist.prune', status='running', periodic=True))
+        db_session.commit()
+
+        assert schedule_periodic() == []
+        db_session.add(Job(name='blocklist.prune', periodic=True))
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+        db_session.rollback()
+
+        Job.query.filter_by(name='blocklist.prune').one().status = 'failed'
+        db_session.commit()
+        assert schedule_periodic() == ['blocklist.prune']
@@ -181,4 +181,34 @@ class TestTokenBlocklistModel:
         
         with pytest.raises(Exception):  # SQLAlchemy will raise an integrity error
             db_session.add(token2)
-            db_session.commit() 
\ No newline at end of file
+            db_session.commit() 
+class TestCommunityModel:
+    """Test cases for Community model."""
+    
+    def test_membership(self, db_session):
+        """Test adding, checking and removing members."""
+        from community.models import Community
+        user = User(
+            name="Test User",
+            email="test@example.com",
+            password=generate_password_hash("password123")
+        )
+        community = Community(name="Hikers")
+        db_session.add_all([user, community])
+        db_session.commit()
+        
+        assert community.is_member(user.id) is False
+        assert community.add_member(user.id) is True
+        assert community.add_member(user.id) is False
+        db_session.commit()
+        
+        assert community.is_member(str(user.id)) is True
+        assert community.members_count == 1
+        assert community.to_dict(include_members=True)['members'] == [user.id]
+        
+        assert community.remove_member(user.id) is True
+        assert community.remove_member(user.id) is False
+        db_session.commit()
+        
+        assert community.is_member(user.id) is False
+        assert community.members_count == 0
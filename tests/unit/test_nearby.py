@@ -0,0 +1,84 @@
+import pytest
+import random
+from auth.models import User
+from auth.nearby import UserGrid
+from common.geo import distances_from, geohash_encode, haversine_m
+from tests.conftest import create_test_user, auth_headers_for
+
+PARIS = (48.8566, 2.3522)
+
+class TestUserGrid:
+    """Test cases for the in-memory nearby-user grid."""
+
+    def _scatter(self, db_session, count=60):
+        rng = random.Random(7)
+        users = [create_test_user(db_session, latitude=PARIS[0] + rng.uniform(-0.5, 0.5),
+                                  longitude=PARIS[1] + rng.uniform(-0.5, 0.5))
+                 for _ in range(count)]
+        return {user.id: (user.latitude, user.longitude) for user in users}
+
+    def test_geohash_follows_location(self, db_session):
+        """Test the stored geohash is kept in sync with the coordinates."""
+        user = create_test_user(db_session, latitude=PARIS[0], longitude=PARIS[1])
+        assert user.geohash == geohash_encode(*PARIS, 9)
+
+        user.update_from_dict({'location': {'lat': 40.0, 'lng': -3.7}})
+        db_session.commit()
+
+        assert user.geohash == geohash_encode(40.0, -3.7, 9)
+
+    def test_within_matches_brute_force(self, db_session):
+        """Test radius queries return exactly the users a full scan finds."""
+        positions = self._scatter(db_session)
+        grid = UserGrid()
+
+        found = grid.within(*PARIS, 15000)
+
+        expected = sorted((haversine_m(*PARIS, *pos), uid) for uid, pos in positions.items()
+                          if haversine_m(*PARIS, *pos) <= 15000)
+        assert [uid for uid, _ in found] == [uid for _, uid in expected]
+
+    def test_nearest_matches_brute_force(self, db_session):
+        """Test k-nearest queries return the k closest users."""
+        positions = self._scatter(db_session)
+        grid = UserGrid()
+
+        found = grid.nearest(*PARIS, 5)
+
+        expected = sorted(positions, key=lambda uid: haversine_m(*PARIS, *positions[uid]))[:5]
+        assert [uid for uid, _ in found] == expected
+
+    def test_refresh_is_incremental(self, db_session):
+        """Test moved users change cells on the next refresh."""
+        user = create_test_user(db_session, latitude=PARIS[0], longitude=PARIS[1])
+        grid = UserGrid(refresh_interval=0)
+        assert [uid for uid, _ in grid.within(*PARIS, 1000)] == [user.id]
+
+        user.update_from_dict({'location': {'lat': 35.68, 'lng': 139.69}})
+        db_session.commit()
+
+        assert grid.within(*PARIS, 1000) == []
+        assert [uid for uid, _ in grid.within(35.68, 139.69, 1000)] == [user.id]
+
+    def test_distances_from(self):
+        """Test the list helper agrees with the single-pair formula."""
+        points = [(0, 0), (51.5, -0.12), (-33.87, 151.21)]
+        assert distances_from(*PARIS, points) == pytest.approx(
+            [haversine_m(*PARIS, *point) for point in points])
+
+    def test_nearby_route(self, client, db_session):
+        """Test the endpoint lists nearby users with distances, excluding the caller."""
+        me = create_test_user(db_session, latitude=PARIS[0], longitude=PARIS[1])
+        near = create_test_user(db_session, latitude=PARIS[0] + 0.01, longitude=PARIS[1])
+        create_test_user(db_session, latitude=51.5, longitude=-0.12)
+        near_id = near.id
+        headers = auth_headers_for(me)
+
+        within = client.get(f'/api/users/nearby?lat={PARIS[0]}&lng={PARIS[1]}&radius=5000', headers=headers)
+        nearest = client.get(f'/api/users/nearby?lat={PARIS[0]}&lng={PARIS[1]}&limit=2', headers=headers)
+        invalid = client.get('/api/users/nearby?lat=x&lng=2', headers=headers)
+
+        assert [(u['id'], round(u['distance_m'])) for u in within.get_json()['users']] == [(near_id, 1112)]
+        assert set(within.get_json()['users'][0]) == {'id', 'name', 'avatarUrl', 'distance_m'}
+        assert len(nearest.get_json()['users']) == 2
+        assert invalid.status_code == 400
@@ -0,0 +1,128 @@
+import pytest
+import threading
+import time
+import requests
+import responses
+from explore.places import NEARBY_SEARCH_URL, PlacesClient, SingleFlight
+from tests.conftest import create_test_user, auth_headers_for
+
+def place(name, lat, lng):
+    return {'name': name, 'geometry': {'location': {'lat': lat, 'lng': lng}}}
+
+PLACES = {'status': 'OK', 'results': [
+    place('Near', 48.8584, 2.2945),
+    place('Far', 48.8606, 2.3376),
+]}
+
+class TestPlacesClient:
+    """Test cases for the tile-cached Places client."""
+
+    @responses.activate
+    def test_nearby_points_share_a_tile(self):
+        """Test two close queries cost one upstream call and are filtered by distance."""
+        responses.add(responses.GET, NEARBY_SEARCH_URL, json=PLACES)
+        client = PlacesClient('key')
+
+        first = client.nearby(48.8583, 2.2944, 1500, 'museum')
+        second = client.nearby(48.8584, 2.2946, 1500, 'museum')
+
+        assert len(responses.calls) == 1
+        assert [p['name'] for p in first['results']] == ['Near']
+        assert second['results'] == first['results']
+
+    @responses.activate
+    def test_follows_next_page_token_before_filtering(self):
+        """Test a full first page is followed by the next pages, all filtered to the radius."""
+        far = [place(f'Far {i}', 48.8606, 2.3376) for i in range(20)]
+        responses.add(responses.GET, NEARBY_SEARCH_URL,
+                      match=[responses.matchers.query_param_matcher({'pagetoken': 'page-2', 'key': 'key'})],
+                      json={'status': 'OK', 'results': [place('Near 2', 48.8585, 2.2946)]})
+        responses.add(responses.GET, NEARBY_SEARCH_URL,
+                      json={'status': 'OK', 'results': far, 'next_page_token': 'page-2'})
+        client = PlacesClient('key', max_pages=3, page_delay=0)
+
+        data = client.nearby(48.8583, 2.2944, 1500, 'museum')
+
+        assert len(responses.calls) == 2
+        assert [p['name'] for p in data['results']] == ['Near 2']
+        assert 'next_page_token' not in data
+
+    @responses.activate
+    def test_reads_one_page_by_default(self):
+        """Test a tile miss makes one upstream call and returns the next_page_token."""
+        responses.add(responses.GET, NEARBY_SEARCH_URL,
+                      json={'status': 'OK', 'results': PLACES['results'], 'next_page_token': 'more'})
+        client = PlacesClient('key')
+
+        data = client.nearby(48.8583, 2.2944, 1500, 'museum')
+
+        assert len(responses.calls) == 1
+        assert [p['name'] for p in data['results']] == ['Near']
+        assert data['next_page_token'] == 'more'
+
+    @responses.activate
+    def test_stops_at_max_pages(self):
+        """Test paging stops after max_pages and returns the token of the last page read."""
+        responses.add(responses.GET, NEARBY_SEARCH_URL,
+                      match=[responses.matchers.query_param_matcher({'pagetoken': 'page-2', 'key': 'key'})],
+                      json={'status': 'OK', 'results': [], 'next_page_token': 'page-3'})
+        responses.add(responses.GET, NEARBY_SEARCH_URL,
+                      json={'status': 'OK', 'results': PLACES['results'], 'next_page_token': 'page-2'})
+        client = PlacesClient('key', max_pages=2, page_delay=0)
+
+        data = client.nearby(48.8583, 2.2944, 1500, 'museum')
+
+        assert len(responses.calls) == 2
+        assert [p['name'] for p in data['results']] == ['Near']
+        assert data['next_page_token'] == 'page-3'
+
+    @responses.activate
+    def test_errors_are_not_cached(self):
+        """Test a failing upstream answer is asked again next time."""
+        responses.add(responses.GET, NEARBY_SEARCH_URL,
+                      json={'status': 'OVER_QUERY_LIMIT', 'error_message': 'quota'})
+        client = PlacesClient('key')
+
+        client.nearby(48.85, 2.29, 1500, 'museum')
+        assert client.nearby(48.85, 2.29, 1500, 'museum')['status'] == 'OVER_QUERY_LIMIT'
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_concurrent_misses_are_coalesced(self):
+        """Test simultaneous identical queries make a single upstream call."""
+        def slow(request):
+            time.sleep(0.1)
+            return 200, {}, '{"status": "OK", "results": []}'
+        responses.add_callback(responses.GET, NEARBY_SEARCH_URL, callback=slow)
+        client = PlacesClient('key')
+
+        threads = [threading.Thread(target=client.nearby, args=(48.85, 2.29, 1500, 'museum'))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(responses.calls) == 1
+
+    def test_single_flight_shares_errors(self):
+        """Test a failure of the leading call reaches the callers waiting on it."""
+        flight = SingleFlight()
+        with pytest.raises(ValueError):
+            flight.do('key', lambda: (_ for _ in ()).throw(ValueError('boom')))
+        assert flight.do('key', lambda: 42) == 42
+
+    @responses.activate
+    def test_places_route(self, app, client, db_session):
+        """Test the route serves cached tiles and maps upstream timeouts to 503."""
+        app.config['GOOGLE_PLACES_API_KEY'] = 'key'
+        headers = auth_headers_for(create_test_user(db_session))
+        responses.add(responses.GET, NEARBY_SEARCH_URL, json=PLACES)
+
+        ok = client.get('/api/explore/places?lat=48.8583&lng=2.2944', headers=headers)
+        responses.replace(responses.GET, NEARBY_SEARCH_URL, body=requests.Timeout())
+        down = client.get('/api/explore/places?lat=10&lng=10', headers=headers)
+        bad = client.get('/api/explore/places?lat=north&lng=2', headers=headers)
+
+        assert [p['name'] for p in ok.get_json()['results']] == ['Near']
+        assert (down.status_code, bad.status_code) == (503, 400)
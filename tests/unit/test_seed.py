@@ -0,0 +1,51 @@
+from datetime import datetime
+from sqlalchemy import inspect
+from app import db
+from auth.models import User
+from community.models import Post
+from common.counters import reconcile_counters
+from common.seed import SyntheticData, bulk_load
+
+NOW = datetime(2026, 1, 1)
+
+class TestBulkSeed:
+    """Test cases for synthetic data generation and bulk loading."""
+
+    def test_generation_is_deterministic(self):
+        """Test the same sizes and seed produce the same rows."""
+        def rows(seed):
+            data = SyntheticData(users=30, communities=3, seed=seed, password_hash='x', now=NOW)
+            return [list(rows) for _, rows in data.tables()]
+
+        assert rows(7) == rows(7)
+        assert rows(7) != rows(8)
+
+    def test_follows_are_distinct_and_skewed(self):
+        """Test nobody follows themselves or anyone twice, and low ids are the popular ones."""
+        follows = list(SyntheticData(users=200, follows_per_user=10).follow_rows())
+        pairs = {(row['follower_id'], row['followed_id']) for row in follows}
+        followed = [row['followed_id'] for row in follows]
+
+        assert len(pairs) == len(follows) == 200 * 10
+        assert all(follower != followed for follower, followed in pairs)
+        assert sum(id <= 20 for id in followed) > 3 * len(followed) / 10  # Uniform would be a tenth
+
+    def test_bulk_load_rebuilds_indexes(self, app, db_session):
+        """Test a load fills every table, restores its indexes and leaves counters consistent."""
+        app.config['BCRYPT_LOG_ROUNDS'] = 4
+        indexes_before = {index['name'] for index in inspect(db.engine).get_indexes('post')}
+
+        counts = bulk_load(SyntheticData(users=25, communities=3, seed=1), batch_size=40)
+
+        assert counts['user'] == User.query.count() == 25
+        assert counts['post'] == Post.query.count() == 125
+        assert {index['name'] for index in inspect(db.engine).get_indexes('post')} == indexes_before
+        assert set(reconcile_counters().values()) == {0}
+
+    def test_seed_data_command(self, runner, db_session):
+        """Test the CLI command loads the requested number of users."""
+        result = runner.invoke(args=['seed-data', '--users', '20', '--batch-size', '50'])
+
+        assert result.exit_code == 0, result.output
+        assert 'user: 20 row(s)' in result.output
+        assert User.query.count() == 20
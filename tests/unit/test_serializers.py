@@ -0,0 +1,49 @@
+import pytest
+from community.models import Reaction, Comment
+from community.serializers import serialize_posts
+from common.counters import reconcile_counters
+from tests.conftest import (
+    create_test_user, create_test_post, create_test_community, create_test_image
+)
+
+class TestSerializePosts:
+    """Test cases for the batched post serializer."""
+
+    def test_matches_per_post_serialization(self, db_session):
+        """Test batched output equals the one-post-at-a-time output."""
+        author = create_test_user(db_session)
+        reader = create_test_user(db_session)
+        community = create_test_community(db_session)
+        community.members.append(author)
+        reader.following.append(author)
+        first = create_test_post(db_session, author.id, community_id=community.id, post_type='community')
+        second = create_test_post(db_session, author.id)
+        create_test_image(db_session, first.id)
+        create_test_image(db_session, first.id)
+        db_session.add_all([
+            Reaction(user_id=author.id, post_id=first.id, reaction_type='like'),
+            Reaction(user_id=reader.id, post_id=first.id, reaction_type='dislike'),
+            Comment(content='Nice', author_id=reader.id, post_id=first.id),
+        ])
+        db_session.commit()
+        reconcile_counters()
+
+        batched = serialize_posts([first, second], include_author=True, include_community=True)
+
+        expected = []
+        for post in [first, second]:
+            post_dict = post.to_dict()
+            post_dict['author'] = post.author.to_dict()
+            if post.community_id:
+                post_dict['community'] = post.community.to_dict()
+            expected.append(post_dict)
+        assert batched == expected
+        assert batched[0]['likes_count'] == 1
+        assert batched[0]['dislikes_count'] == 1
+        assert batched[0]['comments_count'] == 1
+        assert len(batched[0]['images']) == 2
+        assert batched[0]['author']['followers_count'] == 1
+
+    def test_empty_page(self, db_session):
+        """Test an empty page serializes without querying."""
+        assert serialize_posts([]) == []
@@ -0,0 +1,73 @@
+import pytest
+import threading
+import time
+import responses
+from common.upstream import UpstreamGuard, UpstreamUnavailable
+from explore.places import NEARBY_SEARCH_URL
+from tests.conftest import create_test_user, auth_headers_for
+
+def fail():
+    raise ConnectionError('down')
+
+class TestUpstreamGuard:
+    """Test cases for the upstream concurrency limit and circuit breaker."""
+
+    def test_circuit_opens_and_recovers(self):
+        """Test repeated failures fail fast until a trial call succeeds."""
+        guard = UpstreamGuard('test', failure_threshold=2, reset_timeout=0.05)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                guard.call(fail)
+
+        with pytest.raises(UpstreamUnavailable):
+            guard.call(lambda: 'not called')
+        assert guard.state == 'open'
+
+        time.sleep(0.06)
+        assert guard.call(lambda: 'ok') == 'ok'
+        assert guard.state == 'closed'
+
+    def test_failed_trial_reopens(self):
+        """Test a failing half-open trial opens the circuit again."""
+        guard = UpstreamGuard('test', failure_threshold=1, reset_timeout=0.05)
+        with pytest.raises(ConnectionError):
+            guard.call(fail)
+        time.sleep(0.06)
+
+        with pytest.raises(ConnectionError):
+            guard.call(fail)
+        assert guard.state == 'open'
+
+    def test_bad_results_count_as_failures(self):
+        """Test results flagged by is_failure trip the breaker."""
+        guard = UpstreamGuard('test', failure_threshold=1)
+        guard.call(lambda: 503, is_failure=lambda status: status >= 500)
+
+        assert guard.state == 'open'
+
+    def test_saturation_is_rejected(self):
+        """Test callers give up when every slot stays busy."""
+        guard = UpstreamGuard('test', max_concurrency=1, acquire_timeout=0.01)
+        release = threading.Event()
+        busy = threading.Thread(target=guard.call, args=(release.wait,))
+        busy.start()
+        time.sleep(0.02)
+
+        with pytest.raises(UpstreamUnavailable):
+            guard.call(lambda: 'ok')
+        release.set()
+        busy.join()
+
+    @responses.activate
+    def test_places_route_fails_fast_when_open(self, app, client, db_session):
+        """Test /places answers 503 with Retry-After once the upstream keeps failing."""
+        app.config.update(GOOGLE_PLACES_API_KEY='key', UPSTREAM_FAILURE_THRESHOLD=1)
+        responses.add(responses.GET, NEARBY_SEARCH_URL, status=500, json={'status': 'UNKNOWN_ERROR'})
+        headers = auth_headers_for(create_test_user(db_session))
+
+        client.get('/api/explore/places?lat=1&lng=1', headers=headers)
+        response = client.get('/api/explore/places?lat=2&lng=2', headers=headers)
+
+        assert response.status_code == 503
+        assert int(response.headers['Retry-After']) >= 1
+        assert len(responses.calls) == 1
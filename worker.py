@@ -0,0 +1,16 @@
+"""Background job worker.
+
+Run one or more alongside the web processes:
+
+    python worker.py
+"""
+import logging
+from app import create_app
+from jobs.queue import run_worker
+
+app = create_app()
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    with app.app_context():
+        run_worker()